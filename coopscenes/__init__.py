@@ -1,3 +1,6 @@
-from .core import Dataloader, DataRecord
+from .core import Dataloader, DataRecord, DataRecordWriter, FrameHandle
+from .index import RecordIndex
+from .cache import FrameCache
+from .verification import verify_dataset
 from .data import *
 from .utils import *
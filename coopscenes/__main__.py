@@ -0,0 +1,3 @@
+from coopscenes.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""
+This module provides a cache for decoded frames, which avoids verifying and deserializing the same frame
+again when records are accessed randomly, e.g. by visualisation tools or temporal-context samplers.
+
+Classes:
+    FrameCache: A thread-safe LRU cache of decoded frames that is bounded by the estimated size of the frames.
+
+Functions:
+    estimate_frame_size: Estimates the memory held by a decoded frame.
+"""
+from typing import Callable, Hashable, Optional
+from collections import OrderedDict
+import threading
+from coopscenes.data import Frame
+
+
+def estimate_frame_size(frame: Frame, encoded_size: int = 0) -> int:
+    """Estimate the memory held by a decoded frame.
+
+    The estimate consists of the serialized size of the frame plus the size of the decoded images and
+    point clouds, including the memoized rectified images and deskewed points. Sensors of lazy frames
+    that are not decoded yet are only counted by their serialized size.
+
+    Args:
+        frame (Frame): The decoded frame.
+        encoded_size (int): The serialized size of the frame in bytes. Defaults to 0.
+
+    Returns:
+        int: The estimated size of the frame in bytes.
+    """
+    size = encoded_size
+    for agent in frame:
+        for name in agent.cameras._CAMERA_NAMES:
+            camera = getattr(agent.cameras, name)
+            if camera is None or not camera.is_decoded:
+                continue
+            for image in (camera._image_raw, camera._image_rect):
+                if image is not None and image.image is not None:
+                    width, height = image.image.size
+                    size += width * height * len(image.image.getbands())
+        for name in agent.lidars._LIDAR_NAMES:
+            lidar = getattr(agent.lidars, name)
+            if lidar is None or not lidar.is_decoded:
+                continue
+            if lidar._points_raw is not None:
+                size += lidar._points_raw.points.nbytes
+            if lidar._points_deskewd is not None:
+                size += getattr(lidar._points_deskewd, 'nbytes', 0)
+    return size
+
+
+class FrameCache:
+    """Class representing a thread-safe LRU cache of decoded frames.
+
+    The cache is bounded by the estimated size of the cached frames. It can be passed to several
+    records, e.g. through a `Dataloader`, to share one budget between them. Cached frames are
+    returned as is, so changes to a returned frame are visible to later hits.
+
+    Cached frames grow after they are inserted, e.g. when sensors of lazy frames are decoded or
+    rectified images are memoized. Frames inserted with an estimator are therefore estimated again
+    on every hit, and the least recently used frames are evicted if the cache outgrew `max_bytes`.
+
+    Attributes:
+        max_bytes (int): The maximum estimated size of all cached frames in bytes.
+        current_bytes (int): The estimated size of all cached frames in bytes.
+        hits (int): The number of lookups that returned a cached frame.
+        misses (int): The number of lookups that did not find a cached frame.
+        evictions (int): The number of frames that were evicted to stay within `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize a FrameCache object.
+
+        Args:
+            max_bytes (int): The maximum estimated size of all cached frames in bytes.
+        """
+        self.max_bytes: int = max_bytes
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._frames: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of cached frames."""
+        return len(self._frames)
+
+    def __repr__(self):
+        """Return a string representation of the FrameCache object."""
+        return (
+            f"FrameCache(\n"
+            f"    frames={len(self)},\n"
+            f"    current_bytes={self.current_bytes},\n"
+            f"    max_bytes={self.max_bytes},\n"
+            f"    hits={self.hits},\n"
+            f"    misses={self.misses},\n"
+            f"    evictions={self.evictions}\n"
+            f")"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that returned a cached frame."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable) -> Optional[Frame]:
+        """Look up a frame and mark it as most recently used.
+
+        The size of the frame is estimated again if it was inserted with an estimator. A frame that outgrew
+        `max_bytes` on its own is still returned, but removed from the cache.
+
+        Args:
+            key (Hashable): The key of the frame.
+
+        Returns:
+            Optional[Frame]: The cached frame, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            frame, size, estimate = entry
+            if estimate is not None:
+                new_size = estimate(frame)
+                if new_size != size:
+                    self._frames[key] = (frame, new_size, estimate)
+                    self.current_bytes += new_size - size
+                    self._evict()
+            return frame
+
+    def put(self, key: Hashable, frame: Frame, size: int, estimate: Optional[Callable[[Frame], int]] = None):
+        """Insert a frame and evict the least recently used frames until the cache fits into `max_bytes`.
+
+        Frames that are larger than `max_bytes` on their own are not cached.
+
+        Args:
+            key (Hashable): The key of the frame.
+            frame (Frame): The decoded frame.
+            size (int): The estimated size of the frame in bytes, see `estimate_frame_size`.
+            estimate (Optional[Callable[[Frame], int]]): Function estimating the size of the frame again on every
+                                                         hit, as the frame grows while it is used. Defaults to
+                                                         None, which keeps the size of the insertion.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._frames[key] = (frame, size, estimate)
+            self.current_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Evict the least recently used frames until the cache fits into `max_bytes`. The lock must be held."""
+        while self.current_bytes > self.max_bytes and self._frames:
+            _, (_, evicted_size, _) = self._frames.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all cached frames and reset the counters."""
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
@@ -0,0 +1,55 @@
+"""
+This module provides the command line interface of the dev-kit, installed as the `coopscenes` command.
+
+Commands:
+    repack: Rewrites the records of a directory with another compression and layout, see `coopscenes.repack`.
+
+Functions:
+    main(argv): Parses the command line and runs the selected command.
+"""
+from typing import List, Optional
+import argparse
+from coopscenes.repack import repack_dataset, format_report, LAYOUTS, LAYOUT_SHARED
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse the command line and run the selected command.
+
+    Args:
+        argv (Optional[List[str]]): The command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog='coopscenes', description='Tools for AMEISE-Record files (.4mse).')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    repack = subparsers.add_parser('repack', help='Rewrite records with another compression and layout.')
+    repack.add_argument('data_dir', help='Directory containing the .4mse record files.')
+    repack.add_argument('output_dir', help='Directory to write the repacked records to.')
+    repack.add_argument('--zstd-level', type=int, default=None,
+                        help='zstd level of the lidar points, e.g. 3 for fast writing. Passed through if omitted.')
+    repack.add_argument('--zstd-threads', type=int, default=0,
+                        help='zstd compression threads per record. Defaults to 0.')
+    repack.add_argument('--zstd-dict', action='store_true',
+                        help='Train a zstd dictionary per lidar model and recompress the points with it.')
+    repack.add_argument('--jpeg-quality', type=int, default=None,
+                        help='JPEG quality to re-encode the images with. Passed through if omitted.')
+    repack.add_argument('--layout', choices=LAYOUTS, default=LAYOUT_SHARED,
+                        help='On-disk layout of the repacked records, dill for the legacy layout readable by '
+                             'releases up to 0.9.2. Defaults to shared.')
+    repack.add_argument('--index', action='store_true', help='Build a sidecar index for every repacked record.')
+    repack.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes. Defaults to the number of CPUs.')
+    repack.add_argument('--no-benchmark', action='store_true',
+                        help='Skip measuring the decode speed before and after.')
+
+    args = parser.parse_args(argv)
+    if args.command == 'repack':
+        results = repack_dataset(args.data_dir, args.output_dir, workers=args.workers, zstd_level=args.zstd_level,
+                                 zstd_threads=args.zstd_threads, zstd_dictionary=args.zstd_dict,
+                                 jpeg_quality=args.jpeg_quality,
+                                 layout=args.layout, build_index=args.index, benchmark=not args.no_benchmark)
+        print(format_report(results))
+    return 0
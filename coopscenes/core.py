@@ -7,14 +7,39 @@ Classes:
     DataRecord: Represents a data record in the AMEISE-Record format. Handles loading frames from a .4mse file,
                 provides access to individual frames, and serializes frames into bytes.
 
+    DataRecordWriter: Writes frames to an AMEISE-Record file one at a time, without keeping them in memory.
+
+    FrameHandle: References a single frame of a Dataloader by record and index, decoding it only on request.
+
     Dataloader: Manages the loading of AMEISE-Record files from a specified directory. Provides access to these
                 records and allows for retrieval by index or filename.
 """
-from typing import List, Optional, Iterator, Union, Generator
+from typing import Dict, List, Optional, Iterator, Iterable, Tuple, Union, Generator
 import os
 import glob
+import mmap
+import shutil
+import warnings
+from collections import deque, OrderedDict
+from decimal import Decimal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import accumulate
+import numpy as np
+import zstandard as zstd
 from coopscenes.data import *
-from coopscenes.miscellaneous import InvalidFileTypeError, obj_to_bytes, obj_from_bytes, INT_LENGTH
+from coopscenes.index import RecordIndex
+from coopscenes.cache import FrameCache, estimate_frame_size
+from coopscenes.verification import VerificationLog, check_verify_mode, VERIFY_ALWAYS, VERIFY_ONCE, VERIFY_NEVER, \
+    STATUS_UNKNOWN, STATUS_VALID, STATUS_CORRUPT
+from coopscenes.miscellaneous import InvalidFileTypeError, ChecksumError, obj_to_bytes, obj_from_bytes, as_memoryview, \
+    INT_LENGTH
+from coopscenes.miscellaneous.codec import SharedObjectCollector, register_shared_objects, get_shared_id
+from coopscenes.miscellaneous.compression import ZstdDictionaries, train_zstd_dictionary, register_zstd_dictionaries, \
+    ZSTD_DICTIONARY_SIZE
+
+SHARD_BY_BYTES = 'bytes'  # Balance the shards of a Dataloader by the encoded size of their frames
+SHARD_BY_FRAMES = 'frames'  # Balance the shards of a Dataloader by their number of frames
+SHARD_MODES = (SHARD_BY_BYTES, SHARD_BY_FRAMES)
 
 
 class DataRecord:
@@ -23,39 +48,164 @@ class DataRecord:
     This class is responsible for loading, accessing, and manipulating individual frames from
     an AMEISE-Record file. It stores the sequence of frame lengths and the raw frame data.
 
+    The record header holds the frame lengths and, for records written with the schema-based codec,
+    the encoded static sensor information that is shared by all frames. The shared objects are
+    registered when the record is opened, and all frames return the same Python object for them.
+    Records written with trained zstd dictionaries for the lidar points also store the dictionaries in
+    the header, and they are registered when the record is opened as well.
+
+    The frame data is either read into memory as a whole or, with `use_mmap=True`, memory-mapped
+    from the file. In the latter case only the pages of the frames that are actually accessed are
+    read from disk, and the page cache is shared between all processes that open the same record.
+
     Attributes:
         name (Optional[str]): The name of the record file.
         num_frames (int): The number of frames in the record.
         frame_lengths (List[int]): List of lengths for each frame in the record.
-        frames_data (bytes): Raw bytes representing the frames in the record.
+        shared_objects (List[bytes]): The encoded objects shared by the frames of the record.
+        zstd_dictionaries (List[bytes]): The trained zstd dictionaries the lidar points are compressed with.
+        frame_offsets (List[int]): Byte offsets of the frames within the frame data. Contains
+            num_frames + 1 entries, so frame i spans frame_offsets[i]:frame_offsets[i + 1].
+        data_offset (int): File offset of the first frame within the record file.
+        frames_data (Union[bytes, memoryview]): Raw bytes representing the frames in the record,
+            or a read-only view on the memory-mapped file if `use_mmap` is set.
+        use_mmap (bool): Whether the frame data is memory-mapped instead of read into memory.
+        lazy (bool): Whether the sensors of the returned frames are only decoded on first attribute access.
+        index (Optional[RecordIndex]): The sidecar index of the record, if one was provided.
+        cache (Optional[FrameCache]): The cache of frames accessed by index, if one was provided.
+        verify (str): The verification policy of the frame checksums, one of 'always', 'once' or 'never'.
+        decode_threads (int): Number of threads decoding the sensors of a frame concurrently, 0 to decode
+            them one after another.
+        image_scale (int): Denominator of the decode scale of the camera images, one of 1, 2, 4 or 8.
     """
 
-    def __init__(self, record_file: Optional[str] = None):
+    def __init__(self, record_file: Optional[str] = None, use_mmap: bool = False, lazy: bool = False,
+                 index: Optional[RecordIndex] = None, cache: Optional[FrameCache] = None, verify: str = VERIFY_ALWAYS,
+                 decode_threads: int = 0, image_scale: int = 1):
         """Initialize a DataRecord object.
 
         Args:
             record_file (Optional[str]): Path to the AMEISE-Record file to load.
                                          If None, an empty record is created.
+            use_mmap (bool): If True, the frame data is memory-mapped instead of read into memory.
+                             Defaults to False.
+            lazy (bool): If True, the sensors of the returned frames are only decoded on first attribute
+                         access. Lazy frames reference the frame data until all their sensors are decoded.
+                         Defaults to False.
+            index (Optional[RecordIndex]): Sidecar index of the record. If provided, the frame offsets
+                                           are taken from the index instead of the record header.
+            cache (Optional[FrameCache]): Cache for frames accessed by index, e.g. `record[i]`. Cached frames
+                                          are returned without verifying and deserializing them again.
+                                          Iteration does not use the cache.
+            verify (str): The verification policy of the frame checksums. 'always' verifies every frame each
+                          time it is decoded, 'once' verifies every frame the first time it is decoded and
+                          records the result in a sidecar next to the record (.4mse.vrf), which is written in
+                          batches and when the record is closed, and 'never' skips the verification.
+                          Defaults to 'always'.
+            decode_threads (int): Number of threads decoding the sensor blocks of a frame concurrently, see
+                                  `Frame.from_bytes`. This lowers the latency of single frames, e.g. for
+                                  interactive tools. Ignored in lazy mode. Defaults to 0, which decodes the
+                                  sensors one after another.
+            image_scale (int): Denominator of the decode scale of the camera images, one of 1, 2, 4 or 8.
+                               JPEG images are downscaled while decoding, which is much faster than decoding
+                               them at full resolution, e.g. for thumbnails or low-resolution models.
+                               The rectification, the projection of points and the 2D box labels of the
+                               cameras are scaled to match. Defaults to 1.
 
         Raises:
             InvalidFileTypeError: If the provided file is not in the .4mse format.
+            ValueError: If the verification policy or the image scale is unknown.
         """
+        if image_scale not in IMAGE_SCALES:
+            raise ValueError(f"Unsupported image scale {image_scale}. "
+                             f"Expected one of {', '.join(map(str, IMAGE_SCALES))}.")
         self.path: Optional[str] = record_file
         self.name: Optional[str] = None
         self.num_frames: int = 0
         self.frame_lengths: List[int] = []
-        self.frames_data: bytes = b""
+        self.shared_objects: List[bytes] = []
+        self.zstd_dictionaries: List[bytes] = []
+        self.frame_offsets: List[int] = [0]
+        self.data_offset: int = 0
+        self.frames_data: Union[bytes, memoryview] = b""
+        self.use_mmap: bool = use_mmap
+        self.lazy: bool = lazy
+        self._mmap: Optional[mmap.mmap] = None
+        self.index: Optional[RecordIndex] = index
+        self.cache: Optional[FrameCache] = cache
+        self.verify: str = check_verify_mode(verify)
+        self._verification_log: Optional[VerificationLog] = None
+        self._time_series: Optional[Dict[str, np.ndarray]] = None
+        self._closed: bool = False
+        self.decode_threads: int = decode_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.image_scale: int = image_scale
         if self.path is not None:
             if os.path.splitext(self.path)[1] != ".4mse":
                 raise InvalidFileTypeError("This is not a valid AMEISE-Record file.")
             with open(self.path, 'rb') as file:
-                # Read frame_lengths (array with num_frames entries)
-                frame_lengths_len: int = int.from_bytes(file.read(INT_LENGTH), 'big')
-                self.frame_lengths = obj_from_bytes(file.read(frame_lengths_len))
+                if self.index is not None:
+                    self.frame_offsets = self.index.frame_offsets.tolist()
+                    self.frame_lengths = [end - start for start, end in zip(self.frame_offsets, self.frame_offsets[1:])]
+                    self.shared_objects = list(self.index.shared_objects)
+                    self.zstd_dictionaries = list(self.index.zstd_dictionaries)
+                    self.data_offset = self.index.data_offset
+                else:
+                    # Read the header, either the frame lengths or a dict with the frame lengths, shared objects
+                    # and zstd dictionaries
+                    frame_lengths_len: int = int.from_bytes(file.read(INT_LENGTH), 'big')
+                    header = obj_from_bytes(file.read(frame_lengths_len))
+                    if isinstance(header, dict):
+                        self.frame_lengths = list(header['frame_lengths'])
+                        self.shared_objects = list(header['shared_objects'])
+                        self.zstd_dictionaries = list(header.get('zstd_dictionaries', []))
+                    else:
+                        self.frame_lengths = header
+                    self.frame_offsets = [0] + list(accumulate(self.frame_lengths))
+                    self.data_offset = INT_LENGTH + frame_lengths_len
                 # Read frames
-                self.frames_data: bytes = file.read()
+                if self.use_mmap:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.frames_data = memoryview(self._mmap)[self.data_offset:]
+                else:
+                    file.seek(self.data_offset)
+                    self.frames_data = file.read()
+            register_shared_objects(self.shared_objects)
+            register_zstd_dictionaries(self.zstd_dictionaries)
             self.num_frames: int = len(self.frame_lengths)
             self.name = os.path.splitext(os.path.basename(self.path))[0]
+            if self.verify == VERIFY_ONCE:
+                self._verification_log = VerificationLog(self.path, self.num_frames)
+
+    def __enter__(self) -> 'DataRecord':
+        """Enter the runtime context of the DataRecord."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the DataRecord when leaving the runtime context."""
+        self.close()
+
+    def close(self):
+        """Release the frame data and unmap the record file if it is memory-mapped.
+
+        If frames decoded from the record still reference the mapped memory, the mapping is
+        released by the garbage collector once these references are gone. Frames cannot be
+        decoded from a closed record. Pending verification statuses are written to the sidecar.
+        """
+        self._closed = True
+        if self._verification_log is not None:
+            self._verification_log.flush()
+        if self._mmap is not None:
+            self.frames_data.release()
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        self.frames_data = b""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
     def __len__(self):
         """Return the number of frames in the DataRecord."""
@@ -71,24 +221,16 @@ class DataRecord:
             Frame or List[Frame]: The frame at the specified index, or a list of frames if a slice is provided.
 
         Raises:
-            ValueError: If the frame index is out of range.
+            ValueError: If the frame index is out of range or the record is closed.
         """
         if isinstance(frame_index, int):
             if frame_index < 0 or frame_index >= len(self.frame_lengths):
                 raise ValueError("Frame index out of range.")
-            start_pos = sum(self.frame_lengths[:frame_index])
-            end_pos = start_pos + self.frame_lengths[frame_index]
-            return Frame.from_bytes(self.frames_data[start_pos:end_pos])
+            return self._get_frame(frame_index)
 
         elif isinstance(frame_index, slice):
             start, stop, step = frame_index.indices(len(self.frame_lengths))
-            frames = []
-            start_pos = sum(self.frame_lengths[:start])
-            for i in range(start, stop, step):
-                end_pos = start_pos + self.frame_lengths[i]
-                frames.append(Frame.from_bytes(self.frames_data[start_pos:end_pos]))
-                start_pos = end_pos
-            return frames
+            return [self._get_frame(i) for i in range(start, stop, step)]
 
         else:
             raise TypeError("Frame index must be an integer or slice.")
@@ -99,51 +241,526 @@ class DataRecord:
         Yields:
             Iterator[Frame]: An iterator that yields Frame objects.
         """
-        start_pos = 0
-        for length in self.frame_lengths:
-            end_pos = start_pos + length
-            yield Frame.from_bytes(self.frames_data[start_pos:end_pos])
-            start_pos = end_pos
+        yield from self.iter_frames()
+
+    def iter_frames(self, sensors: Optional[Iterable[str]] = None, start: int = 0,
+                    stop: Optional[int] = None) -> Iterator[Frame]:
+        """Iterate over the frames of the record, deserializing only the selected sensors.
+
+        With a sidecar index, only the metadata, the agent information and the blocks of the selected
+        sensors are verified against their block checksums, so unselected sensors are neither hashed nor
+        decoded. Without an index the checksum of the whole frame is verified.
+
+        Args:
+            sensors (Optional[Iterable[str]]): Sensors to deserialize, e.g. ['vehicle.lidars.TOP', 'tower.cameras'].
+                                               Defaults to None, which deserializes all sensors.
+            start (int): Index of the first frame. Defaults to 0.
+            stop (Optional[int]): Index after the last frame. Defaults to None, which iterates to the end.
+
+        Yields:
+            Iterator[Frame]: An iterator that yields Frame objects. Unselected sensors are None.
+
+        Raises:
+            ChecksumError: If a verified block does not match its checksum.
+            ValueError: If an unknown sensor is selected or the record is closed.
+        """
+        selected = None if sensors is None else Frame.resolve_sensors(sensors)
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        for i in range(start, stop):
+            yield self._decode_frame(i, selected)
+
+    def iter_parallel(self, workers: Optional[int] = None, ordered: bool = True, max_in_flight: Optional[int] = None,
+                      sensors: Optional[Iterable[str]] = None) -> Iterator[Frame]:
+        """Iterate over the frames of the record, decoding them in a pool of worker processes.
+
+        Every worker memory-maps the record file itself, so only frame indices are sent to the workers
+        and only the decoded frames are sent back. The frames are always decoded completely, regardless
+        of the `lazy` setting of the record.
+
+        Args:
+            workers (Optional[int]): Number of worker processes. Defaults to None, which uses the number of CPUs.
+            ordered (bool): If True, the frames are yielded in record order, otherwise as soon as they are
+                            decoded. Defaults to True.
+            max_in_flight (Optional[int]): Maximum number of frames that are submitted but not yet yielded.
+                                           Defaults to None, which allows two frames per worker.
+            sensors (Optional[Iterable[str]]): Sensors to deserialize, like in `iter_frames`. Defaults to None,
+                                               which deserializes all sensors.
+
+        Yields:
+            Iterator[Frame]: An iterator that yields Frame objects.
+
+        Raises:
+            ValueError: If the record was not loaded from a file.
+        """
+        if self.path is None:
+            raise ValueError("Parallel decoding requires a record that was loaded from a file.")
+        selected = None if sensors is None else Frame.resolve_sensors(sensors)
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = max(1, max_in_flight or 2 * workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_record,
+                                 initargs=(self.path, self.index, self.verify, self.image_scale)) as executor:
+            frame_indices = iter(range(self.num_frames))
+            pending = deque()
+            for frame_index in frame_indices:
+                pending.append(executor.submit(_decode_worker_frame, frame_index, selected))
+                if len(pending) >= max_in_flight:
+                    break
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    yield future.result()
+                    frame_index = next(frame_indices, None)
+                    if frame_index is not None:
+                        pending.append(executor.submit(_decode_worker_frame, frame_index, selected))
+
+    def get_time_series(self) -> Dict[str, np.ndarray]:
+        """Get the IMU, GNSS and dynamics time series of all frames as numpy structured arrays.
+
+        The arrays are computed on first call and kept for the lifetime of the record, see
+        `coopscenes.utils.get_time_series` for their layout.
+
+        Returns:
+            Dict[str, np.ndarray]: The structured array of every stream, keyed by its attribute path,
+                e.g. 'vehicle.IMU.motion'.
+        """
+        if self._time_series is None:
+            from coopscenes.utils import get_time_series
+            self._time_series = get_time_series(self)
+        return self._time_series
+
+    def _get_frame(self, frame_index: int) -> Frame:
+        """Return a frame from the cache, or decode it and insert it into the cache.
+
+        Args:
+            frame_index (int): Index of the frame within the record.
+
+        Returns:
+            Frame: The deserialized frame.
+
+        Raises:
+            ValueError: If the record is closed.
+        """
+        if self._closed:
+            raise ValueError(f"The record {self.name} is closed.")
+        if self.cache is None:
+            return self._decode_frame(frame_index)
+        key = (self.path, frame_index, self.lazy, self.image_scale)
+        frame = self.cache.get(key)
+        if frame is None:
+            frame = self._decode_frame(frame_index)
+            encoded_size = self.frame_lengths[frame_index]
+            self.cache.put(key, frame, estimate_frame_size(frame, encoded_size),
+                           lambda cached: estimate_frame_size(cached, encoded_size))
+        return frame
+
+    def _decode_frame(self, frame_index: int, sensors: Optional[Iterable[str]] = None) -> Frame:
+        """Decode a single frame of the record.
+
+        Args:
+            frame_index (int): Index of the frame within the record.
+            sensors (Optional[Iterable[str]]): Sensors to deserialize. Defaults to None, which deserializes all sensors.
+
+        Returns:
+            Frame: The deserialized frame.
+
+        Raises:
+            ChecksumError: If the frame or one of the verified blocks does not match its checksum.
+            ValueError: If the record is closed.
+        """
+        if self._closed:
+            raise ValueError(f"The record {self.name} is closed.")
+        start_pos, end_pos = self.frame_offsets[frame_index], self.frame_offsets[frame_index + 1]
+        frame_data = as_memoryview(self.frames_data)[start_pos:end_pos]
+        if self.decode_threads > 0 and not self.lazy and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.decode_threads)
+        executor = self._executor
+        if self.verify == VERIFY_NEVER:
+            return Frame.from_bytes(frame_data, lazy=self.lazy, sensors=sensors, verify=False, executor=executor,
+                                    image_scale=self.image_scale)
+        if self._verification_log is not None:
+            status = self._verification_log.get_status(frame_index)
+            if status == STATUS_UNKNOWN and (sensors is None or self.index is None):
+                status = STATUS_VALID if Frame.verify_checksum(frame_data) else STATUS_CORRUPT
+                self._verification_log.set_status(frame_index, status)
+            if status == STATUS_CORRUPT:
+                raise ChecksumError("Checksum mismatch. Data might be corrupted!")
+            if status == STATUS_VALID:
+                return Frame.from_bytes(frame_data, lazy=self.lazy, sensors=sensors, verify=False, executor=executor,
+                                        image_scale=self.image_scale)
+
+        if sensors is None or self.index is None:
+            return Frame.from_bytes(frame_data, lazy=self.lazy, sensors=sensors, executor=executor,
+                                    image_scale=self.image_scale)
+        selected = Frame.resolve_sensors(sensors)
+        blocks = ['meta', 'vehicle.info', 'tower.info'] + sorted(selected)
+        if not self.index.verify_blocks(frame_index, frame_data, blocks):
+            raise ChecksumError("Checksum mismatch. Data might be corrupted!")
+        return Frame.from_bytes(frame_data, lazy=self.lazy, sensors=selected, verify=False, executor=executor,
+                                image_scale=self.image_scale)
 
     @staticmethod
     def to_bytes(frames: List[Frame]) -> bytes:
         """Serialize a list of frames into bytes.
 
+        The records are written in the current format, which releases up to 0.9.2 cannot read, see
+        `DataRecordWriter` for writing records in the legacy layout.
+
         Args:
             frames (List[Frame]): List of Frame objects to serialize.
 
         Returns:
             bytes: The serialized byte representation of the frames.
         """
-        frame_lengths: List[int] = []
-        frames_bytes = b""
-        for _frame in frames:
-            frame_bytes = _frame.to_bytes()
-            frame_lengths.append(len(frame_bytes))
-            frames_bytes += frame_bytes
-        frame_lengths_bytes = obj_to_bytes(frame_lengths)
-        return frame_lengths_bytes + frames_bytes
+        with SharedObjectCollector() as shared:
+            frames_bytes = [_frame.to_bytes() for _frame in frames]
+        header_bytes = _header_to_bytes([len(frame_bytes) for frame_bytes in frames_bytes], shared)
+        return header_bytes + b"".join(frames_bytes)
+
+    def train_zstd_dictionaries(self, num_samples: int = 32, dict_size: int = ZSTD_DICTIONARY_SIZE) \
+            -> Dict[str, bytes]:
+        """Train a zstd dictionary for the points of every lidar model on a sample of the frames.
+
+        Only the lidars of the sampled frames are decoded. The frames are sampled evenly across the record.
+        Lidar models whose samples are too few or too small to train a dictionary, e.g. in short records,
+        are skipped with a warning, so their points are compressed without a dictionary.
+
+        Args:
+            num_samples (int): Number of frames to sample. Defaults to 32.
+            dict_size (int): The maximum size of every dictionary in bytes. Defaults to 112640.
+
+        Returns:
+            Dict[str, bytes]: The trained dictionaries, keyed by lidar model name. Pass them to a
+                `DataRecordWriter` to compress the points with them.
+        """
+        sensors = Frame.resolve_sensors(['vehicle.lidars', 'tower.lidars'])
+        frame_indices = np.unique(np.linspace(0, self.num_frames - 1, min(num_samples, self.num_frames), dtype=int))
+        samples: Dict[str, List[bytes]] = {}
+        for i in frame_indices:
+            frame = self._decode_frame(int(i), sensors)
+            for agent in (frame.vehicle, frame.tower):
+                for _, lidar in agent.lidars:
+                    if lidar._points_raw is not None:
+                        samples.setdefault(lidar.info.model_name, []).append(lidar._points_raw.points.tobytes())
+        dictionaries = {}
+        for model_name, model_samples in samples.items():
+            try:
+                dictionaries[model_name] = train_zstd_dictionary(model_samples, dict_size)
+            except zstd.ZstdError as error:
+                warnings.warn(f"No zstd dictionary trained for the lidar model '{model_name}' of record {self.name}, "
+                              f"its points are compressed without a dictionary: {error}", RuntimeWarning)
+        return dictionaries
+
+
+def _header_to_bytes(frame_lengths: List[int], shared: SharedObjectCollector,
+                     zstd_dictionaries: Optional[List[bytes]] = None) -> bytes:
+    """Serialize the record header, which only holds the frame lengths if no objects or dictionaries are shared."""
+    if not shared.objects and not zstd_dictionaries:
+        return obj_to_bytes(frame_lengths)
+    header = {'frame_lengths': frame_lengths, 'shared_objects': list(shared.objects.values())}
+    if zstd_dictionaries:
+        header['zstd_dictionaries'] = list(zstd_dictionaries)
+    return obj_to_bytes(header)
+
+
+class DataRecordWriter:
+    """Class writing frames to an AMEISE-Record file (.4mse) one at a time.
+
+    The record format stores the frame lengths in front of the frames, so the frames are spooled
+    to a temporary file next to the record (.4mse.part) as they arrive. On close, the header is
+    written and the spooled frames are copied behind it. Only the frame lengths and the shared
+    static sensor information are kept in memory.
+
+    Records are written in the current format: metadata encoded with the schema-based codec, static
+    sensor information shared through the record header and optional zstd dictionaries. Releases up to
+    0.9.2 cannot read it. For records readable by them, set `Config.DILL_SERIALIZATION`, pass
+    `share_objects=False` and no dictionaries, or repack with `coopscenes repack --layout dill`.
+
+    Example:
+        with DataRecordWriter('record.4mse') as writer:
+            for frame in frames:
+                writer.write(frame)
+
+    Attributes:
+        path (str): Path to the record file that is written.
+        frame_lengths (List[int]): The lengths of the frames written so far.
+        share_objects (bool): Whether the static sensor information is stored once in the record header.
+        zstd_dictionaries (Dict[str, bytes]): The trained zstd dictionaries the lidar points are compressed with,
+            keyed by lidar model name.
+    """
+
+    def __init__(self, record_file: str, share_objects: bool = True,
+                 zstd_dictionaries: Optional[Dict[str, bytes]] = None):
+        """Initialize a DataRecordWriter object and open the spool file.
+
+        Args:
+            record_file (str): Path to the AMEISE-Record file to write.
+            share_objects (bool): If True, the static sensor information is stored once in the record header
+                                  instead of in every frame. Defaults to True.
+            zstd_dictionaries (Optional[Dict[str, bytes]]): Trained zstd dictionaries keyed by lidar model name,
+                                                            e.g. from `DataRecord.train_zstd_dictionaries`. The
+                                                            points of these models are compressed with them and
+                                                            the dictionaries are stored in the record header.
+                                                            Defaults to None, which compresses without dictionaries.
+
+        Raises:
+            InvalidFileTypeError: If the provided file is not in the .4mse format.
+        """
+        if os.path.splitext(record_file)[1] != ".4mse":
+            raise InvalidFileTypeError("This is not a valid AMEISE-Record file.")
+        self.path: str = record_file
+        self.frame_lengths: List[int] = []
+        self.share_objects: bool = share_objects
+        self.zstd_dictionaries: Dict[str, bytes] = dict(zstd_dictionaries or {})
+        self._shared = SharedObjectCollector()
+        self._dictionaries = ZstdDictionaries(self.zstd_dictionaries)
+        self._extra_dictionaries: List[bytes] = []
+        self._spool_path = f'{record_file}.part'
+        self._spool = open(self._spool_path, 'wb')
+
+    def __enter__(self) -> 'DataRecordWriter':
+        """Enter the runtime context of the DataRecordWriter."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Write the record when leaving the runtime context, or discard it if an exception occurred."""
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        """Return the number of frames written so far."""
+        return len(self.frame_lengths)
+
+    def write(self, frame: Union[Frame, bytes]):
+        """Append a frame to the record.
+
+        Serialized frames that reference shared objects or zstd dictionaries of another record require
+        them to be added with `add_shared_objects` and `add_zstd_dictionaries`.
+
+        Args:
+            frame (Union[Frame, bytes]): The frame, or its serialized byte data including the checksum.
+
+        Raises:
+            ValueError: If the writer is already closed.
+        """
+        if self._spool is None:
+            raise ValueError("The record writer is already closed.")
+        if isinstance(frame, Frame) and self.share_objects:
+            with self._shared, self._dictionaries:
+                frame_bytes = frame.to_bytes()
+        elif isinstance(frame, Frame):
+            with self._dictionaries:
+                frame_bytes = frame.to_bytes()
+        else:
+            frame_bytes = frame
+        self._spool.write(frame_bytes)
+        self.frame_lengths.append(len(frame_bytes))
+
+    def add_shared_objects(self, shared_objects: List[bytes]):
+        """Add encoded shared objects to the record, e.g. `DataRecord.shared_objects` when copying serialized frames.
+
+        Args:
+            shared_objects (List[bytes]): The encoded shared objects.
+        """
+        for blob in shared_objects:
+            self._shared.objects.setdefault(get_shared_id(blob), blob)
+
+    def add_zstd_dictionaries(self, zstd_dictionaries: List[bytes]):
+        """Add zstd dictionaries to the record header, e.g. `DataRecord.zstd_dictionaries` when copying
+        serialized frames or passing their points through.
+
+        Args:
+            zstd_dictionaries (List[bytes]): The trained zstd dictionaries.
+        """
+        known = set(self.zstd_dictionaries.values()) | set(self._extra_dictionaries)
+        self._extra_dictionaries.extend(bytes(blob) for blob in zstd_dictionaries if bytes(blob) not in known)
+
+    def close(self):
+        """Write the header and the spooled frames to the record file and remove the spool file."""
+        if self._spool is None:
+            return
+        self._spool.close()
+        self._spool = None
+        with open(self.path, 'wb') as record_file, open(self._spool_path, 'rb') as spool:
+            zstd_dictionaries = list(self.zstd_dictionaries.values()) + self._extra_dictionaries
+            record_file.write(_header_to_bytes(self.frame_lengths, self._shared, zstd_dictionaries))
+            shutil.copyfileobj(spool, record_file, 16 * 1024 * 1024)
+        os.remove(self._spool_path)
+
+    def abort(self):
+        """Discard the spooled frames without writing the record file."""
+        if self._spool is None:
+            return
+        self._spool.close()
+        self._spool = None
+        os.remove(self._spool_path)
+
+
+_worker_record: Optional[DataRecord] = None
+
+
+def _init_worker_record(record_path: str, index: Optional[RecordIndex], verify: str, image_scale: int):
+    """Open the record that is decoded by a worker process of `DataRecord.iter_parallel`."""
+    global _worker_record
+    _worker_record = DataRecord(record_file=record_path, use_mmap=True, index=index, verify=verify,
+                                image_scale=image_scale)
+
+
+def _decode_worker_frame(frame_index: int, sensors: Optional[Iterable[str]]) -> Frame:
+    """Decode a frame of the record opened by `_init_worker_record`."""
+    return _worker_record._decode_frame(frame_index, sensors)
+
+
+class FrameHandle:
+    """Class referencing a single frame of a Dataloader by its record and index.
+
+    The record is only opened and the frame only decoded when they are requested. The handle can be
+    unpacked into the record and the frame index, e.g. `record, index = handle`.
+
+    Attributes:
+        record_path (str): Path to the record file containing the frame.
+        index (int): Index of the frame within its record.
+        timestamp_ns (int): The timestamp of the frame in nanoseconds.
+    """
+
+    def __init__(self, dataloader: 'Dataloader', record_path: str, index: int, timestamp_ns: int):
+        """Initialize a FrameHandle object.
+
+        Args:
+            dataloader (Dataloader): The Dataloader used to open the record.
+            record_path (str): Path to the record file containing the frame.
+            index (int): Index of the frame within its record.
+            timestamp_ns (int): The timestamp of the frame in nanoseconds.
+        """
+        self._dataloader = dataloader
+        self.record_path: str = record_path
+        self.index: int = index
+        self.timestamp_ns: int = timestamp_ns
+
+    def __repr__(self):
+        """Return a string representation of the FrameHandle object."""
+        return (
+            f"FrameHandle(\n"
+            f"    record={os.path.basename(self.record_path)},\n"
+            f"    index={self.index},\n"
+            f"    timestamp_ns={self.timestamp_ns}\n"
+            f")"
+        )
+
+    def __iter__(self):
+        """Make the handle unpackable into the record and the frame index."""
+        yield self.record
+        yield self.index
+
+    @property
+    def timestamp(self) -> Decimal:
+        """The timestamp of the frame in seconds."""
+        return Decimal(self.timestamp_ns).scaleb(-9)
+
+    @property
+    def record(self) -> DataRecord:
+        """The record containing the frame, opened on first access."""
+        return self._dataloader._get_open_record(self.record_path)
+
+    def get_frame(self) -> Frame:
+        """Decode the frame."""
+        return self.record[self.index]
 
 
 class Dataloader:
     """Class responsible for loading and managing AMEISE-Record files from a directory.
 
     This class scans a specified directory for all files with the .4mse extension
-    and provides access to these records.
+    and provides access to these records. If a record has a sidecar index (.4mse.idx),
+    the index is used to open the record and rebuilt when it is stale.
+
+    For distributed training, the frames of all records can be split into `world_size` disjoint shards,
+    balanced by bytes or by frames. Shards are contiguous ranges of frames that may cross record
+    boundaries. `iter_frames` only yields the frames of the shard of `rank`, while the record-level
+    access by index and iteration is not affected by sharding.
 
     Attributes:
         data_dir (str): The path to the directory containing .4mse files.
         record_map (List[str]): List of paths to .4mse files in the directory.
+        use_mmap (bool): Whether the records are memory-mapped instead of read into memory.
+        lazy (bool): Whether the sensors of the frames are only decoded on first attribute access.
+        use_index (bool): Whether sidecar indices are used when present.
+        cache (Optional[FrameCache]): The frame cache shared by all records, if one was provided.
+        verify (str): The verification policy of the frame checksums, one of 'always', 'once' or 'never'.
+        rank (int): The shard read by this Dataloader.
+        world_size (int): The number of shards.
+        shard_by (str): How the shards are balanced, either 'bytes' or 'frames'.
+        shuffle (bool): Whether the order of the records is reshuffled every epoch before sharding.
+        seed (int): The seed of the reshuffle, which must be the same on all ranks.
+        epoch (int): The current epoch, see `set_epoch`.
+        decode_threads (int): Number of threads decoding the sensors of a frame concurrently, see `DataRecord`.
+        image_scale (int): Denominator of the decode scale of the camera images, see `DataRecord`.
     """
+    _MAX_OPEN_RECORDS = 4  # Records kept referenced for frame handles
 
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, use_mmap: bool = False, lazy: bool = False, use_index: bool = True,
+                 cache: Optional[FrameCache] = None, verify: str = VERIFY_ALWAYS, rank: int = 0, world_size: int = 1,
+                 shard_by: str = SHARD_BY_BYTES, shuffle: bool = False, seed: int = 0, decode_threads: int = 0,
+                 image_scale: int = 1):
         """Initialize a Dataloader object with the specified data directory.
 
         Args:
             data_dir (str): The directory containing .4mse record files.
+            use_mmap (bool): If True, the records are memory-mapped instead of read into memory.
+                             Defaults to False.
+            lazy (bool): If True, the sensors of the frames are only decoded on first attribute access.
+                         Defaults to False.
+            use_index (bool): If True, sidecar indices are used when present. Defaults to True.
+            cache (Optional[FrameCache]): Frame cache shared by all records for frames accessed by index.
+                                          Defaults to None, which disables caching.
+            verify (str): The verification policy of the frame checksums, see `DataRecord`. Defaults to 'always'.
+            rank (int): The shard read by this Dataloader, from 0 to world_size - 1. Defaults to 0.
+            world_size (int): The number of shards. Defaults to 1, which reads all frames.
+            shard_by (str): Either 'bytes' to balance the shards by the encoded size of their frames,
+                            or 'frames' to balance them by their number of frames. Defaults to 'bytes'.
+            shuffle (bool): If True, the order of the records is reshuffled every epoch before sharding.
+                            Defaults to False.
+            seed (int): The seed of the reshuffle, which must be the same on all ranks. Defaults to 0.
+            decode_threads (int): Number of threads decoding the sensors of a frame concurrently, see `DataRecord`.
+                                  Defaults to 0.
+            image_scale (int): Denominator of the decode scale of the camera images, one of 1, 2, 4 or 8,
+                               see `DataRecord`. Defaults to 1, which decodes at full resolution.
+
+        Raises:
+            ValueError: If the verification policy, the sharding mode, the rank, the world size or the image scale
+                is invalid.
         """
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Unknown sharding mode '{shard_by}'. Expected one of {', '.join(SHARD_MODES)}.")
+        if world_size < 1 or not 0 <= rank < world_size:
+            raise ValueError(f"Invalid rank {rank} for world size {world_size}.")
+        if image_scale not in IMAGE_SCALES:
+            raise ValueError(f"Unsupported image scale {image_scale}. "
+                             f"Expected one of {', '.join(map(str, IMAGE_SCALES))}.")
         self.data_dir: str = os.path.join(data_dir)
         self.record_map: List[str] = sorted(glob.glob(os.path.join(self.data_dir, '*.4mse')))
+        self.use_mmap: bool = use_mmap
+        self.lazy: bool = lazy
+        self.use_index: bool = use_index
+        self.cache: Optional[FrameCache] = cache
+        self.verify: str = check_verify_mode(verify)
+        self._open_records: OrderedDict = OrderedDict()
+        self._timestamp_index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self.rank: int = rank
+        self.world_size: int = world_size
+        self.shard_by: str = shard_by
+        self.shuffle: bool = shuffle
+        self.seed: int = seed
+        self.epoch: int = 0
+        self.decode_threads: int = decode_threads
+        self.image_scale: int = image_scale
+        self._frame_lengths: Dict[str, np.ndarray] = {}
 
     def __len__(self):
         """Return the number of records found in the directory."""
@@ -160,10 +777,10 @@ class Dataloader:
         """
         if isinstance(item, slice):
             # Wenn item ein Slice ist, erstelle einen Generator für DataRecords
-            return (DataRecord(record_file=path) for path in self.record_map[item])
+            return (self._open_record(path) for path in self.record_map[item])
         elif isinstance(item, int):
             # Wenn item ein einzelner Index ist, gibt ein einzelnes DataRecord zurück
-            return DataRecord(record_file=self.record_map[item])
+            return self._open_record(self.record_map[item])
         else:
             raise TypeError("Index must be an integer or a slice")
 
@@ -174,4 +791,284 @@ class Dataloader:
             Iterator[DataRecord]: An iterator that yields DataRecord objects.
         """
         for record_path in self.record_map:
-            yield DataRecord(record_file=record_path)
+            yield self._open_record(record_path)
+
+    def iter_frames(self, sensors: Optional[Iterable[str]] = None, prefetch: int = 0,
+                    max_prefetch_bytes: Optional[int] = None) -> Iterator[Frame]:
+        """Iterate over the frames of all records, deserializing only the selected sensors.
+
+        With `prefetch`, the next records are opened and read in background threads while the frames
+        of the current record are consumed, so that the iteration does not stall at record boundaries.
+        Memory-mapped records are advised to be read ahead by the kernel instead. If the Dataloader is
+        sharded or shuffled, only the frames of the shard of `rank` in the current epoch are yielded.
+
+        Args:
+            sensors (Optional[Iterable[str]]): Sensors to deserialize, e.g. ['vehicle.lidars.TOP', 'tower.cameras'].
+                                               Defaults to None, which deserializes all sensors.
+            prefetch (int): Number of records that are opened ahead of the current record. Defaults to 0,
+                            which opens every record only when it is reached.
+            max_prefetch_bytes (Optional[int]): Maximum size of the record files that are held open at once,
+                                                including the current record. A record is prefetched anyway
+                                                if no other record is open. Defaults to None, which sets no limit.
+
+        Yields:
+            Iterator[Frame]: An iterator that yields the Frame objects of all records in order.
+        """
+        if self.world_size > 1 or self.shuffle:
+            shard = self.get_shard()
+        else:
+            shard = [(record_path, 0, None) for record_path in self.record_map]
+        if prefetch <= 0:
+            for record_path, start, stop in shard:
+                with self._open_record(record_path) as record:
+                    yield from record.iter_frames(sensors, start, stop)
+            return
+
+        selected = None if sensors is None else Frame.resolve_sensors(sensors)
+        record_paths = deque(shard)
+        pending = deque()
+
+        def submit_ahead(current_size: int):
+            # Keep `prefetch` records in flight besides the current one, within the byte budget
+            while record_paths and len(pending) < prefetch:
+                record_size = os.path.getsize(record_paths[0][0])
+                open_size = current_size + sum(size for _, size, _, _ in pending)
+                if (max_prefetch_bytes is not None and open_size > 0
+                        and open_size + record_size > max_prefetch_bytes):
+                    break
+                record_path, start, stop = record_paths.popleft()
+                pending.append((executor.submit(self._prefetch_record, record_path), record_size, start, stop))
+
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            try:
+                while record_paths or pending:
+                    if not pending:
+                        submit_ahead(0)
+                    future, current_size, start, stop = pending.popleft()
+                    submit_ahead(current_size)
+                    with future.result() as record:
+                        yield from record.iter_frames(selected, start, stop)
+            finally:
+                for future, _, _, _ in pending:
+                    if not future.cancel() and future.exception() is None:
+                        future.result().close()
+
+    def _prefetch_record(self, record_path: str) -> DataRecord:
+        """Open a record in the background and make sure its frame data is read, or read ahead if memory-mapped."""
+        record = self._open_record(record_path)
+        if record._mmap is not None and hasattr(mmap, 'MADV_WILLNEED'):
+            record._mmap.madvise(mmap.MADV_WILLNEED)
+        return record
+
+    def _open_record(self, record_path: str) -> DataRecord:
+        """Open a DataRecord with the settings of the Dataloader.
+
+        Args:
+            record_path (str): Path to the .4mse record file.
+
+        Returns:
+            DataRecord: The opened record.
+        """
+        index = self._load_index(record_path) if self.use_index else None
+        return DataRecord(record_file=record_path, use_mmap=self.use_mmap, lazy=self.lazy, index=index,
+                          cache=self.cache, verify=self.verify, decode_threads=self.decode_threads,
+                          image_scale=self.image_scale)
+
+    def get_index(self, item: int) -> Optional[RecordIndex]:
+        """Get the sidecar index of a record without opening the record.
+
+        A stale index is rebuilt and written back to disk.
+
+        Args:
+            item (int): The index of the record.
+
+        Returns:
+            Optional[RecordIndex]: The index of the record, or None if the record has no sidecar index.
+        """
+        return self._load_index(self.record_map[item])
+
+    @staticmethod
+    def _load_index(record_path: str) -> Optional[RecordIndex]:
+        """Load the sidecar index of a record file and rebuild it if it is stale or of an older version."""
+        index = RecordIndex.load(record_path)
+        has_sidecar = os.path.exists(RecordIndex.get_path(record_path))
+        if has_sidecar and (index is None or index.is_stale()):
+            index = Dataloader._build_index(record_path)
+        return index
+
+    @staticmethod
+    def _build_index(record_path: str, save: bool = True) -> RecordIndex:
+        """Build the index of a record file and write it as its sidecar if possible.
+
+        If the sidecar cannot be written, e.g. in a read-only dataset directory, the index is only used in memory.
+
+        Args:
+            record_path (str): Path to the .4mse record file.
+            save (bool): If False, the index is only used in memory. Defaults to True.
+
+        Returns:
+            RecordIndex: The built index.
+        """
+        with DataRecord(record_file=record_path, use_mmap=True) as record:
+            index = RecordIndex.build(record)
+        if not save:
+            return index
+        try:
+            index.save()
+        except OSError:
+            pass
+        return index
+
+    def build_indices(self, rebuild: bool = False):
+        """Write the sidecar index of every record in the directory.
+
+        Args:
+            rebuild (bool): If True, existing indices are rebuilt even if they are up to date. Defaults to False.
+        """
+        for record_path in self.record_map:
+            index = None if rebuild else RecordIndex.load(record_path)
+            if index is None or index.is_stale():
+                with DataRecord(record_file=record_path, use_mmap=True) as record:
+                    RecordIndex.build(record).save()
+
+    def _get_open_record(self, record_path: str) -> DataRecord:
+        """Return an opened record, keeping the most recently used records referenced for frame handles.
+
+        Records dropped from the most recently used records are not closed, as frame handles may have handed
+        them out, e.g. through `record, index = handle`. They are released once they are no longer referenced.
+        """
+        record = self._open_records.pop(record_path, None)
+        if record is None:
+            record = self._open_record(record_path)
+        self._open_records[record_path] = record
+        while len(self._open_records) > self._MAX_OPEN_RECORDS:
+            self._open_records.popitem(last=False)
+        return record
+
+    def _get_timestamp_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the timestamps of all frames of all records in ascending order.
+
+        The timestamps are taken from the sidecar indices of the records. Missing indices are built
+        and written to disk if possible. If `use_index` is False, the sidecars are neither read nor
+        written, and the indices are only built in memory. The result is computed once per Dataloader.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The sorted timestamps in nanoseconds, and for each
+                of them the position of the record in `record_map` and the index of the frame in the record.
+        """
+        if self._timestamp_index is None:
+            timestamps, record_ids, frame_indices = [], [], []
+            for record_id, record_path in enumerate(self.record_map):
+                index = self._load_index(record_path) if self.use_index else None
+                if index is None:
+                    index = self._build_index(record_path, save=self.use_index)
+                timestamps.append(index.timestamps_ns)
+                record_ids.append(np.full(len(index), record_id, dtype=np.int64))
+                frame_indices.append(np.arange(len(index), dtype=np.int64))
+            timestamps = np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64)
+            order = np.argsort(timestamps, kind='stable')
+            self._timestamp_index = (timestamps[order],
+                                     np.concatenate(record_ids)[order] if record_ids else order,
+                                     np.concatenate(frame_indices)[order] if frame_indices else order)
+        return self._timestamp_index
+
+    @staticmethod
+    def _to_timestamp_ns(timestamp: Union[Decimal, float, int, str]) -> int:
+        """Convert a timestamp in seconds, like `Frame.timestamp`, to nanoseconds."""
+        return int(Decimal(str(timestamp)).scaleb(9))
+
+    def _get_handle(self, position: int) -> FrameHandle:
+        """Create the handle of a frame by its position in the timestamp index."""
+        timestamps, record_ids, frame_indices = self._get_timestamp_index()
+        return FrameHandle(self, self.record_map[int(record_ids[position])], int(frame_indices[position]),
+                           int(timestamps[position]))
+
+    def frames_between(self, t0: Union[Decimal, float, int, str], t1: Union[Decimal, float, int, str]) \
+            -> List[FrameHandle]:
+        """Find all frames of all records with a timestamp between t0 and t1, both inclusive.
+
+        Args:
+            t0 (Union[Decimal, float, int, str]): The start of the time range in seconds.
+            t1 (Union[Decimal, float, int, str]): The end of the time range in seconds.
+
+        Returns:
+            List[FrameHandle]: Handles of the frames in ascending order of their timestamps.
+        """
+        timestamps, _, _ = self._get_timestamp_index()
+        start = np.searchsorted(timestamps, self._to_timestamp_ns(t0), side='left')
+        stop = np.searchsorted(timestamps, self._to_timestamp_ns(t1), side='right')
+        return [self._get_handle(position) for position in range(start, stop)]
+
+    def nearest_frame(self, t: Union[Decimal, float, int, str]) -> Optional[FrameHandle]:
+        """Find the frame of all records with the timestamp closest to t.
+
+        Args:
+            t (Union[Decimal, float, int, str]): The timestamp in seconds.
+
+        Returns:
+            Optional[FrameHandle]: Handle of the nearest frame, or None if there are no frames.
+        """
+        timestamps, _, _ = self._get_timestamp_index()
+        if len(timestamps) == 0:
+            return None
+        t_ns = self._to_timestamp_ns(t)
+        position = int(np.searchsorted(timestamps, t_ns))
+        if position == len(timestamps) or (
+                position > 0 and t_ns - timestamps[position - 1] <= timestamps[position] - t_ns):
+            position -= 1
+        return self._get_handle(position)
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch, which selects the order of the records if `shuffle` is enabled.
+
+        Call this on all ranks with the same epoch before iterating, so the shards stay disjoint.
+
+        Args:
+            epoch (int): The current epoch.
+        """
+        self.epoch = epoch
+
+    def get_shard(self, rank: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """Compute the frames of a shard in the current epoch.
+
+        The records are concatenated in the order of `record_map`, or in a permutation seeded by `seed` and
+        `epoch` if `shuffle` is enabled. The concatenated frames are split into `world_size` contiguous ranges,
+        so that every range holds about the same number of bytes or frames. The assignment only depends on
+        the record files, the seed and the epoch, and is therefore the same on all ranks.
+
+        Args:
+            rank (Optional[int]): The shard to compute. Defaults to None, which uses the rank of the Dataloader.
+
+        Returns:
+            List[Tuple[str, int, int]]: The record path, the index of the first frame and the index after
+                the last frame of every record range in the shard, in reading order.
+        """
+        rank = self.rank if rank is None else rank
+        record_paths = list(self.record_map)
+        if self.shuffle:
+            order = np.random.default_rng((self.seed, self.epoch)).permutation(len(record_paths))
+            record_paths = [record_paths[i] for i in order]
+
+        weights = [self._get_frame_lengths(path) if self.shard_by == SHARD_BY_BYTES
+                   else np.ones(len(self._get_frame_lengths(path)), dtype=np.int64) for path in record_paths]
+        record_starts = np.cumsum([0] + [len(w) for w in weights])
+        weights = np.concatenate(weights) if weights else np.empty(0, dtype=np.int64)
+        frame_starts = np.cumsum(weights) - weights
+        total = int(weights.sum())
+        # A frame belongs to the shard in which its first byte lies, compared in integers to avoid rounding
+        first = int(np.searchsorted(frame_starts * self.world_size, rank * total, side='left'))
+        last = int(np.searchsorted(frame_starts * self.world_size, (rank + 1) * total, side='left'))
+
+        shard = []
+        for record_path, record_start, record_stop in zip(record_paths, record_starts[:-1], record_starts[1:]):
+            start, stop = max(first, record_start), min(last, record_stop)
+            if start < stop:
+                shard.append((record_path, int(start - record_start), int(stop - record_start)))
+        return shard
+
+    def _get_frame_lengths(self, record_path: str) -> np.ndarray:
+        """Return the encoded size of every frame of a record, reading only the header of the record file."""
+        if record_path not in self._frame_lengths:
+            with DataRecord(record_file=record_path, use_mmap=True) as record:
+                self._frame_lengths[record_path] = np.array(record.frame_lengths, dtype=np.int64)
+        return self._frame_lengths[record_path]
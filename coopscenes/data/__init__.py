@@ -1,6 +1,6 @@
 from .metadata import CameraInformation, LidarInformation, IMUInformation, GNSSInformation, DynamicsInformation, \
     ROI, VehicleInformation, TowerInformation, ImageLabels
-from .data import Image, Points, Position, Motion, Velocity, Heading
+from .data import Image, Points, Position, Motion, Velocity, Heading, IMAGE_SCALES
 from .sensors import Lidar, Camera, IMU, GNSS, Dynamics
 from .agent import Tower, Vehicle, VisionSensorsVeh, VisionSensorsTow, LaserSensorsVeh, LaserSensorsTow
 from .frame import Frame
@@ -15,9 +15,109 @@ Classes:
 Each class provides methods to serialize and deserialize the sensor data, enabling the
 transfer and storage of complex sensor setups in a compact binary format.
 """
-from typing import Optional
+from typing import Optional, Dict, List, Tuple, Set
+from concurrent.futures import Executor
 from coopscenes.data import Camera, Lidar, IMU, GNSS, Dynamics, VehicleInformation, TowerInformation
-from coopscenes.miscellaneous import serialize, deserialize, INT_LENGTH, obj_to_bytes, obj_from_bytes, read_data_block
+from coopscenes.miscellaneous import serialize, deserialize, INT_LENGTH, obj_to_bytes, obj_from_bytes, read_data_block, \
+    read_block_span
+
+
+def _get_sensors_layout(data: bytes, offset: int, names: List[str]) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """Locate the length-prefixed blocks of a sensor group.
+
+    Args:
+        data (bytes): The byte stream containing the sensor group.
+        offset (int): Position of the first sensor block within the byte stream.
+        names (List[str]): Names of the sensors in the order they are serialized.
+
+    Returns:
+        tuple[Dict[str, Tuple[int, int]], int]: The start and end position of every non-empty sensor block,
+            keyed by sensor name, and the position after the sensor group.
+    """
+    layout = {}
+    for name in names:
+        start, offset = read_block_span(data, offset)
+        if offset > start:
+            layout[name] = (start, offset)
+    return layout, offset
+
+
+def _get_agent_layout(data: bytes, offset: int, agent) -> Dict[str, Tuple[int, int]]:
+    """Locate the information and sensor blocks of a serialized agent.
+
+    Args:
+        data (bytes): The byte stream containing the agent, without its length prefix.
+        offset (int): Position of the agent data within the byte stream.
+        agent (Union[Vehicle, Tower]): The agent class, which defines the camera and lidar groups
+            and the remaining sensors in the order they are serialized.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: The start and end position of every non-empty block, keyed by its
+            attribute path relative to the agent.
+    """
+    info_start, offset = read_block_span(data, offset)
+    layout = {'info': (info_start, offset)}
+    cameras, offset = agent._CAMERA_GROUP.get_layout(data, offset)
+    lidars, offset = agent._LIDAR_GROUP.get_layout(data, offset)
+    sensors, _ = _get_sensors_layout(data, offset, list(agent._SENSOR_TYPES))
+    layout.update({f'cameras.{name}': span for name, span in cameras.items()})
+    layout.update({f'lidars.{name}': span for name, span in lidars.items()})
+    layout.update(sensors)
+    return layout
+
+
+def _decode_sensor(sensor_type, data: bytes, *args):
+    """Deserialize a sensor block in a worker thread, decoding the pixels of camera images as well."""
+    sensor = sensor_type.from_bytes(data, *args)
+    if sensor_type is Camera and sensor._image_raw is not None:
+        sensor._image_raw.image.load()
+    return sensor
+
+
+def _agent_from_layout(agent, data: bytes, sensors: Set[str], lazy: bool, executor: Optional[Executor] = None,
+                       image_scale: int = 1):
+    """Deserialize only the selected sensors of a serialized agent.
+
+    Args:
+        agent (Union[Vehicle, Tower]): The agent class to deserialize.
+        data (bytes): The byte data of the agent, without its length prefix.
+        sensors (Set[str]): Attribute paths of the sensors to deserialize, relative to the agent.
+        lazy (bool): If True, the selected sensors are only decoded on first attribute access.
+        executor (Optional[Executor]): Thread pool to decode the selected sensors concurrently, including
+            the pixels of the camera images. Defaults to None.
+        image_scale (int): Denominator of the decode scale of the camera images. Defaults to 1.
+
+    Returns:
+        Union[Vehicle, Tower]: The agent with its information and the selected sensors. All other sensors are None.
+    """
+    layout = agent.get_layout(data)
+    instance = agent()
+    start, end = layout['info']
+    instance.info = obj_from_bytes(data[start:end])
+    for name in agent._SENSOR_TYPES:
+        setattr(instance, name, None)
+    pending = []
+    for key in sensors:
+        if key not in layout:
+            continue
+        start, end = layout[key]
+        group, _, name = key.rpartition('.')
+        args = ()
+        if group == 'cameras':
+            target, sensor_type, args = instance.cameras, Camera, (image_scale,)
+        elif group == 'lidars':
+            target, sensor_type = instance.lidars, Lidar
+        else:
+            target, sensor_type = instance, agent._SENSOR_TYPES[name]
+        if lazy:
+            setattr(target, name, sensor_type.lazy_from_bytes(data[start:end], *args))
+        elif executor is not None:
+            pending.append((target, name, executor.submit(_decode_sensor, sensor_type, data[start:end], *args)))
+        else:
+            setattr(target, name, sensor_type.from_bytes(data[start:end], *args))
+    for target, name, future in pending:
+        setattr(target, name, future.result())
+    return instance
 
 
 class VisionSensorsVeh:
@@ -72,7 +172,7 @@ class VisionSensorsVeh:
         return b''.join(serialize(getattr(self, name)) for name in self._CAMERA_NAMES)
 
     @classmethod
-    def from_bytes(cls, data) -> 'VisionSensorsVeh':
+    def from_bytes(cls, data, lazy: bool = False, image_scale: int = 1) -> 'VisionSensorsVeh':
         """Deserialize bytes to create a VisionSensorsVeh object.
 
         This method deserializes a byte stream into a `VisionSensorsVeh` object,
@@ -81,16 +181,32 @@ class VisionSensorsVeh:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the cameras are only decoded on first attribute access. Defaults to False.
+            image_scale (int): Denominator of the decode scale of the images, see `Image.from_bytes`. Defaults to 1.
 
         Returns:
             VisionSensorsVeh: The deserialized VisionSensorsVeh object, with camera sensors re-initialized.
         """
         instance = cls()
         for name in cls._CAMERA_NAMES:
-            camera, data = deserialize(data, Camera)
+            camera, data = deserialize(data, Camera, image_scale, lazy=lazy)
             setattr(instance, name, camera)
         return instance, data
 
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Tuple[Dict[str, Tuple[int, int]], int]:
+        """Locate the serialized camera blocks without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized cameras.
+            offset (int): Position of the first camera block within `data`. Defaults to 0.
+
+        Returns:
+            tuple[Dict[str, Tuple[int, int]], int]: The start and end position of every non-empty camera block,
+                keyed by camera name, and the position after the last camera block.
+        """
+        return _get_sensors_layout(data, offset, cls._CAMERA_NAMES)
+
 
 class LaserSensorsVeh:
     """Class representing a grouping of laser sensors for a vehicle.
@@ -135,7 +251,7 @@ class LaserSensorsVeh:
         return b''.join(serialize(getattr(self, name)) for name in self._LIDAR_NAMES)
 
     @classmethod
-    def from_bytes(cls, data) -> 'LaserSensorsVeh':
+    def from_bytes(cls, data, lazy: bool = False) -> 'LaserSensorsVeh':
         """Deserialize bytes to create a LaserSensorsVeh object.
 
         This method deserializes a byte stream into a `LaserSensorsVeh` object,
@@ -144,16 +260,31 @@ class LaserSensorsVeh:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the lidars are only decoded on first attribute access. Defaults to False.
 
         Returns:
             LaserSensorsVeh: The deserialized LaserSensorsVeh object, with lidar sensors re-initialized.
         """
         instance = cls()
         for name in cls._LIDAR_NAMES:
-            lidar, data = deserialize(data, Lidar)
+            lidar, data = deserialize(data, Lidar, lazy=lazy)
             setattr(instance, name, lidar)
         return instance, data
 
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Tuple[Dict[str, Tuple[int, int]], int]:
+        """Locate the serialized lidar blocks without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized lidars.
+            offset (int): Position of the first lidar block within `data`. Defaults to 0.
+
+        Returns:
+            tuple[Dict[str, Tuple[int, int]], int]: The start and end position of every non-empty lidar block,
+                keyed by lidar name, and the position after the last lidar block.
+        """
+        return _get_sensors_layout(data, offset, cls._LIDAR_NAMES)
+
 
 class VisionSensorsTow:
     """Class representing a grouping of vision sensors for a tower.
@@ -194,7 +325,7 @@ class VisionSensorsTow:
         return b''.join(serialize(getattr(self, name)) for name in self._CAMERA_NAMES)
 
     @classmethod
-    def from_bytes(cls, data) -> 'VisionSensorsTow':
+    def from_bytes(cls, data, lazy: bool = False, image_scale: int = 1) -> 'VisionSensorsTow':
         """Deserialize bytes to create a VisionSensorsTow object.
 
         This method deserializes a byte stream into a `VisionSensorsTow` object,
@@ -203,16 +334,32 @@ class VisionSensorsTow:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the cameras are only decoded on first attribute access. Defaults to False.
+            image_scale (int): Denominator of the decode scale of the images, see `Image.from_bytes`. Defaults to 1.
 
         Returns:
             VisionSensorsTow: The deserialized VisionSensorsTow object, with camera sensors re-initialized.
         """
         instance = cls()
         for name in cls._CAMERA_NAMES:
-            camera, data = deserialize(data, Camera)
+            camera, data = deserialize(data, Camera, image_scale, lazy=lazy)
             setattr(instance, name, camera)
         return instance, data
 
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Tuple[Dict[str, Tuple[int, int]], int]:
+        """Locate the serialized camera blocks without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized cameras.
+            offset (int): Position of the first camera block within `data`. Defaults to 0.
+
+        Returns:
+            tuple[Dict[str, Tuple[int, int]], int]: The start and end position of every non-empty camera block,
+                keyed by camera name, and the position after the last camera block.
+        """
+        return _get_sensors_layout(data, offset, cls._CAMERA_NAMES)
+
 
 class LaserSensorsTow:
     """Class representing a grouping of laser sensors for a tower.
@@ -255,7 +402,7 @@ class LaserSensorsTow:
         return b''.join(serialize(getattr(self, name)) for name in self._LIDAR_NAMES)
 
     @classmethod
-    def from_bytes(cls, data) -> 'LaserSensorsTow':
+    def from_bytes(cls, data, lazy: bool = False) -> 'LaserSensorsTow':
         """Deserialize bytes to create a LaserSensorsTow object.
 
         This method deserializes a byte stream into a `LaserSensorsTow` object,
@@ -264,16 +411,31 @@ class LaserSensorsTow:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the lidars are only decoded on first attribute access. Defaults to False.
 
         Returns:
             LaserSensorsTow: The deserialized LaserSensorsTow object, with lidar sensors re-initialized.
         """
         instance = cls()
         for name in cls._LIDAR_NAMES:
-            lidar, data = deserialize(data, Lidar)
+            lidar, data = deserialize(data, Lidar, lazy=lazy)
             setattr(instance, name, lidar)
         return instance, data
 
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Tuple[Dict[str, Tuple[int, int]], int]:
+        """Locate the serialized lidar blocks without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized lidars.
+            offset (int): Position of the first lidar block within `data`. Defaults to 0.
+
+        Returns:
+            tuple[Dict[str, Tuple[int, int]], int]: The start and end position of every non-empty lidar block,
+                keyed by lidar name, and the position after the last lidar block.
+        """
+        return _get_sensors_layout(data, offset, cls._LIDAR_NAMES)
+
 
 class Tower:
     """Class representing a tower with grouped sensors and relevant information.
@@ -285,6 +447,10 @@ class Tower:
         GNSS (Optional[GNSS]): GNSS sensor data for the tower.
     """
 
+    _CAMERA_GROUP = VisionSensorsTow
+    _LIDAR_GROUP = LaserSensorsTow
+    _SENSOR_TYPES = {'GNSS': GNSS}
+
     def __init__(self, info: Optional[TowerInformation] = None):
         """Initialize the Tower object.
 
@@ -310,7 +476,8 @@ class Tower:
         return len(tower_bytes).to_bytes(INT_LENGTH, 'big') + tower_bytes
 
     @classmethod
-    def from_bytes(cls, data) -> 'Tower':
+    def from_bytes(cls, data, lazy: bool = False, sensors: Optional[Set[str]] = None,
+                   executor: Optional[Executor] = None, image_scale: int = 1) -> 'Tower':
         """Deserialize bytes to create a Tower object.
 
         This method deserializes a byte stream into a `Tower` object, including its
@@ -320,18 +487,53 @@ class Tower:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the sensors are only decoded on first attribute access. Defaults to False.
+            sensors (Optional[Set[str]]): Attribute paths of the sensors to deserialize, e.g. 'lidars.TOP'.
+                                          All other sensors are skipped and set to None. Defaults to None,
+                                          which deserializes all sensors.
+            executor (Optional[Executor]): Thread pool to decode the sensors concurrently, see `Frame.from_bytes`.
+                                           Ignored in lazy mode. Defaults to None, which decodes the sensors
+                                           one after another.
+            image_scale (int): Denominator of the decode scale of the camera images, see `Image.from_bytes`.
+                               Defaults to 1.
 
         Returns:
             Tower: The deserialized Tower object, with all sensors and information re-initialized.
         """
+        if executor is not None and not lazy:
+            return _agent_from_layout(cls, data, set(cls.get_sensor_names()) if sensors is None else sensors,
+                                      lazy, executor, image_scale)
+        if sensors is not None:
+            return _agent_from_layout(cls, data, sensors, lazy, image_scale=image_scale)
         instance = cls()
         info_bytes, data = read_data_block(data)
         setattr(instance, 'info', obj_from_bytes(info_bytes))
-        instance.cameras, data = VisionSensorsTow.from_bytes(data)
-        instance.lidars, data = LaserSensorsTow.from_bytes(data)
-        instance.GNSS, _ = deserialize(data, GNSS)
+        instance.cameras, data = VisionSensorsTow.from_bytes(data, lazy, image_scale)
+        instance.lidars, data = LaserSensorsTow.from_bytes(data, lazy)
+        instance.GNSS, _ = deserialize(data, GNSS, lazy=lazy)
         return instance
 
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Dict[str, Tuple[int, int]]:
+        """Locate the serialized information and sensor blocks of a tower without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized tower, without its length prefix.
+            offset (int): Position of the tower data within `data`. Defaults to 0.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: The start and end position of every non-empty block, keyed by its
+                attribute path relative to the tower, e.g. 'info', 'cameras.VIEW_1' or 'GNSS'.
+        """
+        return _get_agent_layout(data, offset, cls)
+
+    @classmethod
+    def get_sensor_names(cls) -> List[str]:
+        """Return the attribute paths of all sensors of a tower, e.g. 'cameras.VIEW_1' or 'GNSS'."""
+        return ([f'cameras.{name}' for name in cls._CAMERA_GROUP._CAMERA_NAMES]
+                + [f'lidars.{name}' for name in cls._LIDAR_GROUP._LIDAR_NAMES]
+                + list(cls._SENSOR_TYPES))
+
 
 class Vehicle:
     """Class representing a vehicle with grouped sensors and relevant information.
@@ -345,6 +547,10 @@ class Vehicle:
         DYNAMICS (Dynamics): Dynamic state data for the vehicle.
     """
 
+    _CAMERA_GROUP = VisionSensorsVeh
+    _LIDAR_GROUP = LaserSensorsVeh
+    _SENSOR_TYPES = {'IMU': IMU, 'GNSS': GNSS, 'DYNAMICS': Dynamics}
+
     def __init__(self, info: Optional[VehicleInformation] = None):
         """Initialize the Vehicle object.
 
@@ -379,7 +585,8 @@ class Vehicle:
         return len(vehicle_bytes).to_bytes(INT_LENGTH, 'big') + vehicle_bytes
 
     @classmethod
-    def from_bytes(cls, data) -> 'Vehicle':
+    def from_bytes(cls, data, lazy: bool = False, sensors: Optional[Set[str]] = None,
+                   executor: Optional[Executor] = None, image_scale: int = 1) -> 'Vehicle':
         """Deserialize bytes to create a Vehicle object.
 
         This method deserializes a byte stream into a `Vehicle` object, including its
@@ -388,16 +595,51 @@ class Vehicle:
 
         Args:
             data (bytes): The byte data to deserialize.
+            lazy (bool): If True, the sensors are only decoded on first attribute access. Defaults to False.
+            sensors (Optional[Set[str]]): Attribute paths of the sensors to deserialize, e.g. 'lidars.TOP'.
+                                          All other sensors are skipped and set to None. Defaults to None,
+                                          which deserializes all sensors.
+            executor (Optional[Executor]): Thread pool to decode the sensors concurrently, see `Frame.from_bytes`.
+                                           Ignored in lazy mode. Defaults to None, which decodes the sensors
+                                           one after another.
+            image_scale (int): Denominator of the decode scale of the camera images, see `Image.from_bytes`.
+                               Defaults to 1.
 
         Returns:
             Vehicle: The deserialized Vehicle object, with all sensors and information re-initialized.
         """
+        if executor is not None and not lazy:
+            return _agent_from_layout(cls, data, set(cls.get_sensor_names()) if sensors is None else sensors,
+                                      lazy, executor, image_scale)
+        if sensors is not None:
+            return _agent_from_layout(cls, data, sensors, lazy, image_scale=image_scale)
         instance = cls()
         info_bytes, data = read_data_block(data)
         setattr(instance, 'info', obj_from_bytes(info_bytes))
-        instance.cameras, data = VisionSensorsVeh.from_bytes(data)
-        instance.lidars, data = LaserSensorsVeh.from_bytes(data)
-        instance.IMU, data = deserialize(data, IMU)
-        instance.GNSS, data = deserialize(data, GNSS)
-        instance.DYNAMICS, _ = deserialize(data, Dynamics)
+        instance.cameras, data = VisionSensorsVeh.from_bytes(data, lazy, image_scale)
+        instance.lidars, data = LaserSensorsVeh.from_bytes(data, lazy)
+        instance.IMU, data = deserialize(data, IMU, lazy=lazy)
+        instance.GNSS, data = deserialize(data, GNSS, lazy=lazy)
+        instance.DYNAMICS, _ = deserialize(data, Dynamics, lazy=lazy)
         return instance
+
+    @classmethod
+    def get_layout(cls, data, offset: int = 0) -> Dict[str, Tuple[int, int]]:
+        """Locate the serialized information and sensor blocks of a vehicle without deserializing them.
+
+        Args:
+            data (bytes): The byte data containing the serialized vehicle, without its length prefix.
+            offset (int): Position of the vehicle data within `data`. Defaults to 0.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: The start and end position of every non-empty block, keyed by its
+                attribute path relative to the vehicle, e.g. 'info', 'lidars.TOP' or 'IMU'.
+        """
+        return _get_agent_layout(data, offset, cls)
+
+    @classmethod
+    def get_sensor_names(cls) -> List[str]:
+        """Return the attribute paths of all sensors of a vehicle, e.g. 'lidars.TOP' or 'IMU'."""
+        return ([f'cameras.{name}' for name in cls._CAMERA_GROUP._CAMERA_NAMES]
+                + [f'lidars.{name}' for name in cls._LIDAR_GROUP._LIDAR_NAMES]
+                + list(cls._SENSOR_TYPES))
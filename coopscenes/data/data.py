@@ -19,13 +19,26 @@ from typing import Optional, Dict, List
 from decimal import Decimal
 from PIL import Image as PilImage
 from coopscenes.miscellaneous import read_data_block, TimestampMixin, ReprFormaterMixin, Config, obj_to_bytes, \
-    obj_from_bytes
+    obj_from_bytes, register_type, decompress_array
 from coopscenes.data import ImageLabels
 import numpy as np
 from io import BytesIO
 import zstandard as zstd
+import cv2
 
+IMAGE_SCALES = (1, 2, 4, 8)  # Denominators of the decode scales supported by JPEG DCT-domain downscaling
 
+# OpenCV decode flags for the JPEG modes and scales that can be decoded without PIL
+_IMREAD_FLAGS = {
+    'L': {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+          8: cv2.IMREAD_REDUCED_GRAYSCALE_8},
+    'RGB': {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8},
+}
+_IMREAD_COLOR_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)  # Decodes in RGB order, available since OpenCV 4.10
+
+
+@register_type(16, ['timestamp', 'linear_velocity', 'angular_velocity', 'covariance'])
 class Velocity(TimestampMixin, ReprFormaterMixin):
     """Class representing velocity data, including timestamp, linear and angular velocities, and covariance.
 
@@ -68,6 +81,7 @@ class Velocity(TimestampMixin, ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(17, ['timestamp', 'orientation', 'covariance'])
 class Heading(TimestampMixin, ReprFormaterMixin):
     """Class representing heading/orientation data with timestamp and covariance.
 
@@ -104,6 +118,8 @@ class Heading(TimestampMixin, ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(18, ['timestamp', 'orientation', 'orientation_covariance', 'angular_velocity',
+                    'angular_velocity_covariance', 'linear_acceleration', 'linear_acceleration_covariance'])
 class Motion(TimestampMixin, ReprFormaterMixin):
     """Class representing motion data including orientation, velocity, and acceleration.
 
@@ -157,6 +173,8 @@ class Motion(TimestampMixin, ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(19, ['timestamp', 'status', 'services', 'latitude', 'longitude', 'altitude', 'covariance',
+                    'covariance_type'])
 class Position(TimestampMixin, ReprFormaterMixin):
     """Class representing position information including latitude, longitude, and altitude.
 
@@ -249,6 +267,9 @@ class Image(TimestampMixin):
         self.image = image
         self.timestamp = timestamp
         self.labels = labels
+        self._img_bytes: Optional[bytes] = None
+        self._img_source: Optional[PilImage] = None
+        self._scale: int = 1
 
     def __getattr__(self, attr) -> PilImage:
         """
@@ -260,20 +281,56 @@ class Image(TimestampMixin):
         Raises:
             AttributeError: If the attribute does not exist.
         """
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
         if hasattr(self.image, attr):
             return getattr(self.image, attr)
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
 
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Return the image as a numpy array, e.g. for `np.array(image)`, see `to_numpy`."""
+        array = self.to_numpy()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def to_numpy(self) -> np.ndarray:
+        """Decode the image into a numpy array without going through PIL.
+
+        A JPEG image that was deserialized and has neither been decoded by PIL nor replaced is decoded from
+        its compressed data with OpenCV straight into the array, at the decode scale of the image. This saves
+        the decoding into PIL and the copy into numpy. All other images are converted from PIL.
+
+        Returns:
+            np.ndarray: A new, writable array of shape (height, width) or (height, width, channels), with the
+                channels in the order of PIL, e.g. RGB.
+        """
+        image = self.image
+        img_bytes = getattr(self, '_img_bytes', None)
+        if img_bytes is not None and image is getattr(self, '_img_source', None) and image.format == 'JPEG' \
+                and image.mode in _IMREAD_FLAGS and image.tile:
+            flags = _IMREAD_FLAGS[image.mode][self._scale]
+            to_rgb = image.mode == 'RGB'
+            if to_rgb and _IMREAD_COLOR_RGB is not None:
+                flags, to_rgb = (flags & ~cv2.IMREAD_COLOR) | _IMREAD_COLOR_RGB, False
+            array = cv2.imdecode(np.frombuffer(img_bytes, dtype=np.uint8), flags)
+            # The reduced size may differ from the one of PIL for images smaller than the scale
+            if array is not None and array.shape[1::-1] == image.size:
+                if to_rgb:
+                    cv2.cvtColor(array, cv2.COLOR_BGR2RGB, dst=array)
+                return array
+        return np.array(image)
+
     def to_bytes(self) -> bytes:
         """Serialize the image to bytes using PNG compression.
         Returns:
             bytes: Serialized byte representation of the compressed image and timestamp.
         """
-        if Config.REPACK:
+        # Images decoded at a reduced scale are re-encoded, so they stay consistent with their scaled labels
+        if Config.REPACK and Config.REPACK_IMAGES and getattr(self, '_img_bytes', None) is not None \
+                and getattr(self, '_scale', 1) == 1:
             encoded_img = self._img_bytes
         else:
             img_byte_arr = BytesIO()
-            self.image.save(img_byte_arr, format='JPEG', quality=85)
+            self.image.save(img_byte_arr, format='JPEG', quality=Config.JPEG_QUALITY)
             encoded_img = img_byte_arr.getvalue()
 
         encoded_ts = str(self.timestamp).encode('utf-8')
@@ -283,27 +340,53 @@ class Image(TimestampMixin):
         return img_len + encoded_img + ts_len + encoded_ts + obj_to_bytes(self.labels)
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'Image':
+    def from_bytes(cls, data: bytes, scale: int = 1) -> 'Image':
         """Deserialize bytes to create an Image object from PNG or JPEG-compressed data.
+
+        With a scale, JPEG images are decoded at reduced resolution by downscaling in the DCT domain,
+        which is much faster than decoding the full image. Other formats are reduced after decoding.
+        The 2D bounding boxes of the labels are scaled to the reduced image.
+
         Args:
             data (bytes): The serialized byte data to deserialize.
+            scale (int): Denominator of the decode scale, one of 1, 2, 4 or 8, e.g. 4 for a quarter of
+                         the width and height. Defaults to 1, which decodes at full resolution.
 
         Returns:
             Image: The deserialized Image object.
+
+        Raises:
+            ValueError: If the scale is not supported.
         """
+        if scale not in IMAGE_SCALES:
+            raise ValueError(f"Unsupported image scale {scale}. Expected one of {', '.join(map(str, IMAGE_SCALES))}.")
         img_bytes, data = read_data_block(data)
         ts_bytes, data = read_data_block(data)
         lbl_bytes, _ = read_data_block(data)
 
         img_instance = cls()
-        img_instance.timestamp = Decimal(ts_bytes.decode('utf-8'))
+        img_instance.timestamp = Decimal(str(ts_bytes, 'utf-8'))
         img_instance.labels = obj_from_bytes(lbl_bytes)
 
-        if Config.REPACK:
-            img_instance._img_bytes = img_bytes
+        # PIL reads the stream lazily, so the compressed image is detached from the frame data once.
+        # It is kept for repacking and `to_numpy`, which costs no memory as the stream shares it.
+        img_bytes = bytes(img_bytes)
+        img_instance._img_bytes = img_bytes
+        img_instance._scale = scale
 
         img_stream = BytesIO(img_bytes)
         img_instance.image = PilImage.open(img_stream)
+        if scale > 1:
+            width, height = img_instance.image.size
+            if img_instance.image.format == 'JPEG':
+                # The decoder rounds the reduced size up, so the request is rounded down to select the scale
+                img_instance.image.draft(img_instance.image.mode, (max(1, width // scale), max(1, height // scale)))
+            else:
+                img_instance.image = img_instance.image.reduce(scale)
+            if img_instance.labels is not None:
+                reduced_width, reduced_height = img_instance.image.size
+                img_instance.labels = img_instance.labels.scaled(reduced_width / width, reduced_height / height)
+        img_instance._img_source = img_instance.image
 
         return img_instance
 
@@ -339,10 +422,16 @@ class Points(TimestampMixin):
         Raises:
             AttributeError: If the attribute does not exist.
         """
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
         if hasattr(self.points, attr):
             return getattr(self.points, attr)
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
 
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Return the points as a numpy array, e.g. for `np.array(points)`."""
+        return np.asarray(self.points, dtype=dtype)
+
     def __getitem__(self, index: int) -> np.array:
         """Enable subscriptable access to the points array.
 
@@ -356,17 +445,23 @@ class Points(TimestampMixin):
             return self.points[index]
         raise IndexError(f"'{type(self).__name__}' object has no points data to index.")
 
-    def to_bytes(self) -> bytes:
+    def to_bytes(self, dictionary: Optional[zstd.ZstdCompressionDict] = None) -> bytes:
         """Serialize the points data to bytes.
 
+        Args:
+            dictionary (Optional[zstd.ZstdCompressionDict]): Trained dictionary to compress the points with.
+                It must be registered with `register_zstd_dictionaries` to decompress the points again.
+                Defaults to None, which compresses without a dictionary.
+
         Returns:
             bytes: Serialized byte representation of the points and timestamp.
         """
-        if Config.REPACK:
+        if Config.REPACK and Config.REPACK_POINTS:
             compressed_pts = self._pts_bytes
         else:
             encoded_pts = self.points.tobytes()
-            compressor = zstd.ZstdCompressor(level=22)
+            compressor = zstd.ZstdCompressor(level=Config.ZSTD_LEVEL, dict_data=dictionary,
+                                             threads=Config.ZSTD_THREADS)
             compressed_pts = compressor.compress(encoded_pts)
 
         encoded_ts = str(self.timestamp).encode('utf-8')
@@ -378,24 +473,27 @@ class Points(TimestampMixin):
     def from_bytes(cls, data: bytes, dtype: np.dtype) -> 'Points':
         """Deserialize bytes to create a Points object.
 
+        The points are decompressed with the pooled decompression context of the current thread
+        directly into a new writable array.
+
         Args:
             data (bytes): The serialized byte data to deserialize.
             dtype (np.dtype): The data type of the points.
 
         Returns:
             Points: The deserialized Points object.
+
+        Raises:
+            ValueError: If the points were compressed with a dictionary that is not registered.
         """
         pts_bytes, data = read_data_block(data)
 
-        decompressor = zstd.ZstdDecompressor()
-        pts_bytes_uncompressed = decompressor.decompress(pts_bytes)
-
         ts_bytes, _ = read_data_block(data)
         pts_instance = cls()
-        pts_instance.timestamp = Decimal(ts_bytes.decode('utf-8'))
+        pts_instance.timestamp = Decimal(str(ts_bytes, 'utf-8'))
 
         if Config.REPACK:
-            pts_instance._pts_bytes = pts_bytes
+            pts_instance._pts_bytes = bytes(pts_bytes)
 
-        pts_instance.points = np.frombuffer(pts_bytes_uncompressed, dtype=dtype)
+        pts_instance.points = decompress_array(pts_bytes, dtype)
         return pts_instance
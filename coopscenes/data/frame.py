@@ -10,12 +10,19 @@ Classes:
 Functions:
     to_bytes: Serializes the `Frame` object to a byte stream, including a checksum for data integrity.
     from_bytes: Deserializes a byte stream to create a `Frame` object, verifying the checksum.
+    verify_checksum: Checks the checksum of a serialized frame without deserializing it.
+    get_layout: Locates the serialized metadata and sensor blocks of a frame without deserializing them.
+    get_sensor_names: Returns the attribute paths of all sensors of a frame.
+    resolve_sensors: Expands a sensor selection like 'vehicle.lidars' into the attribute paths of single sensors.
+    metadata_from_bytes: Deserializes only the frame ID, timestamp and version of a serialized frame.
     is_complete: Checks if all sensors in the `Frame` are filled.
     get_timestamp: Converts the frame's timestamp to a formatted UTC string with specified precision.
 """
+from typing import Dict, Tuple, Iterable, List, Optional, Set
+from concurrent.futures import Executor
 from decimal import Decimal
-from coopscenes.miscellaneous import obj_to_bytes, obj_from_bytes, read_data_block, compute_checksum, \
-    ChecksumError, TimestampMixin, ReprFormaterMixin
+from coopscenes.miscellaneous import obj_to_bytes, obj_from_bytes, read_data_block, read_block_span, compute_checksum, \
+    ChecksumError, TimestampMixin, ReprFormaterMixin, SHA256_CHECKSUM_LENGTH
 from coopscenes.data import Tower, Vehicle, VisionSensorsVeh, VisionSensorsTow, LaserSensorsVeh, LaserSensorsTow
 from coopscenes.miscellaneous.helper import read_checksum
 
@@ -88,22 +95,42 @@ class Frame(TimestampMixin, ReprFormaterMixin):
         return safe_frame_bytes
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> "Frame":
+    def from_bytes(cls, data: bytes, lazy: bool = False, sensors: Optional[Iterable[str]] = None,
+                   verify: bool = True, executor: Optional[Executor] = None, image_scale: int = 1) -> "Frame":
         """Deserialize bytes to create a Frame object, verifying the checksum for data integrity.
 
+        In lazy mode, every sensor only keeps the span of `data` that holds its serialized block and
+        decodes it on first attribute access, so sensors that are never accessed are never decoded.
+        With a sensor selection, only the selected sensors are deserialized and all other sensors are None.
+        With a thread pool executor, the sensor blocks of each agent are decoded concurrently. zstd and the
+        JPEG decoder release the GIL, so the lidars and cameras are decompressed in parallel. In this mode
+        the pixels of the camera images are decoded right away instead of on first access.
+
         Args:
             data (bytes): The serialized byte data to deserialize.
+            lazy (bool): If True, the sensors are only decoded on first attribute access. Defaults to False.
+            sensors (Optional[Iterable[str]]): Sensors to deserialize, e.g. ['vehicle.lidars.TOP', 'tower.cameras'].
+                                               Defaults to None, which deserializes all sensors.
+            verify (bool): If True, the checksum of the frame is verified. Defaults to True.
+            executor (Optional[Executor]): Thread pool to decode the sensors concurrently, e.g. a
+                                           `ThreadPoolExecutor`. Ignored in lazy mode. Defaults to None,
+                                           which decodes the sensors one after another.
+            image_scale (int): Denominator of the decode scale of the camera images, one of 1, 2, 4 or 8,
+                               see `Image.from_bytes`. Defaults to 1, which decodes at full resolution.
 
         Returns:
             Frame: The deserialized Frame object.
 
         Raises:
             ChecksumError: If the checksum of the data does not match, indicating possible corruption.
+            ValueError: If an unknown sensor is selected.
         """
+        selected = None if sensors is None else cls.resolve_sensors(sensors)
+
         # Extract and verify checksum
-        frame_checksum, data = read_checksum(data)
-        if compute_checksum(data) != frame_checksum:
+        if verify and not cls.verify_checksum(data):
             raise ChecksumError("Checksum mismatch. Data might be corrupted!")
+        _, data = read_checksum(data)
 
         # Deserialize metadata, vehicle, and tower blocks
         meta_bytes, data = read_data_block(data)
@@ -115,10 +142,98 @@ class Frame(TimestampMixin, ReprFormaterMixin):
         frame = cls(frame_id=meta_data[0], timestamp=meta_data[1], version=meta_data[2])
 
         # Deserialize vehicle and tower data
-        frame.vehicle = Vehicle.from_bytes(vehicle_bytes)
-        frame.tower = Tower.from_bytes(tower_bytes)
+        if selected is None:
+            frame.vehicle = Vehicle.from_bytes(vehicle_bytes, lazy, executor=executor, image_scale=image_scale)
+            frame.tower = Tower.from_bytes(tower_bytes, lazy, executor=executor, image_scale=image_scale)
+        else:
+            frame.vehicle = Vehicle.from_bytes(vehicle_bytes, lazy, {key[8:] for key in selected
+                                                                     if key.startswith('vehicle.')}, executor,
+                                               image_scale)
+            frame.tower = Tower.from_bytes(tower_bytes, lazy, {key[6:] for key in selected
+                                                               if key.startswith('tower.')}, executor, image_scale)
         return frame
 
+    @staticmethod
+    def verify_checksum(data: bytes) -> bool:
+        """Check the checksum of a serialized frame without deserializing it.
+
+        Args:
+            data (bytes): The serialized byte data of the frame, including the checksum.
+
+        Returns:
+            bool: True if the checksum matches the frame data, False otherwise.
+        """
+        frame_checksum, data = read_checksum(data)
+        return compute_checksum(data) == frame_checksum
+
+    @staticmethod
+    def get_sensor_names() -> List[str]:
+        """Return the attribute paths of all sensors of a frame, e.g. 'vehicle.lidars.TOP' or 'tower.GNSS'."""
+        return ([f'vehicle.{name}' for name in Vehicle.get_sensor_names()]
+                + [f'tower.{name}' for name in Tower.get_sensor_names()])
+
+    @classmethod
+    def resolve_sensors(cls, sensors: Iterable[str]) -> Set[str]:
+        """Expand a sensor selection into the attribute paths of single sensors.
+
+        A selection entry is either the path of a single sensor, e.g. 'vehicle.lidars.TOP', or a prefix
+        selecting a group of sensors, e.g. 'vehicle.lidars' or 'tower'.
+
+        Args:
+            sensors (Iterable[str]): The sensor selection.
+
+        Returns:
+            Set[str]: The attribute paths of all selected sensors.
+
+        Raises:
+            ValueError: If an entry does not match any sensor.
+        """
+        sensors = [sensors] if isinstance(sensors, str) else sensors
+        sensor_names = cls.get_sensor_names()
+        selected = set()
+        for entry in sensors:
+            matches = [name for name in sensor_names if name == entry or name.startswith(f'{entry}.')]
+            if not matches:
+                raise ValueError(f"Unknown sensor '{entry}'.")
+            selected.update(matches)
+        return selected
+
+    @staticmethod
+    def get_layout(data: bytes) -> Dict[str, Tuple[int, int]]:
+        """Locate the serialized metadata and sensor blocks of a frame without deserializing them.
+
+        Neither the checksum is verified nor is any data copied.
+
+        Args:
+            data (bytes): The serialized byte data of the frame, including the checksum.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: The start and end position of every non-empty block within `data`,
+                keyed by its attribute path, e.g. 'meta', 'vehicle.info', 'vehicle.lidars.TOP' or 'tower.GNSS'.
+        """
+        meta_start, meta_end = read_block_span(data, SHA256_CHECKSUM_LENGTH)
+        vehicle_start, vehicle_end = read_block_span(data, meta_end)
+        tower_start, _ = read_block_span(data, vehicle_end)
+
+        layout = {'meta': (meta_start, meta_end)}
+        layout.update({f'vehicle.{key}': span for key, span in Vehicle.get_layout(data, vehicle_start).items()})
+        layout.update({f'tower.{key}': span for key, span in Tower.get_layout(data, tower_start).items()})
+        return layout
+
+    @staticmethod
+    def metadata_from_bytes(data: bytes) -> Tuple[int, Decimal, str]:
+        """Deserialize only the metadata of a serialized frame, skipping all sensor data.
+
+        Args:
+            data (bytes): The serialized byte data of the frame, including the checksum.
+
+        Returns:
+            Tuple[int, Decimal, str]: The frame ID, timestamp and version of the frame.
+        """
+        meta_start, meta_end = read_block_span(data, SHA256_CHECKSUM_LENGTH)
+        frame_id, timestamp, version = obj_from_bytes(data[meta_start:meta_end])
+        return frame_id, timestamp, version
+
     def is_complete(self):
         """Check if all sensor fields in the frame are filled.
 
@@ -22,9 +22,10 @@ from typing import Tuple, Optional, Dict, List
 import numpy as np
 from markdown_it.rules_block import heading
 
-from coopscenes.miscellaneous import ReprFormaterMixin
+from coopscenes.miscellaneous import ReprFormaterMixin, register_type
 
 
+@register_type(1, ['x_offset', 'y_offset', 'width', 'height'])
 class ROI:
     """Class representing a Region of Interest (ROI).
 
@@ -72,6 +73,7 @@ class ROI:
         return self.__repr__()
 
 
+@register_type(2, ['model_name', 'extrinsic', 'height'], shared=True)
 class VehicleInformation(ReprFormaterMixin):
     """Represents metadata about the vehicle.
 
@@ -113,6 +115,7 @@ class VehicleInformation(ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(3, ['model_name', 'height'], shared=True)
 class TowerInformation(ReprFormaterMixin):
     """Represents metadata about the sensor tower.
 
@@ -149,6 +152,7 @@ class TowerInformation(ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(4, ['model_name', 'extrinsic'], shared=True)
 class IMUInformation(ReprFormaterMixin):
     """Class representing metadata about an IMU sensor.
 
@@ -181,6 +185,7 @@ class IMUInformation(ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(5, ['model_name', 'extrinsic'], shared=True)
 class GNSSInformation(ReprFormaterMixin):
     """Class representing metadata about a GNSS sensor.
 
@@ -213,6 +218,7 @@ class GNSSInformation(ReprFormaterMixin):
         return self.__repr__()
 
 
+@register_type(6, ['velocity_source', 'heading_source'], shared=True)
 class DynamicsInformation:
     """Class representing metadata about the dynamics of a vehicle.
 
@@ -245,6 +251,9 @@ class DynamicsInformation:
         return self.__repr__()
 
 
+@register_type(7, ['name', 'model_name', 'shape', 'distortion_type', 'camera_mtx', 'distortion_mtx',
+                   'rectification_mtx', 'projection_mtx', 'region_of_interest', 'camera_type', 'focal_length',
+                   'aperture', 'exposure_time', 'extrinsic', 'stereo_transform'], shared=True)
 class CameraInformation(ReprFormaterMixin):
     """Class representing metadata about a camera sensor.
 
@@ -347,6 +356,10 @@ class CameraInformation(ReprFormaterMixin):
         return info_dict
 
 
+@register_type(8, ['name', 'model_name', 'extrinsic', 'vertical_fov', 'horizontal_fov', 'horizontal_angle_spacing',
+                   'frame_mode', 'scan_pattern', 'beam_altitude_angles', 'beam_azimuth_angles',
+                   'lidar_origin_to_beam_origin_mm', 'horizontal_scanlines', 'vertical_scanlines', 'phase_lock_offset',
+                   'lidar_to_sensor_transform', 'dtype', 'motion_transform'], shared=True)
 class LidarInformation(ReprFormaterMixin):
     """Represents metadata about a Lidar sensor.
 
@@ -472,6 +485,7 @@ class LidarInformation(ReprFormaterMixin):
         }
 
 
+@register_type(9, ['bbox_2d'])
 class ImageLabels:
     """
     A class to represent image labels including 2D bounding boxes.
@@ -481,6 +495,7 @@ class ImageLabels:
 
     Methods:
         _2d_bounding_box(): Returns the dtype structure for a 2D bounding box.
+        scaled(scale_x, scale_y): Returns the labels of the image resized by the given factors.
     """
     def __init__(self,
                  bbox_2d: Optional[np.array] = None):
@@ -492,6 +507,28 @@ class ImageLabels:
         """
         self.bbox_2d = bbox_2d      # _2d_bounding_box
 
+    def scaled(self, scale_x: float, scale_y: float) -> 'ImageLabels':
+        """
+        Returns the labels of the image resized by the given factors, e.g. for images decoded at a reduced scale.
+
+        The box centers are scaled with the pixel centers aligned, like the camera intrinsics, see `get_rect_maps`.
+
+        Args:
+            scale_x (float): The factor of the image width.
+            scale_y (float): The factor of the image height.
+
+        Returns:
+            ImageLabels: New labels with scaled copies of the bounding boxes.
+        """
+        if self.bbox_2d is None:
+            return ImageLabels()
+        bbox_2d = np.array(self.bbox_2d, copy=True)
+        bbox_2d['cx'] = (bbox_2d['cx'] + 0.5) * scale_x - 0.5
+        bbox_2d['cy'] = (bbox_2d['cy'] + 0.5) * scale_y - 0.5
+        bbox_2d['width'] *= scale_x
+        bbox_2d['height'] *= scale_y
+        return ImageLabels(bbox_2d)
+
     @staticmethod
     def _2d_bounding_box() -> Dict[str, List]:
         return {
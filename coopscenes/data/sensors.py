@@ -13,17 +13,20 @@ Classes:
 Each class provides methods for serializing and deserializing the sensor data to and from bytes,
 enabling easy storage and transmission of sensor information. They also offer utility functions
 for accessing and manipulating the data, such as image rectification for cameras and dynamic
-attribute access for lidar and IMU data.
+attribute access for lidar and IMU data. Sensors created with `lazy_from_bytes` only hold their
+serialized data and decode it on first attribute access.
 """
-from typing import List, Optional
-from coopscenes.miscellaneous import serialize, deserialize, obj_to_bytes, obj_from_bytes, read_data_block
+from typing import List, Optional, Tuple
+from coopscenes.miscellaneous import serialize, deserialize, obj_to_bytes, obj_from_bytes, read_data_block, \
+    LazyDecodeMixin, get_active_zstd_dictionary
 from coopscenes.data import Image, Points, Motion, Position, CameraInformation, LidarInformation, GNSSInformation, \
     IMUInformation, Velocity, DynamicsInformation, Heading
 from PIL import Image as PilImage
 import numpy as np
+import cv2
 
 
-class Camera:
+class Camera(LazyDecodeMixin):
     """Class representing a Camera sensor.
 
     The Camera class handles the camera information and raw image data. It provides
@@ -32,6 +35,7 @@ class Camera:
     Attributes:
         info (Optional[CameraInformation]): Metadata about the camera.
         _image_raw (Optional[Image]): The raw image data.
+        _image_rect (Optional[Image]): The rectified image, computed on first access.
     """
 
     def __init__(self, info: Optional[CameraInformation] = None, image: Optional[Image] = None):
@@ -43,11 +47,15 @@ class Camera:
         """
         self.info = info
         self._image_raw = image
+        self._image_rect = None
 
     @property
     def image(self) -> PilImage:
         """Get the rectified image from the raw data.
 
+        The image is rectified on first access and cached for subsequent accesses,
+        until the cache is cleared with `invalidate_image`.
+
         Returns:
             PilImage: The rectified image as a PIL image object.
 
@@ -55,12 +63,82 @@ class Camera:
             AttributeError: If the raw image data is not set.
         """
         from coopscenes.utils import get_rect_img
-        if self._image_raw is not None:
-            return get_rect_img(self)
+        if self._image_rect is None:
+            if self._image_raw is not None:
+                self._image_rect = get_rect_img(self)
+            else:
+                raise AttributeError("Image is not set.")
+        return self._image_rect
+
+    def invalidate_image(self):
+        """Discard the cached rectified image, e.g. after replacing the raw image or changing the calibration."""
+        self._image_rect = None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """The width and height of the rectified image.
+
+        They are taken from the header of the raw image, which reflects a reduced decode scale, or from
+        the camera information, so the image is neither decoded nor rectified.
+        """
+        if self._image_raw is not None and self._image_raw.image is not None:
+            return self._image_raw.image.size
+        if self.info is not None and self.info.shape is not None:
+            return int(self.info.shape[0]), int(self.info.shape[1])
         raise AttributeError("Image is not set.")
 
+    @property
+    def width(self) -> int:
+        """The width of the rectified image, see `size`."""
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        """The height of the rectified image, see `size`."""
+        return self.size[1]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Return the rectified image as a numpy array, e.g. for `np.array(camera)`."""
+        return np.asarray(self.image.image, dtype=dtype)
+
+    def array(self, rectified: bool = True, out: Optional[np.ndarray] = None,
+              interpolation: int = cv2.INTER_LANCZOS4) -> np.ndarray:
+        """Decode the image into a numpy array without going through PIL, see `Image.to_numpy`.
+
+        The rectified image is remapped with the cached maps of the camera, see `get_rect_maps`, directly
+        into the destination array. Unlike `image`, the result is not cached.
+
+        Args:
+            rectified (bool): If True, the image is rectified, otherwise the raw image is returned. Defaults to True.
+            out (Optional[np.ndarray]): Destination of the rectified image, e.g. the result of a previous call to
+                                        reuse its buffer. Defaults to None, which allocates a new array.
+            interpolation (int): The OpenCV interpolation of the rectification, e.g. cv2.INTER_LINEAR for speed.
+                                 Defaults to cv2.INTER_LANCZOS4, as used by `image`.
+
+        Returns:
+            np.ndarray: The image of shape (height, width) or (height, width, channels) in RGB order.
+
+        Raises:
+            AttributeError: If the raw image data is not set.
+            ValueError: If `out` does not match the shape or type of the image.
+        """
+        from coopscenes.utils import get_rect_maps
+        if self._image_raw is None:
+            raise AttributeError("Image is not set.")
+        raw = self._image_raw.to_numpy()
+        if not rectified:
+            return raw
+        if out is not None and (out.shape != raw.shape or out.dtype != raw.dtype):
+            raise ValueError(f"The output array must have the shape {raw.shape} and the type {raw.dtype}.")
+        mapx, mapy = get_rect_maps(self.info, self.size)
+        return cv2.remap(raw, mapx, mapy, interpolation=interpolation, dst=out)
+
     def __getattr__(self, attr) -> PilImage:
         """Handle dynamic access to raw image attributes."""
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        if self._decode_lazy():
+            return getattr(self, attr)
         if self._image_raw is not None and hasattr(self._image_raw, attr):
             return getattr(self.image, attr)
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
@@ -74,11 +152,13 @@ class Camera:
         return obj_to_bytes(self.info) + serialize(self._image_raw)
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'Camera':
+    def from_bytes(cls, data: bytes, image_scale: int = 1) -> 'Camera':
         """Deserialize bytes to create a Camera object.
 
         Args:
             data (bytes): The serialized byte data to deserialize.
+            image_scale (int): Denominator of the decode scale of the image, see `Image.from_bytes`.
+                               The rectification maps are scaled to match. Defaults to 1.
 
         Returns:
             Camera: The deserialized Camera object.
@@ -86,12 +166,12 @@ class Camera:
         instance = cls()
         info_bytes, data = read_data_block(data)
         setattr(instance, 'info', obj_from_bytes(info_bytes))
-        image, _ = deserialize(data, Image)
+        image, _ = deserialize(data, Image, image_scale)
         setattr(instance, '_image_raw', image)
         return instance
 
 
-class Lidar:
+class Lidar(LazyDecodeMixin):
     """Class representing a LiDAR sensor.
 
     The Lidar class manages metadata and point cloud data for a LiDAR sensor. It provides properties
@@ -136,6 +216,10 @@ class Lidar:
                 raise AttributeError("Raw points are not set.")
         return self._points_deskewd
 
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Return the deskewed points as a numpy array, e.g. for `np.array(lidar)`."""
+        return np.asarray(self.points, dtype=dtype)
+
     def __getattr__(self, attr) -> np.array:
         """Handle dynamic access to point cloud attributes.
 
@@ -148,6 +232,10 @@ class Lidar:
         Raises:
             AttributeError: If the attribute does not exist or raw points are not set.
         """
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        if self._decode_lazy():
+            return getattr(self, attr)
         if self._points_deskewd is None:
             from coopscenes.utils import get_deskewed_points
             if self._points_raw is not None:
@@ -179,11 +267,14 @@ class Lidar:
         """Serialize the LiDAR data to bytes.
 
         This method serializes the metadata and point cloud data for storage or transmission.
+        The points are compressed with the dictionary of the lidar model if one is active,
+        see `ZstdDictionaries`.
 
         Returns:
             bytes: Serialized byte representation of the LiDAR's metadata and point cloud.
         """
-        return obj_to_bytes(self.info) + serialize(self._points_raw)
+        dictionary = get_active_zstd_dictionary(self.info.model_name) if self.info is not None else None
+        return obj_to_bytes(self.info) + serialize(self._points_raw, dictionary)
 
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Lidar':
@@ -206,7 +297,7 @@ class Lidar:
         return instance
 
 
-class IMU:
+class IMU(LazyDecodeMixin):
     """Class representing an IMU sensor.
 
     The IMU class handles IMU metadata and motion data. It provides dynamic
@@ -228,6 +319,10 @@ class IMU:
 
     def __getattr__(self, attr) -> np.array:
         """Handle dynamic access to motion attributes."""
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        if self._decode_lazy():
+            return getattr(self, attr)
         if hasattr(self.motion, attr):
             return getattr(self.motion, attr)
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
@@ -262,7 +357,7 @@ class IMU:
         return instance
 
 
-class Dynamics:
+class Dynamics(LazyDecodeMixin):
     """Class representing vehicle dynamics.
 
     The Dynamics class handles dynamic state information, including velocity
@@ -284,6 +379,14 @@ class Dynamics:
         self.velocity: List[Velocity] = []
         self.heading: List[Heading] = []
 
+    def __getattr__(self, attr):
+        """Decode lazily deserialized dynamics data on first attribute access."""
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        if self._decode_lazy():
+            return getattr(self, attr)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+
     def to_bytes(self) -> bytes:
         """Serialize the dynamics data to bytes.
 
@@ -312,7 +415,7 @@ class Dynamics:
         return instance
 
 
-class GNSS:
+class GNSS(LazyDecodeMixin):
     """Class representing a GNSS sensor.
 
     The GNSS class handles GNSS metadata and position data. It provides dynamic
@@ -334,6 +437,10 @@ class GNSS:
 
     def __getattr__(self, attr) -> np.array:
         """Handle dynamic access to position attributes."""
+        if attr.startswith('__'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        if self._decode_lazy():
+            return getattr(self, attr)
         if hasattr(self.position, attr):
             return getattr(self.position, attr)
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
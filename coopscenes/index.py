@@ -0,0 +1,284 @@
+"""
+This module provides the sidecar index of AMEISE-Record files (.4mse). The index is stored next to the
+record as `<record>.4mse.idx` and holds everything that is needed to locate frames and sensor blocks
+within a record, so that metadata scans do not have to deserialize any frame. It also stores a SHA-256
+checksum of every block, so that single sensors can be verified without hashing the whole frame.
+
+Classes:
+    RecordIndex: Represents the sidecar index of a record. Provides the byte offsets, IDs and timestamps
+                 of all frames as well as the positions of the sensor blocks within each frame.
+"""
+from typing import List, Optional, Tuple
+from decimal import Decimal
+from itertools import accumulate
+import os
+import numpy as np
+from coopscenes.data import Frame
+from coopscenes.miscellaneous import compute_checksum, SHA256_CHECKSUM_LENGTH
+from coopscenes.miscellaneous.helper import read_checksum
+
+INDEX_EXTENSION = '.idx'  # Appended to the record path, e.g. record.4mse.idx
+INDEX_VERSION = 4
+
+
+class RecordIndex:
+    """Class representing the sidecar index of an AMEISE-Record file.
+
+    The index is written by `RecordIndex.build` from an opened `DataRecord`. It stores the size and
+    modification time of the record file it was built from to detect when it is stale.
+
+    Attributes:
+        record_path (str): Path to the record file the index belongs to.
+        data_offset (int): File offset of the first frame within the record file.
+        frame_offsets (np.ndarray): Byte offsets of the frames within the frame data (num_frames + 1 entries).
+        frame_ids (np.ndarray): The frame ID of each frame.
+        timestamps (np.ndarray): The timestamp of each frame as string, to keep the exact Decimal value.
+        timestamps_ns (np.ndarray): The timestamp of each frame in nanoseconds as int64.
+        sensor_names (List[str]): Attribute paths of all blocks found in the record, e.g. 'meta' or
+            'vehicle.lidars.TOP'.
+        sensor_spans (np.ndarray): Start and end position of each block within its frame, with the shape
+            (num_frames, num_sensors, 2). Blocks that are not present in a frame span (0, 0).
+        sensor_checksums (np.ndarray): SHA-256 checksum of each block with the shape (num_frames, num_sensors, 32).
+            The checksums of frames that failed their frame checksum while building the index are zero.
+        shared_objects (List[bytes]): The encoded objects shared by the frames, from the record header.
+        zstd_dictionaries (List[bytes]): The zstd dictionaries of the lidar points, from the record header.
+        source_size (int): Size of the record file when the index was built.
+        source_mtime_ns (int): Modification time of the record file when the index was built.
+    """
+
+    def __init__(self, record_path: str, data_offset: int, frame_offsets: np.ndarray, frame_ids: np.ndarray,
+                 timestamps: np.ndarray, sensor_names: List[str], sensor_spans: np.ndarray,
+                 sensor_checksums: np.ndarray, shared_objects: List[bytes], source_size: int, source_mtime_ns: int,
+                 zstd_dictionaries: Optional[List[bytes]] = None):
+        """Initialize a RecordIndex object.
+
+        Args:
+            record_path (str): Path to the record file the index belongs to.
+            data_offset (int): File offset of the first frame within the record file.
+            frame_offsets (np.ndarray): Byte offsets of the frames within the frame data.
+            frame_ids (np.ndarray): The frame ID of each frame.
+            timestamps (np.ndarray): The timestamp of each frame as string.
+            sensor_names (List[str]): Attribute paths of all blocks found in the record.
+            sensor_spans (np.ndarray): Start and end position of each block within its frame.
+            sensor_checksums (np.ndarray): SHA-256 checksum of each block.
+            shared_objects (List[bytes]): The encoded objects shared by the frames.
+            source_size (int): Size of the record file when the index was built.
+            source_mtime_ns (int): Modification time of the record file when the index was built.
+            zstd_dictionaries (Optional[List[bytes]]): The zstd dictionaries of the lidar points. Defaults to None.
+        """
+        self.record_path = record_path
+        self.data_offset = data_offset
+        self.frame_offsets = frame_offsets
+        self.frame_ids = frame_ids
+        self.timestamps = timestamps
+        self.timestamps_ns = np.array([int(Decimal(ts).scaleb(9)) for ts in timestamps], dtype=np.int64)
+        self.sensor_names = list(sensor_names)
+        self.sensor_spans = sensor_spans
+        self.sensor_checksums = sensor_checksums
+        self.shared_objects = list(shared_objects)
+        self.zstd_dictionaries = list(zstd_dictionaries or [])
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+
+    def __len__(self):
+        """Return the number of frames in the index."""
+        return len(self.frame_ids)
+
+    def __repr__(self):
+        """Return a string representation of the RecordIndex object."""
+        return (
+            f"RecordIndex(\n"
+            f"    record_path={self.record_path},\n"
+            f"    num_frames={len(self)},\n"
+            f"    sensors=[{', '.join(self.sensor_names)}]\n"
+            f")"
+        )
+
+    @staticmethod
+    def get_path(record_path: str) -> str:
+        """Return the path of the sidecar index belonging to a record file."""
+        return record_path + INDEX_EXTENSION
+
+    @classmethod
+    def build(cls, record) -> 'RecordIndex':
+        """Build the index of an opened record by scanning the layout of all its frames.
+
+        Only the metadata block of each frame is deserialized, sensor data is skipped. The checksums of
+        the blocks are only recorded for frames whose frame checksum is valid.
+
+        Args:
+            record (DataRecord): The record to index. It must have been opened from a file.
+
+        Returns:
+            RecordIndex: The index of the record.
+        """
+        frame_ids, timestamps, layouts = [], [], []
+        sensor_names: List[str] = []
+        for i in range(record.num_frames):
+            frame_bytes = record.frames_data[record.frame_offsets[i]:record.frame_offsets[i + 1]]
+            frame_id, timestamp, _ = Frame.metadata_from_bytes(frame_bytes)
+            layout = Frame.get_layout(frame_bytes)
+            frame_checksum, payload = read_checksum(frame_bytes)
+            if compute_checksum(payload) != frame_checksum:
+                layout = {name: (start, end, None) for name, (start, end) in layout.items()}
+            else:
+                layout = {name: (start, end, compute_checksum(frame_bytes[start:end]))
+                          for name, (start, end) in layout.items()}
+            sensor_names.extend(name for name in layout if name not in sensor_names)
+            frame_ids.append(frame_id)
+            timestamps.append(str(timestamp))
+            layouts.append(layout)
+
+        sensor_spans = np.zeros((len(layouts), len(sensor_names), 2), dtype=np.int64)
+        sensor_checksums = np.zeros((len(layouts), len(sensor_names), SHA256_CHECKSUM_LENGTH), dtype=np.uint8)
+        for i, layout in enumerate(layouts):
+            for j, name in enumerate(sensor_names):
+                if name not in layout:
+                    continue
+                start, end, checksum = layout[name]
+                sensor_spans[i, j] = start, end
+                if checksum is not None:
+                    sensor_checksums[i, j] = np.frombuffer(checksum, dtype=np.uint8)
+
+        stat = os.stat(record.path)
+        return cls(record_path=record.path,
+                   data_offset=record.data_offset,
+                   frame_offsets=np.array(record.frame_offsets, dtype=np.int64),
+                   frame_ids=np.array(frame_ids, dtype=np.int64),
+                   timestamps=np.array(timestamps, dtype=str),
+                   sensor_names=sensor_names,
+                   sensor_spans=sensor_spans,
+                   sensor_checksums=sensor_checksums,
+                   shared_objects=record.shared_objects,
+                   source_size=stat.st_size,
+                   source_mtime_ns=stat.st_mtime_ns,
+                   zstd_dictionaries=record.zstd_dictionaries)
+
+    def save(self):
+        """Write the index next to its record file.
+
+        The index is written to a temporary file first and then moved into place, so that readers
+        never see a partially written index.
+
+        Raises:
+            OSError: If the index cannot be written, e.g. in a read-only directory.
+        """
+        shared_offsets = [0] + list(accumulate(len(blob) for blob in self.shared_objects))
+        dictionary_offsets = [0] + list(accumulate(len(blob) for blob in self.zstd_dictionaries))
+        index_path = self.get_path(self.record_path)
+        tmp_path = f'{index_path}.{os.getpid()}.tmp'
+        try:
+            self._write(tmp_path, shared_offsets, dictionary_offsets)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write(self, path: str, shared_offsets: List[int], dictionary_offsets: List[int]):
+        """Write the arrays of the index to a file."""
+        with open(path, 'wb') as file:
+            np.savez(file,
+                     version=np.int64(INDEX_VERSION),
+                     data_offset=np.int64(self.data_offset),
+                     frame_offsets=self.frame_offsets,
+                     frame_ids=self.frame_ids,
+                     timestamps=self.timestamps,
+                     sensor_names=np.array(self.sensor_names, dtype=str),
+                     sensor_spans=self.sensor_spans,
+                     sensor_checksums=self.sensor_checksums,
+                     shared_data=np.frombuffer(b''.join(self.shared_objects), dtype=np.uint8),
+                     shared_offsets=np.array(shared_offsets, dtype=np.int64),
+                     dictionary_data=np.frombuffer(b''.join(self.zstd_dictionaries), dtype=np.uint8),
+                     dictionary_offsets=np.array(dictionary_offsets, dtype=np.int64),
+                     source_size=np.int64(self.source_size),
+                     source_mtime_ns=np.int64(self.source_mtime_ns))
+
+    @classmethod
+    def load(cls, record_path: str) -> Optional['RecordIndex']:
+        """Load the sidecar index of a record file.
+
+        Args:
+            record_path (str): Path to the record file.
+
+        Returns:
+            Optional[RecordIndex]: The index, or None if no readable index of the current version exists.
+        """
+        index_path = cls.get_path(record_path)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with np.load(index_path, allow_pickle=False) as content:
+                if int(content['version']) != INDEX_VERSION:
+                    return None
+                shared_data = content['shared_data'].tobytes()
+                shared_offsets = content['shared_offsets'].tolist()
+                dictionary_data = content['dictionary_data'].tobytes()
+                dictionary_offsets = content['dictionary_offsets'].tolist()
+                return cls(record_path=record_path,
+                           data_offset=int(content['data_offset']),
+                           frame_offsets=content['frame_offsets'],
+                           frame_ids=content['frame_ids'],
+                           timestamps=content['timestamps'],
+                           sensor_names=content['sensor_names'].tolist(),
+                           sensor_spans=content['sensor_spans'],
+                           sensor_checksums=content['sensor_checksums'],
+                           shared_objects=[shared_data[start:end]
+                                           for start, end in zip(shared_offsets, shared_offsets[1:])],
+                           source_size=int(content['source_size']),
+                           source_mtime_ns=int(content['source_mtime_ns']),
+                           zstd_dictionaries=[dictionary_data[start:end]
+                                              for start, end in zip(dictionary_offsets, dictionary_offsets[1:])])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def is_stale(self) -> bool:
+        """Check whether the record file changed since the index was built."""
+        try:
+            stat = os.stat(self.record_path)
+        except OSError:
+            return True
+        return stat.st_size != self.source_size or stat.st_mtime_ns != self.source_mtime_ns
+
+    def get_timestamp(self, frame_index: int) -> Decimal:
+        """Return the timestamp of a frame as Decimal, like `Frame.timestamp`."""
+        return Decimal(str(self.timestamps[frame_index]))
+
+    def get_sensor_span(self, frame_index: int, sensor: str) -> Optional[Tuple[int, int]]:
+        """Return the position of a sensor block within its frame.
+
+        Args:
+            frame_index (int): Index of the frame within the record.
+            sensor (str): Attribute path of the block, e.g. 'vehicle.lidars.TOP'.
+
+        Returns:
+            Optional[Tuple[int, int]]: Start and end position of the block relative to the start of the frame,
+                or None if the frame does not contain the block.
+        """
+        if sensor not in self.sensor_names:
+            return None
+        start, end = self.sensor_spans[frame_index, self.sensor_names.index(sensor)]
+        if end == start:
+            return None
+        return int(start), int(end)
+
+    def verify_blocks(self, frame_index: int, frame_data: bytes, sensors: List[str]) -> bool:
+        """Verify single blocks of a frame against their checksums, without hashing the whole frame.
+
+        Args:
+            frame_index (int): Index of the frame within the record.
+            frame_data (bytes): The serialized byte data of the frame, including the frame checksum.
+            sensors (List[str]): Attribute paths of the blocks to verify, e.g. ['meta', 'vehicle.lidars.TOP'].
+                                 Blocks that are not present in the frame are skipped.
+
+        Returns:
+            bool: True if all blocks match their checksums, False otherwise.
+        """
+        for sensor in sensors:
+            span = self.get_sensor_span(frame_index, sensor)
+            if span is None:
+                continue
+            checksum = self.sensor_checksums[frame_index, self.sensor_names.index(sensor)].tobytes()
+            if compute_checksum(frame_data[span[0]:span[1]]) != checksum:
+                return False
+        return True
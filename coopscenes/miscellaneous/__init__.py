@@ -1,4 +1,7 @@
-from .error_exceptions import ChecksumError, InvalidFileTypeError
+from .error_exceptions import ChecksumError, InvalidFileTypeError, UnsafeDeserializationError
 from .variables import SHA256_CHECKSUM_LENGTH, INT_LENGTH, Config
-from .helper import compute_checksum, read_data_block, obj_from_bytes, obj_to_bytes, serialize, deserialize, \
-    TimestampMixin, ReprFormaterMixin
+from .codec import register_type
+from .compression import ZstdDictionaries, train_zstd_dictionary, register_zstd_dictionaries, \
+    get_zstd_dictionary, get_active_zstd_dictionary, get_zstd_decompressor, decompress_array
+from .helper import compute_checksum, read_data_block, read_block_span, obj_from_bytes, obj_to_bytes, serialize, \
+    deserialize, as_memoryview, TimestampMixin, ReprFormaterMixin, LazyDecodeMixin
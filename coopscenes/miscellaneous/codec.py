@@ -0,0 +1,459 @@
+"""
+This module provides a versioned, schema-based binary codec for the metadata and time series of
+AMEISE-Record files. It replaces dill for the classes registered with `register_type`, so decoding
+does not execute arbitrary code and numeric data is stored as raw numpy buffers.
+
+Every encoded value starts with a one byte type tag. Registered objects are encoded by their class tag
+and a bitmask of the schema fields they hold, followed by the field values. Lists of objects of the same
+class, e.g. the motion data of an IMU, are stored column by column, so that arrays, numbers and
+timestamps of all entries are packed into a single numpy buffer per field.
+
+Objects of classes registered as shared, e.g. the static sensor information, are encoded only once
+per record while a `SharedObjectCollector` is active. The frames then reference them by the digest of
+their encoding, and readers register the shared objects of a record with `register_shared_objects`, so
+that all frames of the record return the same Python object.
+
+Classes:
+    SharedObjectCollector: Context manager collecting the shared objects encoded within its context.
+
+Functions:
+    register_type(tag, fields, shared): Class decorator registering a class with a stable tag and its schema fields.
+    register_shared_objects(blobs): Makes encoded shared objects available to the decoder.
+    get_shared_id(blob): Returns the digest referencing an encoded shared object.
+    is_encoded(data): Checks whether a byte stream was produced by this codec.
+    encode(obj): Encodes an object with this codec.
+    decode(data): Decodes a byte stream produced by `encode`.
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+from decimal import Decimal
+import ast
+import hashlib
+import struct
+import threading
+import numpy as np
+
+CODEC_MAGIC = b'\x00CSC'  # Dill streams start with the pickle protocol opcode 0x80, never with 0x00
+CODEC_VERSION = 1
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _BIG_INT, _FLOAT, _STR, _BYTES, _DECIMAL, _LIST, _TUPLE, _DICT, _ARRAY, _DTYPE, \
+    _NP_SCALAR, _OBJECT, _OBJECT_LIST, _SHARED = range(18)
+# Column tags of object lists
+_COL_GENERIC, _COL_ARRAY, _COL_FLOAT, _COL_INT, _COL_DECIMAL, _COL_NONE = range(6)
+
+_U8 = struct.Struct('>B')
+_U16 = struct.Struct('>H')
+_U32 = struct.Struct('>I')
+_U64 = struct.Struct('>Q')
+_I64 = struct.Struct('>q')
+_F64 = struct.Struct('>d')
+
+SHARED_ID_LENGTH = 16  # Length of the digest referencing a shared object
+
+_types_by_class: Dict[type, Tuple[int, List[str]]] = {}
+_types_by_tag: Dict[int, Tuple[type, List[str]]] = {}
+_shared_types = set()
+_shared_objects: Dict[bytes, Any] = {}
+_local = threading.local()
+
+
+def register_type(tag: int, fields: List[str], shared: bool = False):
+    """Class decorator registering a class with the codec.
+
+    The tag and the order of the fields are part of the format and must never change. New fields may
+    only be appended.
+
+    Args:
+        tag (int): Stable identifier of the class within the codec (0-65535).
+        fields (List[str]): Names of the instance attributes that make up the schema of the class (at most 64).
+        shared (bool): If True, instances are encoded once per record while a `SharedObjectCollector`
+                       is active and decoded into one shared object. Defaults to False.
+
+    Returns:
+        Callable: The decorator, returning the class unchanged.
+    """
+
+    def decorator(cls):
+        if tag in _types_by_tag and _types_by_tag[tag][0] is not cls:
+            raise ValueError(f"Codec tag {tag} is already registered for {_types_by_tag[tag][0].__name__}.")
+        _types_by_class[cls] = (tag, list(fields))
+        _types_by_tag[tag] = (cls, list(fields))
+        if shared:
+            _shared_types.add(cls)
+        return cls
+
+    return decorator
+
+
+class SharedObjectCollector:
+    """Context manager collecting the shared objects encoded within its context.
+
+    While the collector is active in a thread, instances of shared classes are replaced by a reference
+    to the digest of their encoding, and the encoding itself is stored in the collector once.
+
+    Attributes:
+        objects (Dict[bytes, bytes]): The encoded shared objects, keyed by their digest.
+    """
+
+    def __init__(self):
+        """Initialize an empty SharedObjectCollector object."""
+        self.objects: Dict[bytes, bytes] = {}
+        self._previous = None
+
+    def __enter__(self) -> 'SharedObjectCollector':
+        """Activate the collector for the current thread."""
+        self._previous = getattr(_local, 'collector', None)
+        _local.collector = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Restore the previously active collector."""
+        _local.collector = self._previous
+        self._previous = None
+
+
+def get_shared_id(blob: bytes) -> bytes:
+    """Return the digest referencing an encoded shared object."""
+    return hashlib.sha256(blob).digest()[:SHARED_ID_LENGTH]
+
+
+def register_shared_objects(blobs: Iterable[bytes]):
+    """Make encoded shared objects available to the decoder.
+
+    Shared objects are kept for the lifetime of the process and identified by the digest of their
+    encoding, so registering the objects of several records with identical sensors keeps one object.
+
+    Args:
+        blobs (Iterable[bytes]): The encoded shared objects, as collected by a `SharedObjectCollector`.
+    """
+    for blob in blobs:
+        shared_id = get_shared_id(blob)
+        if shared_id not in _shared_objects:
+            _shared_objects[shared_id] = decode(blob)
+
+
+def is_encoded(data: bytes) -> bool:
+    """Check whether a byte stream was produced by this codec."""
+    return bytes(data[:len(CODEC_MAGIC)]) == CODEC_MAGIC
+
+
+def encode(obj: Any) -> bytes:
+    """Encode an object with the codec.
+
+    Args:
+        obj (Any): The object. Supported are None, bool, int, float, str, bytes, Decimal, lists, tuples,
+                   dicts, numpy arrays, dtypes and scalars, and instances of registered classes.
+
+    Returns:
+        bytes: The encoded byte stream, starting with the codec magic and version.
+
+    Raises:
+        TypeError: If the object contains a value that the codec does not support.
+    """
+    parts = [CODEC_MAGIC, _U8.pack(CODEC_VERSION)]
+    _encode_value(obj, parts)
+    return b''.join(parts)
+
+
+def decode(data: bytes) -> Any:
+    """Decode a byte stream produced by `encode`.
+
+    Args:
+        data (bytes): The encoded byte stream.
+
+    Returns:
+        Any: The decoded object.
+
+    Raises:
+        ValueError: If the byte stream is not encoded with a supported version of the codec.
+    """
+    data = memoryview(data)
+    if not is_encoded(data):
+        raise ValueError("Data is not encoded with the coopscenes codec.")
+    version = data[len(CODEC_MAGIC)]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported codec version {version}.")
+    value, _ = _decode_value(data, len(CODEC_MAGIC) + 1)
+    return value
+
+
+def _pack_str(value: str, parts: list):
+    encoded = value.encode('utf-8')
+    parts.append(_U32.pack(len(encoded)))
+    parts.append(encoded)
+
+
+def _unpack_str(data: memoryview, pos: int) -> Tuple[str, int]:
+    length, = _U32.unpack_from(data, pos)
+    pos += _U32.size
+    return str(data[pos:pos + length], 'utf-8'), pos + length
+
+
+def _pack_dtype(dtype: np.dtype, parts: list):
+    if dtype.hasobject:
+        raise TypeError("Arrays of Python objects are not supported by the codec.")
+    _pack_str(repr(np.lib.format.dtype_to_descr(dtype)), parts)
+
+
+def _unpack_dtype(data: memoryview, pos: int) -> Tuple[np.dtype, int]:
+    descr, pos = _unpack_str(data, pos)
+    return np.lib.format.descr_to_dtype(ast.literal_eval(descr)), pos
+
+
+def _pack_array(array: np.ndarray, parts: list):
+    array = np.ascontiguousarray(array)
+    _pack_dtype(array.dtype, parts)
+    parts.append(_U8.pack(array.ndim))
+    parts.extend(_U64.pack(dim) for dim in array.shape)
+    parts.append(_U64.pack(array.nbytes))
+    parts.append(array.tobytes())
+
+
+def _unpack_array(data: memoryview, pos: int) -> Tuple[np.ndarray, int]:
+    dtype, pos = _unpack_dtype(data, pos)
+    ndim = data[pos]
+    pos += 1
+    shape = tuple(_U64.unpack_from(data, pos + i * _U64.size)[0] for i in range(ndim))
+    pos += ndim * _U64.size
+    nbytes, = _U64.unpack_from(data, pos)
+    pos += _U64.size
+    # Copy, so that the array is writable and does not keep the frame data alive
+    array = np.frombuffer(data[pos:pos + nbytes], dtype=dtype).reshape(shape).copy()
+    return array, pos + nbytes
+
+
+def _encode_value(value: Any, parts: list):
+    if value is None:
+        parts.append(_U8.pack(_NONE))
+    elif value is True or value is False:
+        parts.append(_U8.pack(_TRUE if value else _FALSE))
+    elif type(value) is int:
+        if -2 ** 63 <= value < 2 ** 63:
+            parts.append(_U8.pack(_INT) + _I64.pack(value))
+        else:
+            encoded = value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True)
+            parts.append(_U8.pack(_BIG_INT) + _U32.pack(len(encoded)) + encoded)
+    elif type(value) is float:
+        parts.append(_U8.pack(_FLOAT) + _F64.pack(value))
+    elif type(value) is str:
+        parts.append(_U8.pack(_STR))
+        _pack_str(value, parts)
+    elif type(value) is bytes:
+        parts.append(_U8.pack(_BYTES) + _U32.pack(len(value)))
+        parts.append(value)
+    elif type(value) is Decimal:
+        parts.append(_U8.pack(_DECIMAL))
+        _pack_str(str(value), parts)
+    elif type(value) is list:
+        if value and type(value[0]) in _types_by_class and _encode_object_list(value, parts):
+            return
+        parts.append(_U8.pack(_LIST) + _U32.pack(len(value)))
+        for item in value:
+            _encode_value(item, parts)
+    elif type(value) is tuple:
+        parts.append(_U8.pack(_TUPLE) + _U32.pack(len(value)))
+        for item in value:
+            _encode_value(item, parts)
+    elif type(value) is dict:
+        parts.append(_U8.pack(_DICT) + _U32.pack(len(value)))
+        for key, item in value.items():
+            _encode_value(key, parts)
+            _encode_value(item, parts)
+    elif type(value) is np.ndarray:
+        parts.append(_U8.pack(_ARRAY))
+        _pack_array(value, parts)
+    elif isinstance(value, np.dtype):
+        parts.append(_U8.pack(_DTYPE))
+        _pack_dtype(value, parts)
+    elif isinstance(value, np.generic):
+        parts.append(_U8.pack(_NP_SCALAR))
+        _pack_array(np.asarray(value), parts)
+    elif type(value) in _shared_types and getattr(_local, 'collector', None) is not None:
+        collector = _local.collector
+        _local.collector = None
+        try:
+            blob = encode(value)
+        finally:
+            _local.collector = collector
+        shared_id = get_shared_id(blob)
+        collector.objects.setdefault(shared_id, blob)
+        parts.append(_U8.pack(_SHARED) + shared_id)
+    elif type(value) in _types_by_class:
+        tag, fields = _types_by_class[type(value)]
+        mask, present = _get_field_mask(value, fields)
+        parts.append(_U8.pack(_OBJECT) + _U16.pack(tag) + _U64.pack(mask))
+        for field in present:
+            _encode_value(value.__dict__[field], parts)
+    else:
+        raise TypeError(f"Type '{type(value).__name__}' is not supported by the codec.")
+
+
+def _get_field_mask(obj: Any, fields: List[str]) -> Tuple[int, List[str]]:
+    """Return the bitmask and names of the schema fields an object holds."""
+    attributes = obj.__dict__
+    if not attributes.keys() <= set(fields):
+        unknown = ', '.join(sorted(attributes.keys() - set(fields)))
+        raise TypeError(f"'{type(obj).__name__}' has attributes outside of its codec schema: {unknown}.")
+    present = [field for field in fields if field in attributes]
+    mask = sum(1 << i for i, field in enumerate(fields) if field in attributes)
+    return mask, present
+
+
+def _encode_object_list(objects: list, parts: list) -> bool:
+    """Encode a list of objects of one registered class column by column.
+
+    Returns:
+        bool: False if the objects differ in class or fields, in which case nothing is written.
+    """
+    cls = type(objects[0])
+    if any(type(obj) is not cls for obj in objects):
+        return False
+    tag, fields = _types_by_class[cls]
+    mask, present = _get_field_mask(objects[0], fields)
+    if any(obj.__dict__.keys() != objects[0].__dict__.keys() for obj in objects):
+        return False
+    parts.append(_U8.pack(_OBJECT_LIST) + _U16.pack(tag) + _U64.pack(mask) + _U32.pack(len(objects)))
+    for field in present:
+        _encode_column([obj.__dict__[field] for obj in objects], parts)
+    return True
+
+
+def _encode_column(values: list, parts: list):
+    first = values[0]
+    if all(value is None for value in values):
+        parts.append(_U8.pack(_COL_NONE))
+    elif (type(first) is np.ndarray and first.ndim > 0 and not first.dtype.hasobject
+          and all(type(value) is np.ndarray and value.dtype == first.dtype and value.shape == first.shape
+                  for value in values)):
+        parts.append(_U8.pack(_COL_ARRAY))
+        _pack_array(np.stack(values), parts)
+    elif all(type(value) is float for value in values):
+        parts.append(_U8.pack(_COL_FLOAT))
+        _pack_array(np.array(values, dtype='>f8'), parts)
+    elif all(type(value) is int and -2 ** 63 <= value < 2 ** 63 for value in values):
+        parts.append(_U8.pack(_COL_INT))
+        _pack_array(np.array(values, dtype='>i8'), parts)
+    elif all(type(value) is Decimal and _is_packable_decimal(value) for value in values):
+        exponents = [value.as_tuple().exponent for value in values]
+        unscaled = [int(value.scaleb(-exponent)) for value, exponent in zip(values, exponents)]
+        parts.append(_U8.pack(_COL_DECIMAL))
+        _pack_array(np.array(unscaled, dtype='>i8'), parts)
+        _pack_array(np.array(exponents, dtype='>i4'), parts)
+    else:
+        parts.append(_U8.pack(_COL_GENERIC))
+        for value in values:
+            _encode_value(value, parts)
+
+
+def _is_packable_decimal(value: Decimal) -> bool:
+    """Check whether a Decimal is stored exactly as unscaled int64 and exponent."""
+    if not value.is_finite() or (value.is_zero() and value.is_signed()):
+        return False
+    return len(value.as_tuple().digits) <= 18
+
+
+def _decode_value(data: memoryview, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _INT:
+        return _I64.unpack_from(data, pos)[0], pos + _I64.size
+    if tag == _BIG_INT:
+        length, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        return int.from_bytes(data[pos:pos + length], 'big', signed=True), pos + length
+    if tag == _FLOAT:
+        return _F64.unpack_from(data, pos)[0], pos + _F64.size
+    if tag == _STR:
+        return _unpack_str(data, pos)
+    if tag == _BYTES:
+        length, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        return bytes(data[pos:pos + length]), pos + length
+    if tag == _DECIMAL:
+        value, pos = _unpack_str(data, pos)
+        return Decimal(value), pos
+    if tag in (_LIST, _TUPLE):
+        length, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        items = []
+        for _ in range(length):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), pos
+    if tag == _DICT:
+        length, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        result = {}
+        for _ in range(length):
+            key, pos = _decode_value(data, pos)
+            result[key], pos = _decode_value(data, pos)
+        return result, pos
+    if tag == _ARRAY:
+        return _unpack_array(data, pos)
+    if tag == _DTYPE:
+        return _unpack_dtype(data, pos)
+    if tag == _NP_SCALAR:
+        array, pos = _unpack_array(data, pos)
+        return array[()], pos
+    if tag == _SHARED:
+        shared_id = bytes(data[pos:pos + SHARED_ID_LENGTH])
+        if shared_id not in _shared_objects:
+            raise ValueError("Unknown shared object. Frames with shared objects must be read through their DataRecord.")
+        return _shared_objects[shared_id], pos + SHARED_ID_LENGTH
+    if tag == _OBJECT:
+        cls, present, pos = _unpack_object_header(data, pos)
+        obj = cls.__new__(cls)
+        for field in present:
+            obj.__dict__[field], pos = _decode_value(data, pos)
+        return obj, pos
+    if tag == _OBJECT_LIST:
+        cls, present, pos = _unpack_object_header(data, pos)
+        length, = _U32.unpack_from(data, pos)
+        pos += _U32.size
+        objects = [cls.__new__(cls) for _ in range(length)]
+        for field in present:
+            column, pos = _decode_column(data, pos, length)
+            for obj, value in zip(objects, column):
+                obj.__dict__[field] = value
+        return objects, pos
+    raise ValueError(f"Unknown codec tag {tag}.")
+
+
+def _unpack_object_header(data: memoryview, pos: int) -> Tuple[type, List[str], int]:
+    tag, = _U16.unpack_from(data, pos)
+    mask, = _U64.unpack_from(data, pos + _U16.size)
+    if tag not in _types_by_tag:
+        raise ValueError(f"Unknown codec type tag {tag}.")
+    cls, fields = _types_by_tag[tag]
+    present = [field for i, field in enumerate(fields) if mask & (1 << i)]
+    return cls, present, pos + _U16.size + _U64.size
+
+
+def _decode_column(data: memoryview, pos: int, length: int) -> Tuple[list, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _COL_NONE:
+        return [None] * length, pos
+    if tag == _COL_ARRAY:
+        array, pos = _unpack_array(data, pos)
+        return list(array), pos
+    if tag in (_COL_FLOAT, _COL_INT):
+        array, pos = _unpack_array(data, pos)
+        return array.tolist(), pos
+    if tag == _COL_DECIMAL:
+        unscaled, pos = _unpack_array(data, pos)
+        exponents, pos = _unpack_array(data, pos)
+        return [Decimal(value).scaleb(exponent) for value, exponent in zip(unscaled.tolist(), exponents.tolist())], pos
+    if tag == _COL_GENERIC:
+        values = []
+        for _ in range(length):
+            value, pos = _decode_value(data, pos)
+            values.append(value)
+        return values, pos
+    raise ValueError(f"Unknown codec column tag {tag}.")
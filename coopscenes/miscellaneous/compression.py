@@ -0,0 +1,192 @@
+"""
+This module provides trained zstd dictionaries for the point payloads of the lidars. The points of one
+lidar model share a very regular structure, so a dictionary trained on a sample of frames improves both
+the compression ratio and the decompression speed of every payload.
+
+Dictionaries are stored in the record header. Every compressed payload carries the ID of its dictionary
+in its zstd frame header, so readers register the dictionaries of a record with `register_zstd_dictionaries`
+and look them up by that ID. Writers activate the dictionaries of the lidar models with a
+`ZstdDictionaries` context, which `Lidar.to_bytes` consults for the model of the lidar.
+
+Decompression reuses one context per thread and dictionary, and writes the points directly into a
+writable numpy array of the size stored in the zstd frame header.
+
+Classes:
+    ZstdDictionaries: Context manager activating the compression dictionaries of the lidar models.
+
+Functions:
+    train_zstd_dictionary(samples, dict_size): Trains a zstd dictionary on sample payloads.
+    register_zstd_dictionaries(blobs): Makes dictionaries available to the decompression of points.
+    get_zstd_dictionary(dict_id): Returns a registered dictionary by its ID.
+    get_active_zstd_dictionary(model_name): Returns the active compression dictionary of a lidar model.
+    get_zstd_decompressor(dict_id): Returns the pooled decompression context of the current thread.
+    decompress_array(data, dtype, out): Decompresses a zstd frame directly into a writable numpy array.
+"""
+from typing import Dict, Iterable, List, Optional
+import threading
+import numpy as np
+import zstandard as zstd
+
+ZSTD_DICTIONARY_SIZE = 112640  # Default size of trained dictionaries in bytes, as used by the zstd CLI
+_MIN_DICTIONARY_SIZE = 1024  # Smallest dictionary size the trainer reliably handles
+
+_dictionaries: Dict[int, zstd.ZstdCompressionDict] = {}
+_local = threading.local()
+
+
+def train_zstd_dictionary(samples: List[bytes], dict_size: int = ZSTD_DICTIONARY_SIZE) -> bytes:
+    """Train a zstd dictionary on sample payloads, e.g. the raw points of one lidar model.
+
+    The dictionary is at most a tenth of the size of all samples, as larger dictionaries do not pay off.
+
+    Args:
+        samples (List[bytes]): The uncompressed sample payloads.
+        dict_size (int): The maximum size of the dictionary in bytes. Defaults to 112640.
+
+    Returns:
+        bytes: The trained dictionary.
+
+    Raises:
+        zstd.ZstdError: If the samples are too few or too small to train a dictionary.
+    """
+    samples = [bytes(sample) for sample in samples]
+    dict_size = min(dict_size, max(sum(len(sample) for sample in samples) // 10, _MIN_DICTIONARY_SIZE))
+    return zstd.train_dictionary(dict_size, samples).as_bytes()
+
+
+def register_zstd_dictionaries(blobs: Iterable[bytes]):
+    """Make dictionaries available to the decompression of points.
+
+    Dictionaries are kept for the lifetime of the process and identified by the ID stored in them,
+    so registering the dictionaries of several records that share a dictionary keeps one of them.
+
+    Args:
+        blobs (Iterable[bytes]): The trained dictionaries, e.g. `DataRecord.zstd_dictionaries`.
+    """
+    for blob in blobs:
+        dictionary = zstd.ZstdCompressionDict(bytes(blob))
+        _dictionaries.setdefault(dictionary.dict_id(), dictionary)
+
+
+def get_zstd_dictionary(dict_id: int) -> Optional[zstd.ZstdCompressionDict]:
+    """Return a registered dictionary by its ID, or None if it is not registered."""
+    return _dictionaries.get(dict_id)
+
+
+def get_active_zstd_dictionary(model_name: Optional[str]) -> Optional[zstd.ZstdCompressionDict]:
+    """Return the compression dictionary of a lidar model activated by a `ZstdDictionaries` context.
+
+    Args:
+        model_name (Optional[str]): The model name of the lidar, see `LidarInformation.model_name`.
+
+    Returns:
+        Optional[zstd.ZstdCompressionDict]: The dictionary, or None if no dictionary is active for the model.
+    """
+    active = getattr(_local, 'dictionaries', None)
+    if active is None:
+        return None
+    return active.dictionaries.get(model_name)
+
+
+def get_zstd_decompressor(dict_id: int = 0) -> zstd.ZstdDecompressor:
+    """Return the decompression context of the current thread for a dictionary, creating it on first use.
+
+    Args:
+        dict_id (int): The ID of the dictionary, 0 for data compressed without a dictionary. Defaults to 0.
+
+    Returns:
+        zstd.ZstdDecompressor: The decompression context, which must not be shared with other threads.
+
+    Raises:
+        ValueError: If the dictionary is not registered.
+    """
+    decompressors = getattr(_local, 'decompressors', None)
+    if decompressors is None:
+        decompressors = _local.decompressors = {}
+    decompressor = decompressors.get(dict_id)
+    if decompressor is None:
+        dictionary = get_zstd_dictionary(dict_id) if dict_id else None
+        if dict_id and dictionary is None:
+            raise ValueError(f"The data was compressed with the unknown zstd dictionary {dict_id}.")
+        decompressor = decompressors[dict_id] = zstd.ZstdDecompressor(dict_data=dictionary)
+    return decompressor
+
+
+def decompress_array(data: bytes, dtype: np.dtype, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decompress a zstd frame directly into a writable numpy array.
+
+    The dictionary is selected by the ID in the frame header, and the decompression context of the
+    current thread is reused. The decompressed data is written into the array without an intermediate
+    bytes object, so the array does not have to be copied to modify it.
+
+    Args:
+        data (bytes): The zstd frame.
+        dtype (np.dtype): The data type of the array.
+        out (Optional[np.ndarray]): A preallocated, writable and contiguous array of the decompressed size
+                                    to decompress into, e.g. to reuse a buffer across frames.
+                                    Defaults to None, which allocates a new array.
+
+    Returns:
+        np.ndarray: The one-dimensional array, or `out` if it was given.
+
+    Raises:
+        ValueError: If `out` does not match the decompressed size, or the dictionary is not registered.
+    """
+    params = zstd.get_frame_parameters(data)
+    decompressor = get_zstd_decompressor(params.dict_id)
+    if params.content_size == zstd.CONTENTSIZE_UNKNOWN:
+        # Streamed frames do not store their size, so they are decompressed into a growing buffer
+        with decompressor.stream_reader(data) as reader:
+            array = np.frombuffer(bytearray(reader.read()), dtype=dtype)
+        if out is None:
+            return array
+        out.reshape(-1)[:] = array
+        return out
+
+    if out is None:
+        out = np.empty(params.content_size // np.dtype(dtype).itemsize, dtype=dtype)
+    elif out.nbytes != params.content_size or not out.flags.writeable or not out.flags.c_contiguous:
+        raise ValueError(f"The output array must be writable, contiguous and {params.content_size} bytes large.")
+    buffer = memoryview(out.reshape(-1).view(np.uint8))
+    with decompressor.stream_reader(data) as reader:
+        position = 0
+        while position < params.content_size:
+            read = reader.readinto(buffer[position:])
+            if not read:
+                raise zstd.ZstdError("The zstd frame ended before its content size was reached.")
+            position += read
+    return out
+
+
+class ZstdDictionaries:
+    """Context manager activating the compression dictionaries of the lidar models for the current thread.
+
+    The dictionaries are registered for decompression as well, so frames that are written within the
+    context can be decoded again in the same process.
+
+    Attributes:
+        dictionaries (Dict[str, zstd.ZstdCompressionDict]): The dictionaries, keyed by lidar model name.
+    """
+
+    def __init__(self, dictionaries: Dict[str, bytes]):
+        """Initialize a ZstdDictionaries object.
+
+        Args:
+            dictionaries (Dict[str, bytes]): The trained dictionaries, keyed by lidar model name.
+        """
+        register_zstd_dictionaries(dictionaries.values())
+        self.dictionaries: Dict[str, zstd.ZstdCompressionDict] = {
+            model_name: get_zstd_dictionary(zstd.ZstdCompressionDict(bytes(blob)).dict_id())
+            for model_name, blob in dictionaries.items()}
+        self._previous = None
+
+    def __enter__(self) -> 'ZstdDictionaries':
+        """Activate the dictionaries for the current thread."""
+        self._previous = getattr(_local, 'dictionaries', None)
+        _local.dictionaries = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Restore the previously active dictionaries."""
+        _local.dictionaries = self._previous
+        self._previous = None
@@ -7,3 +7,8 @@ class ChecksumError(Exception):
 class InvalidFileTypeError(Exception):
     """Raised when the provided file type is not supported."""
     pass
+
+
+class UnsafeDeserializationError(Exception):
+    """Raised when data can only be deserialized with Dill, but `Config.ALLOW_DILL` is disabled."""
+    pass
@@ -7,23 +7,28 @@ and handling byte streams.
 Classes:
     TimestampMixin: A mixin class providing a method for timestamp conversion.
     ReprFormaterMixin: A mixin class providing methods for formatting numpy arrays and nested objects.
+    LazyDecodeMixin: A mixin class deferring the deserialization of an object until its attributes are accessed.
 
 Functions:
     unix_to_utc(unix_time, precision='ns', timezone='Europe/Berlin'): Converts a Unix timestamp to a formatted UTC time string.
     compute_checksum(data): Computes the SHA-256 checksum for a given data block.
     read_checksum(data): Reads and separates the SHA-256 checksum from a data stream.
+    as_memoryview(data): Returns a memoryview on a bytes-like object without copying it.
     read_data_block(data, dtype_length=INT_LENGTH): Reads a block of data from a byte stream, using a length prefix.
-    obj_to_bytes(obj): Serializes an object to bytes using the Dill library.
-    obj_from_bytes(data): Deserializes an object from bytes using the Dill library.
+    read_block_span(data, offset, dtype_length=INT_LENGTH): Locates a length-prefixed block without copying it.
+    obj_to_bytes(obj): Serializes an object to bytes using the schema-based codec, or Dill as fallback.
+    obj_from_bytes(data): Deserializes an object from bytes written by the codec or by Dill.
     serialize(obj): Serializes an object to bytes with a length prefix.
-    deserialize(data, cls, *args): Deserializes a byte stream into an object using the class's `from_bytes()` method.
+    deserialize(data, cls, *args, lazy): Deserializes a byte stream into an object using the class's `from_bytes()` method.
 """
 from typing import Optional, Tuple
-from coopscenes.miscellaneous import INT_LENGTH, SHA256_CHECKSUM_LENGTH
+from coopscenes.miscellaneous import INT_LENGTH, SHA256_CHECKSUM_LENGTH, Config, UnsafeDeserializationError
+from coopscenes.miscellaneous import codec
 from decimal import Decimal
 from datetime import datetime, timedelta
 import numpy as np
 import hashlib
+import threading
 import dill
 import pytz
 
@@ -81,6 +86,61 @@ class ReprFormaterMixin:
         return f"{height_value:.1f}m"
 
 
+class LazyDecodeMixin:
+    """Mixin class to defer the deserialization of an object until one of its attributes is accessed.
+
+    `lazy_from_bytes` creates an instance that only holds its serialized data. The class's `__getattr__`
+    calls `_decode_lazy` when an attribute is missing, which deserializes the data with `from_bytes`
+    and takes over the attributes of the deserialized object.
+    """
+
+    @classmethod
+    def lazy_from_bytes(cls, data: bytes, *args):
+        """Create an instance that is deserialized from the given data on first attribute access.
+
+        Args:
+            data (bytes): The serialized byte data. It is kept as is, so views on a larger buffer keep
+                          that buffer alive until the instance is decoded.
+            *args: Additional arguments passed to the class's `from_bytes()` method.
+
+        Returns:
+            The lazily decoded instance.
+        """
+        instance = cls.__new__(cls)
+        instance.__dict__['_lazy_data'] = (data, args)
+        instance.__dict__['_lazy_lock'] = threading.Lock()
+        return instance
+
+    @property
+    def is_decoded(self) -> bool:
+        """Whether the serialized data of the object has been deserialized."""
+        return '_lazy_data' not in self.__dict__
+
+    def _decode_lazy(self) -> bool:
+        """Deserialize the pending data of a lazily created instance.
+
+        Attributes that were set on the instance before decoding are kept. The decoding is guarded by a lock
+        of the instance, so threads accessing the instance concurrently wait until its attributes are set.
+
+        Returns:
+            bool: True if data was deserialized, also by another thread while waiting, so the attribute access
+                should be retried. False if the instance was already decoded.
+        """
+        lock = self.__dict__.get('_lazy_lock')
+        if lock is None:
+            return False
+        with lock:
+            lazy_data = self.__dict__.get('_lazy_data')
+            if lazy_data is not None:
+                data, args = lazy_data
+                for attr, value in type(self).from_bytes(data, *args).__dict__.items():
+                    self.__dict__.setdefault(attr, value)
+                # The pending data is only dropped once all attributes are set
+                del self.__dict__['_lazy_data']
+                self.__dict__.pop('_lazy_lock', None)
+        return True
+
+
 def unix_to_utc(unix_time: Decimal, precision='ns', timezone: str = 'Europe/Berlin') -> str:
     """Convert a Unix timestamp to a formatted local time string with dynamic timezone handling.
 
@@ -133,45 +193,83 @@ def compute_checksum(data: bytes) -> bytes:
     return hashlib.sha256(data).digest()
 
 
-def read_checksum(data: bytes) -> Tuple[bytes, bytes]:
+def read_checksum(data: bytes) -> Tuple[memoryview, memoryview]:
     """Read and separate the SHA-256 checksum from the data.
 
     This function extracts the SHA-256 checksum from the start of a byte stream,
-    and returns the checksum along with the remaining data.
+    and returns the checksum along with the remaining data. Both are returned as
+    views on `data`, so no data is copied.
 
     Args:
         data (bytes): The byte stream that contains the checksum at the beginning.
 
     Returns:
-        tuple[bytes, bytes]: A tuple where the first element is the extracted SHA-256 checksum,
-                             and the second element is the remaining data after the checksum.
+        tuple[memoryview, memoryview]: A tuple where the first element is the extracted SHA-256 checksum,
+                                       and the second element is the remaining data after the checksum.
     """
+    data = as_memoryview(data)
     return data[0:SHA256_CHECKSUM_LENGTH], data[SHA256_CHECKSUM_LENGTH:]
 
 
-def read_data_block(data: bytes, dtype_length: int = INT_LENGTH) -> Tuple[bytes, bytes]:
+def as_memoryview(data: bytes) -> memoryview:
+    """Return a memoryview on the given bytes-like object, without copying it.
+
+    Slicing a memoryview creates another view on the same buffer, while slicing bytes copies
+    the slice. The block-reading functions therefore walk over memoryviews, so that parsing a
+    frame does not copy the frame's remaining data for every block.
+
+    Args:
+        data (bytes): A bytes-like object, e.g. bytes, bytearray, mmap or memoryview.
+
+    Returns:
+        memoryview: A view on `data`, or `data` itself if it is already a memoryview.
+    """
+    return data if isinstance(data, memoryview) else memoryview(data)
+
+
+def read_data_block(data: bytes, dtype_length: int = INT_LENGTH) -> Tuple[memoryview, memoryview]:
     """Read a block of data from the given byte stream.
 
     This function reads the first part of the byte stream that indicates the
     length of the following data block. It then extracts that block of bytes.
+    The block and the remaining byte stream are views on `data`, so no data is copied.
+
+    Args:
+        data (bytes): The input byte stream.
+        dtype_length (int): The length of the size header in bytes. Defaults to INT_LENGTH.
+
+    Returns:
+        tuple[memoryview, memoryview]: The extracted data block and the remaining byte stream.
+    """
+    data = as_memoryview(data)
+    start, end = read_block_span(data, 0, dtype_length)
+    return data[start:end], data[end:]
+
+
+def read_block_span(data: bytes, offset: int = 0, dtype_length: int = INT_LENGTH) -> Tuple[int, int]:
+    """Locate a length-prefixed block of data within the given byte stream.
+
+    In contrast to `read_data_block`, this function neither copies the block nor the remaining
+    byte stream. It only reads the size header at `offset` and returns the position of the block.
 
     Args:
         data (bytes): The input byte stream.
+        offset (int): Position of the size header within the byte stream. Defaults to 0.
         dtype_length (int): The length of the size header in bytes. Defaults to INT_LENGTH.
 
     Returns:
-        tuple[bytes, bytes]: The extracted data block and the remaining byte stream.
+        tuple[int, int]: The start and end position of the data block. The end position is the
+                         offset of the next size header in the byte stream.
     """
-    data_len = int.from_bytes(data[0:dtype_length], 'big')
-    data_block_bytes = data[dtype_length:dtype_length + data_len]
-    return data_block_bytes, data[dtype_length + data_len:]
+    start = offset + dtype_length
+    return start, start + int.from_bytes(data[offset:start], 'big')
 
 
 def obj_to_bytes(obj) -> bytes:
-    """Serialize an object to bytes using Dill.
+    """Serialize an object to bytes using the schema-based codec.
 
-    This function serializes an object into a byte stream using Dill. The
-    length of the serialized data is prepended as a header.
+    Objects that the codec does not support, and all objects if `Config.DILL_SERIALIZATION`
+    is set, are serialized using Dill. The length of the serialized data is prepended as a header.
 
     Args:
         obj: The object to be serialized.
@@ -179,26 +277,44 @@ def obj_to_bytes(obj) -> bytes:
     Returns:
         bytes: The serialized byte representation of the object.
     """
-    obj_bytes = dill.dumps(obj)
+    obj_bytes = None
+    if not Config.DILL_SERIALIZATION:
+        try:
+            obj_bytes = codec.encode(obj)
+        except TypeError:
+            pass
+    if obj_bytes is None:
+        obj_bytes = dill.dumps(obj)
     obj_bytes_len = len(obj_bytes).to_bytes(INT_LENGTH, 'big')
     return obj_bytes_len + obj_bytes
 
 
 def obj_from_bytes(data: bytes):
-    """Deserialize an object from bytes using Dill.
+    """Deserialize an object from bytes.
 
-    This function deserializes a byte stream into an object using Dill.
+    Data written by the schema-based codec is decoded without executing any code, legacy data
+    is deserialized using Dill. As Dill can execute arbitrary code, it can be disabled with
+    `Config.ALLOW_DILL` to read untrusted records. Records written by releases up to 0.9.2 or
+    in the legacy layout cannot be read then.
 
     Args:
         data (bytes): The byte data to be deserialized.
 
     Returns:
         object: The deserialized object.
+
+    Raises:
+        UnsafeDeserializationError: If the data was written by Dill and `Config.ALLOW_DILL` is disabled.
     """
+    if codec.is_encoded(data):
+        return codec.decode(data)
+    if not Config.ALLOW_DILL:
+        raise UnsafeDeserializationError("The data was serialized with Dill, which is disabled by Config.ALLOW_DILL. "
+                                         "Only read legacy records from trusted sources with Dill enabled.")
     return dill.loads(data)
 
 
-def serialize(obj) -> bytes:
+def serialize(obj, *args) -> bytes:
     """Serialize an object to bytes with a length prefix.
 
     This function serializes an object by calling its `to_bytes()` method
@@ -206,6 +322,7 @@ def serialize(obj) -> bytes:
 
     Args:
         obj: The object to be serialized.
+        *args: Additional arguments passed to the `to_bytes()` method of the object.
 
     Returns:
         bytes: The serialized byte representation of the object, or a placeholder
@@ -213,28 +330,31 @@ def serialize(obj) -> bytes:
     """
     if obj is None:
         return b'\x00\x00\x00\x00'
-    obj_bytes = obj.to_bytes()
+    obj_bytes = obj.to_bytes(*args)
     obj_bytes_len = len(obj_bytes).to_bytes(INT_LENGTH, 'big')
     return obj_bytes_len + obj_bytes
 
 
-def deserialize(data: bytes, cls, *args) -> Tuple[Optional[object], bytes]:
+def deserialize(data: bytes, cls, *args, lazy: bool = False) -> Tuple[Optional[object], memoryview]:
     """Deserialize a byte stream into an object.
 
     This function deserializes a byte stream into an object of the specified class
     by calling the class's `from_bytes()` method. The length of the serialized data
-    is used to extract the object, and the remaining data is returned.
+    is used to extract the object, and the remaining data is returned as a view on `data`.
 
     Args:
         data (bytes): The byte stream to be deserialized.
         cls (class): The class type that has a `from_bytes()` method for deserialization.
         *args: Additional arguments passed to the class's `from_bytes()` method.
+        lazy (bool): If True, the object is created with `lazy_from_bytes()` of a `LazyDecodeMixin` class
+                     and only deserialized on first attribute access. Defaults to False.
 
     Returns:
-        tuple[Optional[object], bytes]: The deserialized object and the remaining byte stream.
+        tuple[Optional[object], memoryview]: The deserialized object and the remaining byte stream.
     """
-    obj_len = int.from_bytes(data[:INT_LENGTH], 'big')
-    if obj_len == 0:
-        return None, data[INT_LENGTH:]
-    obj_data = data[INT_LENGTH:INT_LENGTH + obj_len]
-    return cls.from_bytes(obj_data, *args), data[INT_LENGTH + obj_len:]
+    obj_data, data = read_data_block(data)
+    if len(obj_data) == 0:
+        return None, data
+    if lazy:
+        return cls.lazy_from_bytes(obj_data, *args), data
+    return cls.from_bytes(obj_data, *args), data
@@ -8,3 +8,12 @@ class Config:
     Configuration class to manage library-wide settings.
     """
     REPACK = False  # True when Image and Points should be passed through
+    REPACK_IMAGES = True  # With REPACK, False to re-encode Image with JPEG_QUALITY instead of passing it through
+    REPACK_POINTS = True  # With REPACK, False to recompress Points with ZSTD_LEVEL instead of passing them through
+    JPEG_QUALITY = 85  # JPEG quality of encoded Image
+    ZSTD_LEVEL = 22  # zstd compression level of encoded Points
+    ZSTD_THREADS = 0  # zstd compression threads of encoded Points, 0 compresses in the calling thread
+    RECT_MAP_CACHE_DIR = None  # Directory to persist rectification maps in, None to keep them in memory only
+    VERIFICATION_DIR = None  # Directory of the verification sidecars, None to keep them next to the records
+    DILL_SERIALIZATION = False  # True to write metadata and time series with dill instead of the schema-based codec
+    ALLOW_DILL = True  # False to refuse reading dill data, which can execute code, e.g. of untrusted records
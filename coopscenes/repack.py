@@ -0,0 +1,183 @@
+"""
+This module provides the repacking of AMEISE-Record files (.4mse). Records are rewritten frame by frame with
+a chosen zstd compression for the points of the lidars, optionally with dictionaries trained per lidar model,
+with the JPEG data of the images passed through or re-encoded, and optionally in another on-disk layout.
+The size and the decode speed of every record are measured before and after repacking.
+
+Functions:
+    repack_record(record_path, output_path, ...):
+        Repacks a single record and reports its size and decode speed before and after.
+
+    repack_dataset(data_dir, output_dir, ...):
+        Repacks all records of a directory in a pool of worker processes.
+
+    format_report(results):
+        Formats the results of a repack as a table.
+"""
+from typing import Dict, List, Optional, Union
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+import os
+import glob
+import time
+from coopscenes.core import DataRecord, DataRecordWriter
+from coopscenes.index import RecordIndex
+from coopscenes.miscellaneous import Config
+
+LAYOUT_SHARED = 'shared'  # Static sensor information stored once in the record header
+LAYOUT_INLINE = 'inline'  # Static sensor information stored in every frame
+LAYOUT_DILL = 'dill'  # Metadata serialized with dill and stored in every frame, readable by older versions
+LAYOUTS = (LAYOUT_SHARED, LAYOUT_INLINE, LAYOUT_DILL)
+
+
+@contextmanager
+def _repack_config(zstd_level: Optional[int], zstd_threads: int, zstd_dictionary: bool, jpeg_quality: Optional[int],
+                   layout: str):
+    """Temporarily set the library configuration for repacking and restore it afterwards."""
+    names = ('REPACK', 'REPACK_IMAGES', 'REPACK_POINTS', 'JPEG_QUALITY', 'ZSTD_LEVEL', 'ZSTD_THREADS',
+             'DILL_SERIALIZATION')
+    previous = {name: getattr(Config, name) for name in names}
+    Config.REPACK = True
+    Config.REPACK_IMAGES = jpeg_quality is None
+    Config.REPACK_POINTS = zstd_level is None and not zstd_dictionary
+    Config.JPEG_QUALITY = previous['JPEG_QUALITY'] if jpeg_quality is None else jpeg_quality
+    Config.ZSTD_LEVEL = previous['ZSTD_LEVEL'] if zstd_level is None else zstd_level
+    Config.ZSTD_THREADS = zstd_threads
+    Config.DILL_SERIALIZATION = layout == LAYOUT_DILL
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(Config, name, value)
+
+
+def _measure_decode(record_path: str) -> float:
+    """Return the seconds needed to decode all frames of a record, excluding the opening of the file."""
+    with DataRecord(record_file=record_path, use_mmap=True) as record:
+        start = time.perf_counter()
+        for _ in record:
+            pass
+        return time.perf_counter() - start
+
+
+def repack_record(record_path: str, output_path: str, zstd_level: Optional[int] = None, zstd_threads: int = 0,
+                  zstd_dictionary: bool = False, jpeg_quality: Optional[int] = None, layout: str = LAYOUT_SHARED,
+                  build_index: bool = False, benchmark: bool = True) -> Dict[str, Union[str, int, float]]:
+    """Rewrite a record with another compression and layout.
+
+    The compressed data of the images and points is passed through unchanged unless a JPEG quality or
+    a zstd level or dictionaries are given, so repacking only the layout does not lose image quality.
+
+    Args:
+        record_path (str): Path to the record file to repack.
+        output_path (str): Path to the repacked record file. Must differ from `record_path`.
+        zstd_level (Optional[int]): zstd compression level of the points, e.g. 3 for fast writing or 22 for
+                                    the smallest files. Defaults to None, which passes the points through.
+        zstd_threads (int): Number of zstd compression threads per record. Defaults to 0, which compresses
+                            in the calling thread.
+        zstd_dictionary (bool): If True, a zstd dictionary is trained for every lidar model on a sample of the
+                                frames, and the points are recompressed with it. Lidar models with too few samples,
+                                e.g. in short records, are recompressed without one. Defaults to False.
+        jpeg_quality (Optional[int]): JPEG quality of the re-encoded images. Defaults to None, which passes
+                                      the images through.
+        layout (str): The on-disk layout, 'shared' to store the static sensor information once per record,
+                      'inline' to store it in every frame, or 'dill' for the legacy layout readable by releases
+                      up to 0.9.2. Defaults to 'shared'.
+        build_index (bool): If True, a sidecar index is built for the repacked record. Defaults to False.
+        benchmark (bool): If True, the decode time of all frames is measured before and after. Defaults to True.
+
+    Returns:
+        Dict[str, Union[str, int, float]]: The 'record' name, the number of 'frames', the file sizes in bytes
+            'size_before' and 'size_after', and the decode times in seconds 'decode_before' and 'decode_after',
+            which are NaN without benchmark.
+
+    Raises:
+        ValueError: If the layout is unknown, dictionaries are requested for the legacy layout, or the output path
+            is the record path.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'. Expected one of {', '.join(LAYOUTS)}.")
+    if layout == LAYOUT_DILL and zstd_dictionary:
+        raise ValueError("The legacy 'dill' layout cannot store zstd dictionaries.")
+    if os.path.abspath(record_path) == os.path.abspath(output_path):
+        raise ValueError("A record cannot be repacked onto itself.")
+
+    with _repack_config(zstd_level, zstd_threads, zstd_dictionary, jpeg_quality, layout):
+        with DataRecord(record_file=record_path, use_mmap=True) as record:
+            dictionaries = record.train_zstd_dictionaries() if zstd_dictionary else None
+            if layout == LAYOUT_DILL and record.zstd_dictionaries:
+                # Points compressed with dictionaries are not readable in the legacy layout
+                Config.REPACK_POINTS = False
+            with DataRecordWriter(output_path, share_objects=layout == LAYOUT_SHARED,
+                                  zstd_dictionaries=dictionaries) as writer:
+                if Config.REPACK_POINTS:
+                    writer.add_zstd_dictionaries(record.zstd_dictionaries)
+                for frame in record:
+                    writer.write(frame)
+            name, num_frames = record.name, record.num_frames
+
+    if build_index:
+        with DataRecord(record_file=output_path, use_mmap=True) as record:
+            RecordIndex.build(record).save()
+
+    return {
+        'record': name,
+        'frames': num_frames,
+        'size_before': os.path.getsize(record_path),
+        'size_after': os.path.getsize(output_path),
+        'decode_before': _measure_decode(record_path) if benchmark else float('nan'),
+        'decode_after': _measure_decode(output_path) if benchmark else float('nan'),
+    }
+
+
+def repack_dataset(data_dir: str, output_dir: str, workers: Optional[int] = None, **kwargs) \
+        -> List[Dict[str, Union[str, int, float]]]:
+    """Repack all records of a directory in a pool of worker processes, one record per task.
+
+    Args:
+        data_dir (str): The directory containing .4mse record files.
+        output_dir (str): The directory to write the repacked records to. It is created if it does not exist.
+        workers (Optional[int]): Number of worker processes. Defaults to None, which uses the number of CPUs.
+        **kwargs: Options of `repack_record`.
+
+    Returns:
+        List[Dict[str, Union[str, int, float]]]: The results of `repack_record` for every record, in the order
+            of the record files.
+
+    Raises:
+        ValueError: If the output directory is the data directory.
+    """
+    if os.path.abspath(data_dir) == os.path.abspath(output_dir):
+        raise ValueError("The output directory must differ from the data directory.")
+    os.makedirs(output_dir, exist_ok=True)
+    record_paths = sorted(glob.glob(os.path.join(data_dir, '*.4mse')))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(repack_record, path, os.path.join(output_dir, os.path.basename(path)), **kwargs)
+                   for path in record_paths]
+        return [future.result() for future in futures]
+
+
+def format_report(results: List[Dict[str, Union[str, int, float]]]) -> str:
+    """Format the results of a repack as a table with one row per record and a total.
+
+    Args:
+        results (List[Dict[str, Union[str, int, float]]]): The results of `repack_record`.
+
+    Returns:
+        str: The table, with sizes in MB and decode speeds in frames per second.
+    """
+    def row(name, frames, size_before, size_after, decode_before, decode_after):
+        ratio = size_after / size_before if size_before else float('nan')
+        fps_before = frames / decode_before if decode_before else float('nan')
+        fps_after = frames / decode_after if decode_after else float('nan')
+        return (f"{name:<40} {frames:>7} {size_before / 1e6:>10.1f} {size_after / 1e6:>10.1f} {ratio:>6.2f} "
+                f"{fps_before:>10.1f} {fps_after:>10.1f}")
+
+    lines = [f"{'record':<40} {'frames':>7} {'MB before':>10} {'MB after':>10} {'ratio':>6} "
+             f"{'fps before':>10} {'fps after':>10}"]
+    keys = ('frames', 'size_before', 'size_after', 'decode_before', 'decode_after')
+    for result in results:
+        lines.append(row(result['record'], *(result[key] for key in keys)))
+    if len(results) > 1:
+        lines.append(row('total', *(sum(result[key] for result in results) for key in keys)))
+    return '\n'.join(lines)
@@ -17,6 +17,7 @@ from typing import Tuple, Union, Optional
 import numpy as np
 from coopscenes.data import Lidar, Camera, Tower, Vehicle, Frame, VehicleInformation, LidarInformation
 from coopscenes.utils import get_transformation, transform_points_to_origin
+from coopscenes.utils.image import _scale_intrinsics
 import importlib.util
 
 
@@ -26,7 +27,8 @@ def get_projection(lidar: Lidar, camera: Camera, vehicle_info: Optional[VehicleI
 
     Transforms the 3D points from a LiDAR sensor into the camera's coordinate frame and projects them onto the 2D
     image plane of the camera using the camera's intrinsic, extrinsic, and rectification matrices. Filters points
-    that are behind the camera or outside the image bounds.
+    that are behind the camera or outside the image bounds. For images decoded at a reduced scale, the projection
+    matrix and the bounds are scaled to the size of the image.
 
     Args:
         lidar (Lidar): The LiDAR sensor containing 3D points to project.
@@ -60,6 +62,10 @@ def get_projection(lidar: Lidar, camera: Camera, vehicle_info: Optional[VehicleI
     rect_mtx = np.eye(4)
     rect_mtx[:3, :3] = camera.info.rectification_mtx
     proj_mtx = camera.info.projection_mtx
+    width, height = camera.size
+    calibrated_width, calibrated_height = (int(length) for length in camera.info.shape)
+    if (width, height) != (calibrated_width, calibrated_height):
+        proj_mtx = _scale_intrinsics(proj_mtx, width / calibrated_width, height / calibrated_height)
 
     # Prepare points in homogeneous coordinates
     points_3d = np.array([point.tolist()[:3] for point in lidar.points])
@@ -81,7 +87,7 @@ def get_projection(lidar: Lidar, camera: Camera, vehicle_info: Optional[VehicleI
     # Filter points that are within the image bounds
     u = points_2d[valid_indices, 0]
     v = points_2d[valid_indices, 1]
-    within_bounds = (u >= 0) & (u < camera.info.shape[0]) & (v >= 0) & (v < camera.info.shape[1])
+    within_bounds = (u >= 0) & (u < width) & (v >= 0) & (v < height)
 
     # Select the final 3D points and their 2D projections
     final_points_3d = points_3d[valid_indices][within_bounds]
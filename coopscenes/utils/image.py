@@ -6,6 +6,18 @@ Functions:
     get_rect_img(data, performance_mode):
         Rectify the provided image using the camera's intrinsic and extrinsic parameters.
 
+    get_rect_maps(camera_info, size):
+        Return the cached undistortion and rectification maps of a camera, optionally for a reduced image size.
+
+    clear_rect_map_cache():
+        Remove all rectification maps from the in-memory cache.
+
+    rectify_frame(frame, cameras, interpolation, out, executor):
+        Rectify the images of several cameras of a frame concurrently.
+
+    rectify_record(record, cameras, interpolation, workers):
+        Rectify the images of the cameras of all frames of a record.
+
     get_disparity_map(camera_left, camera_right, stereo_param):
         Compute a disparity map from a pair of stereo images.
 
@@ -15,19 +27,142 @@ Functions:
     disparity_to_depth(disparity_map, camera_info):
         Convert a disparity map into a depth map using camera parameters.
 """
-from typing import Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+import hashlib
+import os
+import threading
 from PIL import Image as PilImage
-from coopscenes.data import CameraInformation, Camera, Image
+from coopscenes.data import CameraInformation, Camera, Image, Frame
+from coopscenes.miscellaneous import Config
 from coopscenes.utils import Transformation
 import numpy as np
 import cv2
 
+_RECT_MAP_CACHE_SIZE = 16  # Maximum number of rectification maps kept in memory
+_rect_maps: OrderedDict = OrderedDict()
+_rect_maps_lock = threading.Lock()
+
+
+def _get_rect_map_key(camera_info: CameraInformation, size: Tuple[int, int]) -> str:
+    """Return a digest of the intrinsics, rectification and image sizes that define the maps of a camera."""
+    digest = hashlib.sha256()
+    for matrix in (camera_info.camera_mtx, camera_info.distortion_mtx[:-1], camera_info.rectification_mtx,
+                   camera_info.projection_mtx):
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        digest.update(repr(matrix.shape).encode())
+        digest.update(matrix.tobytes())
+    digest.update(repr(tuple(int(length) for length in camera_info.shape)).encode())
+    digest.update(repr(size).encode())
+    return digest.hexdigest()
+
+
+def _scale_intrinsics(matrix: np.ndarray, scale_x: float, scale_y: float) -> np.ndarray:
+    """Scale a camera or projection matrix to a resized image, keeping the pixel centers aligned."""
+    matrix = np.array(matrix, dtype=np.float64)
+    matrix[0] *= scale_x
+    matrix[1] *= scale_y
+    matrix[0, 2] += 0.5 * (scale_x - 1)
+    matrix[1, 2] += 0.5 * (scale_y - 1)
+    return matrix
+
+
+def get_rect_maps(camera_info: CameraInformation, size: Optional[Tuple[int, int]] = None) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """Return the undistortion and rectification maps of a camera for `cv2.remap`.
+
+    The maps are computed once per combination of intrinsics, rectification and image size, and are
+    shared by all frames and records of the process. The most recently used maps are kept in memory.
+    If `Config.RECT_MAP_CACHE_DIR` is set, the maps are also stored in that directory and loaded from
+    there by later processes. If the maps cannot be written there, e.g. because the directory is read-only
+    or full, they are only kept in memory.
+
+    For images decoded at a reduced scale, the camera and projection matrices are scaled to the size
+    of the image, so the maps rectify the reduced image directly.
+
+    Args:
+        camera_info (CameraInformation): The calibration of the camera.
+        size (Optional[Tuple[int, int]]): The width and height of the images to rectify. Defaults to None,
+                                          which uses the calibrated shape of the camera.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The maps in the fixed-point format CV_16SC2. They are shared and must
+            not be modified.
+    """
+    shape = tuple(int(length) for length in camera_info.shape)
+    size = shape if size is None else tuple(int(length) for length in size)
+    key = _get_rect_map_key(camera_info, size)
+    with _rect_maps_lock:
+        maps = _rect_maps.get(key)
+        if maps is not None:
+            _rect_maps.move_to_end(key)
+            return maps
+
+    maps = None
+    cache_path = None
+    if Config.RECT_MAP_CACHE_DIR is not None:
+        cache_path = os.path.join(Config.RECT_MAP_CACHE_DIR, f'rect_map_{key}.npz')
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as content:
+                maps = content['mapx'], content['mapy']
+        except (OSError, ValueError, KeyError):
+            maps = None
+    if maps is None:
+        camera_mtx, projection_mtx = camera_info.camera_mtx, camera_info.projection_mtx
+        if size != shape:
+            scale_x, scale_y = size[0] / shape[0], size[1] / shape[1]
+            camera_mtx = _scale_intrinsics(camera_mtx, scale_x, scale_y)
+            projection_mtx = _scale_intrinsics(projection_mtx, scale_x, scale_y)
+        maps = cv2.initUndistortRectifyMap(
+            cameraMatrix=camera_mtx,
+            distCoeffs=camera_info.distortion_mtx[:-1],
+            R=camera_info.rectification_mtx,
+            newCameraMatrix=projection_mtx,
+            size=size,
+            m1type=cv2.CV_16SC2
+        )
+        if cache_path is not None:
+            _save_rect_maps(cache_path, maps)
+    for rect_map in maps:
+        rect_map.flags.writeable = False
+
+    with _rect_maps_lock:
+        _rect_maps[key] = maps
+        _rect_maps.move_to_end(key)
+        while len(_rect_maps) > _RECT_MAP_CACHE_SIZE:
+            _rect_maps.popitem(last=False)
+    return maps
+
+
+def _save_rect_maps(cache_path: str, maps: Tuple[np.ndarray, np.ndarray]):
+    """Persist rectification maps to `Config.RECT_MAP_CACHE_DIR`, keeping them in memory only if this fails."""
+    tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(Config.RECT_MAP_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, mapx=maps[0], mapy=maps[1])
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def clear_rect_map_cache():
+    """Remove all rectification maps from the in-memory cache. Maps persisted to disk are kept."""
+    with _rect_maps_lock:
+        _rect_maps.clear()
+
 
 def get_rect_img(data: Union[Camera, Tuple[Image, CameraInformation]], performance_mode: bool = False) -> Image:
     """Rectify the provided image using either a Camera object or an Image with CameraInformation.
 
     Performs image rectification using the camera matrix, distortion coefficients, rectification matrix,
-    and projection matrix. The rectified image is returned as an `Image` object.
+    and projection matrix. The rectification maps are cached, see `get_rect_maps`, and match the size of
+    images decoded at a reduced scale. The rectified image is returned as an `Image` object.
 
     Args:
         data (Union[Camera, Tuple[Image, CameraInformation]]): Either a Camera object containing the image and calibration parameters,
@@ -43,22 +178,110 @@ def get_rect_img(data: Union[Camera, Tuple[Image, CameraInformation]], performan
     else:
         image, camera_info = data
 
-    mapx, mapy = cv2.initUndistortRectifyMap(
-        cameraMatrix=camera_info.camera_mtx,
-        distCoeffs=camera_info.distortion_mtx[:-1],
-        R=camera_info.rectification_mtx,
-        newCameraMatrix=camera_info.projection_mtx,
-        size=camera_info.shape,
-        m1type=cv2.CV_16SC2
-    )
+    mapx, mapy = get_rect_maps(camera_info, image.image.size)
 
     interpolation_algorithm = cv2.INTER_LINEAR if performance_mode else cv2.INTER_LANCZOS4
 
-    rectified_image = cv2.remap(np.array(image.image), mapx, mapy, interpolation=interpolation_algorithm)
+    rectified_image = cv2.remap(image.to_numpy(), mapx, mapy, interpolation=interpolation_algorithm)
 
     return Image(PilImage.fromarray(rectified_image), image.timestamp, image.labels)
 
 
+def _get_frame_cameras(frame: Frame, cameras: Optional[Iterable[str]]) -> Dict[str, Camera]:
+    """Return the cameras of a frame that hold an image, keyed by attribute path, e.g. 'vehicle.cameras.REAR'."""
+    camera_names = [name for name in Frame.get_sensor_names() if '.cameras.' in name]
+    if cameras is not None:
+        selected = Frame.resolve_sensors(cameras)
+        camera_names = [name for name in camera_names if name in selected]
+    found = {}
+    for name in camera_names:
+        agent, group, camera_name = name.split('.')
+        camera = getattr(getattr(getattr(frame, agent), group), camera_name)
+        if camera is not None and camera._image_raw is not None:
+            found[name] = camera
+    return found
+
+
+def _rectify_into(camera: Camera, dst: np.ndarray, interpolation: int) -> np.ndarray:
+    """Decode the raw image of a camera and rectify it into a preallocated array."""
+    mapx, mapy = get_rect_maps(camera.info, camera.size)
+    return cv2.remap(camera._image_raw.to_numpy(), mapx, mapy, interpolation=interpolation, dst=dst)
+
+
+def rectify_frame(frame: Frame, cameras: Optional[Iterable[str]] = None, interpolation: int = cv2.INTER_LANCZOS4,
+                  out: Optional[Dict[str, np.ndarray]] = None, executor: Optional[Executor] = None) \
+        -> Dict[str, np.ndarray]:
+    """Rectify the images of several cameras of a frame concurrently.
+
+    The images are decoded straight into numpy, see `Image.to_numpy`, and remapped in a thread pool,
+    as both `cv2.imdecode` and `cv2.remap` release the GIL. The cached rectification maps are used,
+    see `get_rect_maps`, and every image is remapped directly into its output array, which is allocated
+    before the work is distributed.
+
+    Args:
+        frame (Frame): The frame containing the cameras.
+        cameras (Optional[Iterable[str]]): Cameras to rectify, e.g. ['vehicle.cameras.STEREO_LEFT', 'tower.cameras'].
+                                           Defaults to None, which rectifies all cameras holding an image.
+        interpolation (int): The OpenCV interpolation, e.g. cv2.INTER_LINEAR for speed. Defaults to cv2.INTER_LANCZOS4,
+                             as used by `get_rect_img`.
+        out (Optional[Dict[str, np.ndarray]]): Preallocated output arrays keyed by attribute path, e.g. the result
+                                               of a previous call to reuse its buffers. Arrays of the wrong shape
+                                               or type are replaced. Defaults to None, which allocates new arrays.
+        executor (Optional[Executor]): Thread pool to rectify the images in. Defaults to None, which uses a new
+                                       thread pool with one thread per camera.
+
+    Returns:
+        Dict[str, np.ndarray]: The rectified images as arrays of shape (height, width, channels), keyed by the
+            attribute path of their camera.
+
+    Raises:
+        ValueError: If an unknown camera is selected.
+    """
+    selected = _get_frame_cameras(frame, cameras)
+    rectified = {}
+    for name, camera in selected.items():
+        width, height = camera.size
+        bands = len(camera._image_raw.image.getbands())
+        shape = (height, width) if bands == 1 else (height, width, bands)
+        dst = None if out is None else out.get(name)
+        if dst is None or dst.shape != shape or dst.dtype != np.uint8:
+            dst = np.empty(shape, dtype=np.uint8)
+        rectified[name] = dst
+    if not selected:
+        return rectified
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            return rectify_frame(frame, list(selected), interpolation, rectified, pool)
+    futures = {name: executor.submit(_rectify_into, camera, rectified[name], interpolation)
+               for name, camera in selected.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def rectify_record(record, cameras: Optional[Iterable[str]] = None, interpolation: int = cv2.INTER_LANCZOS4,
+                   workers: Optional[int] = None) -> Iterator[Tuple[Frame, Dict[str, np.ndarray]]]:
+    """Rectify the images of the cameras of all frames of a record.
+
+    Only the selected cameras of the frames are deserialized, and all frames share one thread pool,
+    see `rectify_frame`. The output arrays are newly allocated for every frame, so they can be kept.
+
+    Args:
+        record (DataRecord): The record to rectify.
+        cameras (Optional[Iterable[str]]): Cameras to rectify, see `rectify_frame`. Defaults to None,
+                                           which rectifies all cameras.
+        interpolation (int): The OpenCV interpolation. Defaults to cv2.INTER_LANCZOS4.
+        workers (Optional[int]): Number of threads. Defaults to None, which uses the default of `ThreadPoolExecutor`.
+
+    Yields:
+        Tuple[Frame, Dict[str, np.ndarray]]: Every frame together with its rectified images, keyed by the
+            attribute path of their camera.
+    """
+    sensors = [name for name in Frame.get_sensor_names() if '.cameras.' in name] if cameras is None else cameras
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for frame in record.iter_frames(sensors):
+            yield frame, rectify_frame(frame, cameras, interpolation, executor=executor)
+
+
 def get_disparity_map(camera_left: Camera, camera_right: Camera,
                       stereo_param: Optional[cv2.StereoSGBM] = None) -> np.ndarray:
     """Compute a disparity map from a pair of stereo images.
@@ -0,0 +1,146 @@
+"""
+This module provides a columnar view on the time series of a record. The motion data of the IMU, the positions
+of the GNSS receivers and the velocity and heading of the vehicle dynamics are collected from all frames of a
+record into one contiguous numpy structured array per stream, with int64 nanosecond timestamps.
+
+Functions:
+    get_time_series(record):
+        Collects the time series of all frames of a record into numpy structured arrays, one per stream.
+
+    export_time_series(record, output_dir, file_format):
+        Writes the time series of a record to a .npz file or to one Parquet file per stream.
+"""
+from typing import Dict, List
+from decimal import Decimal
+import os
+import importlib.util
+import numpy as np
+
+# Streams of a frame by their attribute path: (agent, sensor, attribute holding the list of entries)
+TIME_SERIES_STREAMS = {
+    'vehicle.IMU.motion': ('vehicle', 'IMU', 'motion'),
+    'vehicle.GNSS.position': ('vehicle', 'GNSS', 'position'),
+    'vehicle.DYNAMICS.velocity': ('vehicle', 'DYNAMICS', 'velocity'),
+    'vehicle.DYNAMICS.heading': ('vehicle', 'DYNAMICS', 'heading'),
+    'tower.GNSS.position': ('tower', 'GNSS', 'position'),
+}
+
+
+def get_time_series(record) -> Dict[str, np.ndarray]:
+    """Collects the time series of all frames of a record into numpy structured arrays.
+
+    Only the IMU, GNSS and dynamics blocks of the frames are deserialized. Every array holds the entries
+    of all frames in record order, with the fields 'timestamp_ns' (int64 nanoseconds) and 'frame_index',
+    followed by the attributes of the entries. Vectors and matrices become subarray fields, Decimals
+    become float64, missing values become NaN, strings become unicode fields, and the services of a
+    position are split into int8 fields like 'services_GPS' (1 available, 0 unavailable, -1 unknown).
+    Use `DataRecord.get_time_series` to compute the arrays only once per record.
+
+    Args:
+        record (DataRecord): The record to collect the time series from.
+
+    Returns:
+        Dict[str, np.ndarray]: The structured array of every stream, keyed by its attribute path,
+            e.g. 'vehicle.IMU.motion'.
+    """
+    sensors = sorted({f'{agent}.{sensor}' for agent, sensor, _ in TIME_SERIES_STREAMS.values()})
+    entries = {stream: ([], []) for stream in TIME_SERIES_STREAMS}
+    for frame_index, frame in enumerate(record.iter_frames(sensors)):
+        for stream, (agent, sensor, attr) in TIME_SERIES_STREAMS.items():
+            sensor_data = getattr(getattr(frame, agent), sensor)
+            if sensor_data is None or getattr(sensor_data, attr) is None:
+                continue
+            frame_indices, stream_entries = entries[stream]
+            stream_entries.extend(getattr(sensor_data, attr))
+            frame_indices.extend([frame_index] * len(getattr(sensor_data, attr)))
+    return {stream: _to_structured_array(frame_indices, stream_entries)
+            for stream, (frame_indices, stream_entries) in entries.items()}
+
+
+def _to_structured_array(frame_indices: List[int], entries: list) -> np.ndarray:
+    """Converts a list of time series entries into a structured array, see `get_time_series`."""
+    columns = {
+        'timestamp_ns': np.array([int(Decimal(entry.timestamp).scaleb(9)) for entry in entries], dtype=np.int64),
+        'frame_index': np.array(frame_indices, dtype=np.int64),
+    }
+    if entries:
+        for attr, value in vars(entries[0]).items():
+            if attr == 'timestamp':
+                continue
+            values = [getattr(entry, attr, None) for entry in entries]
+            if isinstance(value, dict):
+                for key in value:
+                    flags = [item.get(key) if item else None for item in values]
+                    columns[f'{attr}_{key}'] = np.array([-1 if flag is None else int(flag) for flag in flags],
+                                                        dtype=np.int8)
+            else:
+                columns[attr] = _to_column(values)
+
+    array = np.empty(len(entries), dtype=[(name, column.dtype, column.shape[1:]) for name, column in columns.items()])
+    for name, column in columns.items():
+        array[name] = column
+    return array
+
+
+def _to_column(values: list) -> np.ndarray:
+    """Converts the values of one attribute of all entries into a numpy array."""
+    first_array = next((value for value in values if isinstance(value, np.ndarray)), None)
+    if first_array is not None:
+        missing = np.full(first_array.shape, np.nan)
+        return np.stack([missing if value is None else np.asarray(value, dtype=np.float64) for value in values])
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, str) for value in present):
+        return np.array(['' if value is None else value for value in values], dtype=str)
+    if present and len(present) == len(values) and all(isinstance(value, (int, np.integer)) for value in values):
+        return np.array(values, dtype=np.int64)
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def export_time_series(record, output_dir: str, file_format: str = 'npz') -> List[str]:
+    """Writes the time series of a record to disk.
+
+    With 'npz', all streams are written to `<record name>_time_series.npz`, keyed by their attribute path.
+    With 'parquet', every stream is written to `<record name>.<stream>.parquet`, with subarray fields stored
+    as fixed size lists of their flattened values. Parquet requires pyarrow.
+
+    Args:
+        record (DataRecord): The record to export the time series from.
+        output_dir (str): The directory to write the files to. It is created if it does not exist.
+        file_format (str): Either 'npz' or 'parquet'. Defaults to 'npz'.
+
+    Returns:
+        List[str]: The paths of the written files.
+
+    Raises:
+        ValueError: If the file format is unknown.
+        ImportError: If 'parquet' is requested but pyarrow is not installed.
+    """
+    if file_format not in ('npz', 'parquet'):
+        raise ValueError(f"Unknown file format '{file_format}'. Expected 'npz' or 'parquet'.")
+    if file_format == 'parquet' and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError('Install pyarrow to export Parquet files with: python -m pip install pyarrow')
+
+    os.makedirs(output_dir, exist_ok=True)
+    time_series = record.get_time_series()
+    if file_format == 'npz':
+        path = os.path.join(output_dir, f'{record.name}_time_series.npz')
+        np.savez(path, **time_series)
+        return [path]
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    paths = []
+    for stream, array in time_series.items():
+        path = os.path.join(output_dir, f'{record.name}.{stream}.parquet')
+        pq.write_table(pa.table({name: _to_arrow_column(array[name]) for name in array.dtype.names}), path)
+        paths.append(path)
+    return paths
+
+
+def _to_arrow_column(column: np.ndarray):
+    """Converts a field of a structured array into an Arrow array, flattening subarrays into fixed size lists."""
+    import pyarrow as pa
+    if column.ndim == 1:
+        return pa.array(column)
+    flat = column.reshape(len(column), -1)
+    return pa.FixedSizeListArray.from_arrays(pa.array(flat.ravel()), flat.shape[1])
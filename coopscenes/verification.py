@@ -0,0 +1,201 @@
+"""
+This module provides the integrity verification of AMEISE-Record files (.4mse). Frames are verified
+according to a verification policy, and the results of the 'once' policy are kept in a sidecar file
+next to the record as `<record>.4mse.vrf`, so every frame is only hashed the first time it is read.
+If `Config.VERIFICATION_DIR` is set, the sidecars are kept in that directory instead, e.g. for datasets
+on read-only storage. If a sidecar cannot be written, the statuses are only kept in memory.
+
+Classes:
+    VerificationLog: Represents the verification sidecar of a record, holding the verification status of each frame.
+
+Functions:
+    check_verify_mode: Validates a verification policy.
+    verify_dataset: Verifies all records of a directory in parallel and reports the corrupt frames.
+"""
+from typing import Dict, List, Optional, Tuple
+import os
+import glob
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from coopscenes.data import Frame
+from coopscenes.miscellaneous import Config
+
+VERIFY_ALWAYS = 'always'  # Verify every frame every time it is decoded
+VERIFY_ONCE = 'once'  # Verify every frame the first time it is decoded and record the result
+VERIFY_NEVER = 'never'  # Never verify frames
+VERIFY_MODES = (VERIFY_ALWAYS, VERIFY_ONCE, VERIFY_NEVER)
+
+VERIFICATION_EXTENSION = '.vrf'  # Appended to the record path, e.g. record.4mse.vrf
+_HEADER = struct.Struct('>4sqq')  # Magic, size and modification time of the record file
+_MAGIC = b'4VRF'
+_FLUSH_INTERVAL = 64  # Statuses set in memory before they are written to the sidecar
+
+STATUS_UNKNOWN = 0
+STATUS_VALID = 1
+STATUS_CORRUPT = 2
+
+
+def check_verify_mode(verify: str) -> str:
+    """Validate a verification policy.
+
+    Args:
+        verify (str): The verification policy, one of 'always', 'once' or 'never'.
+
+    Returns:
+        str: The verification policy.
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    if verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verification policy '{verify}'. Expected one of {', '.join(VERIFY_MODES)}.")
+    return verify
+
+
+class VerificationLog:
+    """Class representing the verification sidecar of an AMEISE-Record file.
+
+    The sidecar holds one status byte per frame, after a header with the size and modification
+    time of the record file. If the record file changed, all frames are unverified again.
+    Statuses are kept in memory and written to the file in batches, every 64 statuses, as soon as a
+    frame is corrupt, and when the log is flushed, e.g. by closing its `DataRecord`. If the sidecar
+    cannot be written, e.g. in a read-only dataset directory, the statuses are only kept in memory.
+
+    Attributes:
+        record_path (str): Path to the record file the sidecar belongs to.
+        statuses (bytearray): The verification status of each frame, see STATUS_UNKNOWN, STATUS_VALID
+            and STATUS_CORRUPT.
+        persistent (bool): Whether the statuses are written to the sidecar.
+    """
+
+    def __init__(self, record_path: str, num_frames: int):
+        """Open the verification sidecar of a record, creating it if it is missing or outdated.
+
+        Args:
+            record_path (str): Path to the record file.
+            num_frames (int): The number of frames in the record.
+        """
+        self.record_path = record_path
+        self._lock = threading.Lock()
+        stat = os.stat(record_path)
+        self._header = _HEADER.pack(_MAGIC, stat.st_size, stat.st_mtime_ns)
+        self.statuses = bytearray(num_frames)
+        self.persistent = True
+        self._dirty = 0
+        try:
+            with open(self.get_path(record_path), 'rb') as file:
+                content = file.read()
+        except OSError:
+            content = b''
+        if content[:_HEADER.size] == self._header and len(content) == _HEADER.size + num_frames:
+            self.statuses[:] = content[_HEADER.size:]
+        else:
+            self.save()
+
+    @staticmethod
+    def get_path(record_path: str) -> str:
+        """Return the path of the verification sidecar belonging to a record file, see `Config.VERIFICATION_DIR`."""
+        if Config.VERIFICATION_DIR is not None:
+            return os.path.join(Config.VERIFICATION_DIR, os.path.basename(record_path) + VERIFICATION_EXTENSION)
+        return record_path + VERIFICATION_EXTENSION
+
+    def get_status(self, frame_index: int) -> int:
+        """Return the verification status of a frame."""
+        return self.statuses[frame_index]
+
+    def set_status(self, frame_index: int, status: int):
+        """Set the verification status of a frame, writing the pending statuses to the sidecar in batches.
+
+        Args:
+            frame_index (int): Index of the frame within the record.
+            status (int): The verification status of the frame.
+        """
+        with self._lock:
+            self.statuses[frame_index] = status
+            if not self.persistent:
+                return
+            self._dirty += 1
+            flush = self._dirty >= _FLUSH_INTERVAL or status == STATUS_CORRUPT
+        if flush:
+            self.save()
+
+    def flush(self):
+        """Write the statuses that were set since the last write to the sidecar."""
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        """Write the header and the verification status of all frames to the sidecar.
+
+        If the sidecar cannot be written, the statuses are kept in memory only from then on.
+        """
+        with self._lock:
+            path = self.get_path(self.record_path)
+            try:
+                if Config.VERIFICATION_DIR is not None:
+                    os.makedirs(Config.VERIFICATION_DIR, exist_ok=True)
+                with open(path, 'wb') as file:
+                    file.write(self._header + bytes(self.statuses))
+                self.persistent = True
+            except OSError:
+                self.persistent = False
+            self._dirty = 0
+
+    def get_corrupt_frames(self) -> List[int]:
+        """Return the indices of all frames that failed their verification."""
+        return [i for i, status in enumerate(self.statuses) if status == STATUS_CORRUPT]
+
+
+def _verify_frames(record_path: str, start: int, stop: int) -> Tuple[str, List[int], List[int]]:
+    """Verify a range of frames of a record, returning the record path, the checked and the corrupt frame indices."""
+    from coopscenes.core import DataRecord
+    with DataRecord(record_file=record_path, use_mmap=True) as record:
+        checked, corrupt = [], []
+        for i in range(start, min(stop, record.num_frames)):
+            frame_data = record.frames_data[record.frame_offsets[i]:record.frame_offsets[i + 1]]
+            checked.append(i)
+            if not Frame.verify_checksum(frame_data):
+                corrupt.append(i)
+    return record_path, checked, corrupt
+
+
+def verify_dataset(data_dir: str, workers: Optional[int] = None, chunk_size: int = 64,
+                   update_logs: bool = True) -> Dict[str, List[int]]:
+    """Verify the checksums of all frames of all records in a directory, using a pool of worker processes.
+
+    Args:
+        data_dir (str): The directory containing .4mse record files.
+        workers (Optional[int]): Number of worker processes. Defaults to None, which uses the number of CPUs.
+        chunk_size (int): Number of frames verified per task. Defaults to 64.
+        update_logs (bool): If True, the results are written to the verification sidecars of the records,
+                            so that readers with the 'once' policy do not verify the frames again.
+                            Defaults to True.
+
+    Returns:
+        Dict[str, List[int]]: The indices of the corrupt frames of every record that contains corrupt frames,
+            keyed by record path.
+    """
+    from coopscenes.core import DataRecord
+    record_paths = sorted(glob.glob(os.path.join(data_dir, '*.4mse')))
+    num_frames = {}
+    for record_path in record_paths:
+        with DataRecord(record_file=record_path, use_mmap=True) as record:
+            num_frames[record_path] = record.num_frames
+
+    corrupt_frames: Dict[str, List[int]] = {}
+    logs = {path: VerificationLog(path, n) for path, n in num_frames.items()} if update_logs else {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_verify_frames, path, start, start + chunk_size)
+                   for path in record_paths for start in range(0, num_frames[path], chunk_size)]
+        for future in futures:
+            record_path, checked, corrupt = future.result()
+            if corrupt:
+                corrupt_frames.setdefault(record_path, []).extend(corrupt)
+            if update_logs:
+                corrupt_set = set(corrupt)
+                for i in checked:
+                    logs[record_path].statuses[i] = STATUS_CORRUPT if i in corrupt_set else STATUS_VALID
+    for log in logs.values():
+        log.save()
+    return corrupt_frames
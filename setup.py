@@ -19,5 +19,10 @@ setup(
     author_email='marcel.vosshans@hs-esslingen.de',
     description='Dev-Kit for CoopScenes',
     long_description=long_description,
-    long_description_content_type="text/markdown"
+    long_description_content_type="text/markdown",
+    entry_points={
+        'console_scripts': [
+            'coopscenes=coopscenes.cli:main',
+        ],
+    }
 )
@@ -0,0 +1,113 @@
+"""
+Shared fixtures of the test suite. The records are synthetic and tiny: every frame holds all cameras with
+64x48 JPEG images, all lidars with a few hundred points, and IMU, GNSS and dynamics data.
+"""
+import os
+from decimal import Decimal
+import numpy as np
+import pytest
+from PIL import Image as PilImage
+import coopscenes as cs
+from coopscenes.data import CameraInformation, LidarInformation, IMUInformation, GNSSInformation, \
+    DynamicsInformation, VehicleInformation, TowerInformation, ROI, Frame, Camera, Lidar, IMU, GNSS, Dynamics, \
+    Image, Points, Motion, Position, Velocity, Heading, VisionSensorsVeh, VisionSensorsTow, LaserSensorsVeh, \
+    LaserSensorsTow
+
+RECORD_FRAMES = (4, 5, 6)  # Number of frames of the records in `record_dir`
+
+
+def camera_info(name: str) -> CameraInformation:
+    """Return the calibration of a synthetic 64x48 camera."""
+    return CameraInformation(name, model_name='cam', shape=(64, 48),
+                             camera_mtx=np.array([[50., 0, 32], [0, 50., 24], [0, 0, 1]]),
+                             distortion_mtx=np.array([0.01, 0.0, 0.0, 0.0, 0.0, 0.0]),
+                             rectification_mtx=np.eye(3),
+                             projection_mtx=np.array([[50., 0, 32, 0], [0, 50., 24, 0], [0, 0, 1, 0]]),
+                             region_of_interest=ROI(0, 0, 64, 48), extrinsic=np.eye(4))
+
+
+def lidar_info(name: str) -> LidarInformation:
+    """Return the information of a synthetic lidar, the tower lidars being of another model."""
+    return LidarInformation(name, model_name='BF' if 'view' in name.lower() else 'OS', extrinsic=np.eye(4),
+                            beam_altitude_angles=np.linspace(-10, 10, 16))
+
+
+def timestamp(i: int, k: int = 0) -> Decimal:
+    """Return a nanosecond timestamp of frame i with the offset k."""
+    return Decimal(f"{1700000000 + i}.{123456789 + k:09d}")
+
+
+def make_frame(i: int, seed: int = 0) -> Frame:
+    """Create a synthetic frame with all sensors."""
+    rng = np.random.default_rng((seed, i))
+    frame = Frame(i, timestamp(i), '0.9')
+    frame.vehicle.info = VehicleInformation('veh', np.eye(4), np.eye(4))
+    for name in VisionSensorsVeh._CAMERA_NAMES:
+        pixels = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+        setattr(frame.vehicle.cameras, name, Camera(camera_info(name), Image(PilImage.fromarray(pixels),
+                                                                            timestamp(i, 1))))
+    for name in LaserSensorsVeh._LIDAR_NAMES:
+        info = lidar_info(name)
+        points = np.zeros(200, dtype=info.dtype)
+        for axis in ('x', 'y', 'z'):
+            points[axis] = rng.random(200)
+        setattr(frame.vehicle.lidars, name, Lidar(info, Points(points, timestamp(i, 2))))
+    frame.vehicle.IMU = IMU(IMUInformation('imu', np.eye(4)))
+    frame.vehicle.IMU.motion = [Motion(timestamp(i, 10 + k), np.ones(4) * k, np.eye(3), np.ones(3), np.eye(3),
+                                       np.ones(3), np.eye(3)) for k in range(5)]
+    frame.vehicle.GNSS = GNSS(GNSSInformation('gnss', np.eye(4)))
+    frame.vehicle.GNSS.position = [Position(timestamp(i, 20 + k), 'fix', {'GPS': True}, Decimal('48.1234567891'),
+                                            Decimal('9.12345678'), Decimal('300.5'), np.eye(3), 'known')
+                                   for k in range(2)]
+    frame.vehicle.DYNAMICS = Dynamics(DynamicsInformation('gnss', 'imu'))
+    frame.vehicle.DYNAMICS.velocity = [Velocity(timestamp(i, 30 + k), np.ones(3), np.zeros(3), np.eye(6))
+                                       for k in range(3)]
+    frame.vehicle.DYNAMICS.heading = [Heading(timestamp(i, 40 + k), np.ones(4), np.eye(3)) for k in range(3)]
+    frame.tower.info = TowerInformation('tower', np.eye(4))
+    for name in VisionSensorsTow._CAMERA_NAMES:
+        pixels = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+        setattr(frame.tower.cameras, name, Camera(camera_info(name), Image(PilImage.fromarray(pixels),
+                                                                          timestamp(i, 3))))
+    for name in LaserSensorsTow._LIDAR_NAMES:
+        info = lidar_info(name)
+        points = np.zeros(100, dtype=info.dtype)
+        points['x'] = rng.random(100)
+        setattr(frame.tower.lidars, name, Lidar(info, Points(points, timestamp(i, 4))))
+    frame.tower.GNSS = GNSS(GNSSInformation('gnss', np.eye(4)))
+    frame.tower.GNSS.position = [Position(timestamp(i, 50), 'fix', None, Decimal('48.1'), Decimal('9.1'),
+                                          Decimal('300'), np.eye(3), 'k')]
+    return frame
+
+
+def write_record(path: str, frame_ids) -> str:
+    """Write the synthetic frames with the given IDs to a record file and return its path."""
+    with open(path, 'wb') as file:
+        file.write(cs.DataRecord.to_bytes([make_frame(i) for i in frame_ids]))
+    return path
+
+
+def frame_key(frame: Frame):
+    """Return a comparable summary of the decoded content of a frame."""
+    return (frame.frame_id, str(frame.timestamp),
+            np.asarray(frame.vehicle.cameras.STEREO_LEFT._image_raw.image).tobytes(),
+            frame.vehicle.lidars.TOP._points_raw.points.tobytes(),
+            frame.tower.lidars.VIEW_1._points_raw.points.tobytes(),
+            str(frame.vehicle.IMU.motion[-1].timestamp))
+
+
+@pytest.fixture(scope='session')
+def record_dir(tmp_path_factory) -> str:
+    """A directory with three records of 4, 5 and 6 frames, named in chronological order."""
+    directory = tmp_path_factory.mktemp('records')
+    first = 0
+    for r, num_frames in enumerate(RECORD_FRAMES):
+        write_record(os.path.join(directory, f'id0000{r}_2024-01-0{r + 1}_10-00-00.4mse'),
+                     range(first, first + num_frames))
+        first += num_frames
+    return str(directory)
+
+
+@pytest.fixture
+def record_path(record_dir) -> str:
+    """The path of the first record of `record_dir`."""
+    return os.path.join(record_dir, 'id00000_2024-01-01_10-00-00.4mse')
@@ -0,0 +1,49 @@
+import coopscenes as cs
+from coopscenes.cache import estimate_frame_size
+from conftest import frame_key
+
+
+def test_cached_frames_are_returned_as_is(record_path):
+    cache = cs.FrameCache(max_bytes=1 << 30)
+    record = cs.DataRecord(record_path, cache=cache)
+    frame = record[0]
+    assert record[0] is frame
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert frame_key(frame) == frame_key(cs.DataRecord(record_path)[0])
+
+
+def test_lazy_frames_are_estimated_again_when_decoded(record_path):
+    cache = cs.FrameCache(max_bytes=1 << 30)
+    record = cs.DataRecord(record_path, lazy=True, cache=cache)
+    frame = record[0]
+    inserted_bytes = cache.current_bytes
+    frame.vehicle.lidars.TOP._points_raw
+    frame.vehicle.cameras.STEREO_LEFT.size
+    assert record[0] is frame
+    assert cache.current_bytes > inserted_bytes
+    assert cache.current_bytes == estimate_frame_size(frame, record.frame_lengths[0])
+
+
+def test_rectified_images_are_counted(record_path):
+    cache = cs.FrameCache(max_bytes=1 << 30)
+    record = cs.DataRecord(record_path, cache=cache)
+    frame = record[0]
+    inserted_bytes = cache.current_bytes
+    camera = frame.vehicle.cameras.STEREO_LEFT
+    width, height = camera.image.image.size
+    record[0]
+    assert cache.current_bytes == inserted_bytes + width * height * len(camera.image.image.getbands())
+
+
+def test_grown_frames_evict_least_recently_used_frames(record_path):
+    record = cs.DataRecord(record_path, lazy=True)
+    sizes = [estimate_frame_size(record[i], record.frame_lengths[i]) for i in range(2)]
+    cache = cs.FrameCache(max_bytes=sum(sizes) + 1)
+    record = cs.DataRecord(record_path, lazy=True, cache=cache)
+    first, second = record[0], record[1]
+    assert len(cache) == 2
+    second.vehicle.lidars.TOP._points_raw
+    assert record[1] is second
+    assert cache.current_bytes <= cache.max_bytes
+    assert len(cache) == 1 and cache.evictions == 1
+    assert record[0] is not first
@@ -0,0 +1,118 @@
+import os
+import threading
+import pytest
+import coopscenes as cs
+from conftest import RECORD_FRAMES, frame_key, write_record
+
+
+def _frame_ids(frames):
+    return [frame.frame_id for frame in frames]
+
+
+def test_iter_frames_visits_all_records_in_order(record_dir):
+    dataloader = cs.Dataloader(record_dir)
+    assert _frame_ids(dataloader.iter_frames()) == list(range(sum(RECORD_FRAMES)))
+
+
+def test_prefetch_yields_the_same_frames(record_dir):
+    dataloader = cs.Dataloader(record_dir)
+    expected = [frame_key(frame) for frame in dataloader.iter_frames()]
+    for prefetch in (1, 2, 5):
+        assert [frame_key(frame) for frame in dataloader.iter_frames(prefetch=prefetch)] == expected
+
+
+def test_prefetch_opens_next_record_while_current_is_read(record_dir):
+    dataloader = cs.Dataloader(record_dir)
+    opened = {path: threading.Event() for path in dataloader.record_map}
+    prefetch_record = dataloader._prefetch_record
+
+    def tracking_prefetch(record_path):
+        record = prefetch_record(record_path)
+        opened[record_path].set()
+        return record
+
+    dataloader._prefetch_record = tracking_prefetch
+    frames = dataloader.iter_frames(prefetch=1)
+    try:
+        assert next(frames).frame_id == 0
+        assert opened[dataloader.record_map[1]].wait(timeout=10)
+        assert not opened[dataloader.record_map[2]].is_set()
+    finally:
+        frames.close()
+
+
+def test_prefetch_respects_byte_budget(record_dir):
+    dataloader = cs.Dataloader(record_dir)
+    in_flight = []
+    prefetch_record = dataloader._prefetch_record
+
+    def tracking_prefetch(record_path):
+        in_flight.append(record_path)
+        return prefetch_record(record_path)
+
+    dataloader._prefetch_record = tracking_prefetch
+    budget = max(os.path.getsize(path) for path in dataloader.record_map)
+    frames = dataloader.iter_frames(prefetch=3, max_prefetch_bytes=budget)
+    try:
+        assert next(frames).frame_id == 0
+        # The current record alone exhausts the budget, so nothing is opened ahead of it
+        assert in_flight == dataloader.record_map[:1]
+        assert _frame_ids(frames) == list(range(1, sum(RECORD_FRAMES)))
+    finally:
+        frames.close()
+    assert in_flight == dataloader.record_map
+
+
+@pytest.mark.parametrize('shard_by', ['bytes', 'frames'])
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_shards_are_disjoint_and_complete(record_dir, shard_by, shuffle):
+    total = sum(RECORD_FRAMES)
+    for world_size in range(1, total + 2):
+        shards = []
+        for rank in range(world_size):
+            dataloader = cs.Dataloader(record_dir, rank=rank, world_size=world_size, shard_by=shard_by,
+                                       shuffle=shuffle, seed=7)
+            dataloader.set_epoch(3)
+            shards.append(_frame_ids(dataloader.iter_frames()))
+        ids = [frame_id for shard in shards for frame_id in shard]
+        assert sorted(ids) == list(range(total))
+        if shard_by == 'frames':
+            assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+
+def test_shuffle_depends_on_seed_and_epoch(record_dir):
+    dataloader = cs.Dataloader(record_dir, shuffle=True, seed=0)
+    orders = set()
+    for epoch in range(8):
+        dataloader.set_epoch(epoch)
+        order = [path for path, _, _ in dataloader.get_shard()]
+        assert sorted(order) == sorted(dataloader.record_map)
+        orders.add(tuple(order))
+        other = cs.Dataloader(record_dir, shuffle=True, seed=0)
+        other.set_epoch(epoch)
+        assert other.get_shard() == dataloader.get_shard()
+    assert len(orders) > 1
+
+
+def test_unknown_shard_mode_is_rejected(record_dir):
+    with pytest.raises(ValueError):
+        cs.Dataloader(record_dir, shard_by='records')
+
+
+def test_handed_out_records_stay_open(tmp_path):
+    num_records = cs.Dataloader._MAX_OPEN_RECORDS + 2
+    for i in range(num_records):
+        write_record(str(tmp_path / f'id{i:05d}_2024-01-01_10-00-00.4mse'), [i])
+    dataloader = cs.Dataloader(str(tmp_path))
+    pairs = [tuple(handle) for handle in dataloader.frames_between(0, 2e9)]
+    assert len(pairs) == num_records
+    assert [record[index].frame_id for record, index in pairs] == list(range(num_records))
+
+
+def test_closed_records_refuse_to_decode(record_path):
+    record = cs.DataRecord(record_path, use_mmap=True)
+    record.close()
+    with pytest.raises(ValueError, match='closed'):
+        record[0]
+    with pytest.raises(ValueError, match='closed'):
+        next(record.iter_frames())
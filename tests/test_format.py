@@ -0,0 +1,129 @@
+import os
+import dill
+import numpy as np
+import pytest
+import coopscenes as cs
+from coopscenes.miscellaneous import Config, UnsafeDeserializationError, obj_to_bytes, obj_from_bytes, read_data_block
+from coopscenes.miscellaneous.codec import CODEC_MAGIC, encode, decode
+from coopscenes.repack import repack_record
+from conftest import frame_key, make_frame
+
+
+@pytest.fixture
+def dill_serialization():
+    previous = Config.DILL_SERIALIZATION
+    Config.DILL_SERIALIZATION = True
+    yield
+    Config.DILL_SERIALIZATION = previous
+
+
+def _decoded_keys(frames, tmp_path):
+    """Return the keys of the frames after a round trip through `DataRecord.to_bytes`, as images are lossy."""
+    path = str(tmp_path / 'reference.4mse')
+    with open(path, 'wb') as file:
+        file.write(cs.DataRecord.to_bytes(frames))
+    return [frame_key(frame) for frame in cs.DataRecord(path)]
+
+
+def _read_header(path):
+    with open(path, 'rb') as file:
+        header, _ = read_data_block(file.read())
+    return header
+
+
+def test_codec_round_trips_metadata_and_time_series():
+    frame = make_frame(0)
+    for obj in (frame.vehicle.IMU.motion, frame.vehicle.GNSS.position, frame.vehicle.cameras.STEREO_LEFT.info,
+                frame.vehicle.lidars.TOP.info, {'a': [1, 2.5, None, 'x']}):
+        data = encode(obj)
+        assert data.startswith(CODEC_MAGIC)
+        assert repr(decode(data)) == repr(obj)
+    motion = decode(encode(frame.vehicle.IMU.motion))
+    assert [m.timestamp for m in motion] == [m.timestamp for m in frame.vehicle.IMU.motion]
+    assert np.array_equal(motion[3].orientation, frame.vehicle.IMU.motion[3].orientation)
+
+
+def test_dill_streams_remain_readable():
+    value = {'frame_lengths': [1, 2, 3]}
+    assert obj_from_bytes(dill.dumps(value)) == value
+
+
+def test_writer_round_trips_frames_and_shares_static_information(tmp_path):
+    path = str(tmp_path / 'written.4mse')
+    frames = [make_frame(i) for i in range(3)]
+    with cs.DataRecordWriter(path) as writer:
+        writer.write(frames[0])
+        writer.write(frames[1].to_bytes())
+        writer.write(frames[2])
+    assert not os.path.exists(path + '.part')
+    record = cs.DataRecord(path)
+    assert record.shared_objects
+    assert [frame_key(frame) for frame in record] == _decoded_keys(frames, tmp_path)
+    # All frames of a record return the same object for the shared sensor information
+    assert record[0].vehicle.cameras.STEREO_LEFT.info is record[2].vehicle.cameras.STEREO_LEFT.info
+
+
+def test_writer_without_sharing_matches_to_bytes(tmp_path):
+    frames = [make_frame(i) for i in range(2)]
+    path = str(tmp_path / 'inline.4mse')
+    with cs.DataRecordWriter(path, share_objects=False) as writer:
+        for frame in frames:
+            writer.write(frame)
+    record = cs.DataRecord(path)
+    assert record.shared_objects == []
+    assert [frame_key(frame) for frame in record] == _decoded_keys(frames, tmp_path)
+
+
+def test_legacy_layout_uses_plain_header_and_dill(tmp_path, dill_serialization):
+    path = str(tmp_path / 'legacy.4mse')
+    frames = [make_frame(i) for i in range(2)]
+    with cs.DataRecordWriter(path, share_objects=False) as writer:
+        for frame in frames:
+            writer.write(frame)
+    assert isinstance(dill.loads(bytes(_read_header(path))), list)
+    with open(path, 'rb') as file:
+        assert CODEC_MAGIC not in file.read()
+    assert [frame_key(frame) for frame in cs.DataRecord(path)] == _decoded_keys(frames, tmp_path)
+
+
+def test_legacy_repack_drops_dictionaries(record_path, tmp_path):
+    with_dictionaries = str(tmp_path / 'dictionaries.4mse')
+    repack_record(record_path, with_dictionaries, zstd_dictionary=True, benchmark=False)
+    assert cs.DataRecord(with_dictionaries).zstd_dictionaries
+    legacy = str(tmp_path / 'legacy.4mse')
+    repack_record(with_dictionaries, legacy, layout='dill', benchmark=False)
+    assert isinstance(dill.loads(bytes(_read_header(legacy))), list)
+    assert [frame_key(frame) for frame in cs.DataRecord(legacy)] == \
+        [frame_key(frame) for frame in cs.DataRecord(record_path)]
+    with pytest.raises(ValueError):
+        repack_record(record_path, str(tmp_path / 'invalid.4mse'), layout='dill', zstd_dictionary=True)
+
+
+def test_obj_to_bytes_falls_back_to_dill_for_unsupported_objects():
+    class Unsupported:
+        pass
+    data = obj_to_bytes(Unsupported)
+    assert not data[4:].startswith(CODEC_MAGIC)
+
+
+@pytest.fixture
+def dill_disabled():
+    previous = Config.ALLOW_DILL
+    Config.ALLOW_DILL = False
+    yield
+    Config.ALLOW_DILL = previous
+
+
+def test_records_can_be_read_without_dill(record_path, tmp_path, dill_disabled):
+    assert [frame_key(frame) for frame in cs.DataRecord(record_path)] == \
+        [frame_key(frame) for frame in cs.DataRecord(record_path, lazy=True)]
+    with pytest.raises(UnsafeDeserializationError):
+        obj_from_bytes(dill.dumps({'frame_lengths': [1, 2, 3]}))
+
+
+def test_legacy_records_are_refused_without_dill(tmp_path, dill_serialization, dill_disabled):
+    path = str(tmp_path / 'legacy.4mse')
+    with cs.DataRecordWriter(path, share_objects=False) as writer:
+        writer.write(make_frame(0))
+    with pytest.raises(UnsafeDeserializationError):
+        cs.DataRecord(path)
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pytest
+import coopscenes as cs
+from coopscenes.data import ImageLabels
+from coopscenes.utils import get_projection, get_rgb_projection, rectify_frame
+from conftest import make_frame
+
+
+@pytest.fixture(scope='module')
+def labeled_record(tmp_path_factory) -> str:
+    frame = make_frame(0)
+    bbox_2d = np.zeros(2, dtype=ImageLabels._2d_bounding_box())
+    bbox_2d['cx'], bbox_2d['cy'] = [10, 31.5], [20, 23.5]
+    bbox_2d['width'], bbox_2d['height'] = [8, 4], [6, 2]
+    frame.vehicle.cameras.STEREO_LEFT._image_raw.labels = ImageLabels(bbox_2d)
+    path = os.path.join(tmp_path_factory.mktemp('labeled'), 'labeled.4mse')
+    with open(path, 'wb') as file:
+        file.write(cs.DataRecord.to_bytes([frame]))
+    return path
+
+
+@pytest.mark.parametrize('scale', [1, 2, 4, 8])
+def test_images_are_decoded_at_reduced_size(labeled_record, scale):
+    frame = cs.DataRecord(labeled_record, image_scale=scale)[0]
+    camera = frame.vehicle.cameras.STEREO_LEFT
+    size = (64 // scale, 48 // scale)
+    assert camera.size == size
+    assert camera.image.image.size == size
+    assert camera.array(rectified=False).shape == (size[1], size[0], 3)
+    assert rectify_frame(frame)['vehicle.cameras.STEREO_LEFT'].shape == (size[1], size[0], 3)
+
+
+def test_unsupported_scale_is_rejected(labeled_record):
+    with pytest.raises(ValueError):
+        cs.DataRecord(labeled_record, image_scale=3)
+
+
+def test_labels_are_scaled_with_the_image(labeled_record):
+    labels = cs.DataRecord(labeled_record, image_scale=2)[0].vehicle.cameras.STEREO_LEFT._image_raw.labels
+    assert np.allclose(labels.bbox_2d['cx'], [4.75, 15.5])
+    assert np.allclose(labels.bbox_2d['cy'], [9.75, 11.5])
+    assert np.allclose(labels.bbox_2d['width'], [4, 2])
+    assert np.allclose(labels.bbox_2d['height'], [3, 1])
+
+
+@pytest.mark.parametrize('scale', [2, 4])
+def test_projection_matches_reduced_image(labeled_record, scale):
+    full = cs.DataRecord(labeled_record)[0]
+    reduced = cs.DataRecord(labeled_record, image_scale=scale)[0]
+    full_points, full_projection = get_projection(full.vehicle.lidars.TOP, full.vehicle.cameras.STEREO_LEFT,
+                                                  full.vehicle.info)
+    points, projection, colors = get_rgb_projection(reduced.vehicle.lidars.TOP, reduced.vehicle.cameras.STEREO_LEFT,
+                                                    reduced.vehicle.info)
+    assert len(points) == len(colors) > 0
+    width, height = reduced.vehicle.cameras.STEREO_LEFT.size
+    assert np.all((projection >= 0) & (projection < [width, height]))
+    # Points projected into both images land on the same spot relative to the image size
+    common = {tuple(point): uv for point, uv in zip(full_points, full_projection)}
+    for point, uv in zip(points, projection):
+        if tuple(point) in common:
+            assert np.allclose(uv, (common[tuple(point)] + 0.5) / scale - 0.5)
+
+
+@pytest.mark.parametrize('scale', [1, 2, 4, 8])
+def test_direct_numpy_decoding_matches_pil(labeled_record, scale):
+    image = cs.DataRecord(labeled_record, image_scale=scale)[0].vehicle.cameras.STEREO_LEFT._image_raw
+    array = image.to_numpy()
+    expected = np.asarray(cs.DataRecord(labeled_record, image_scale=scale)[0].vehicle.cameras.STEREO_LEFT
+                          ._image_raw.image)
+    assert array.shape == expected.shape and array.flags.writeable
+    # OpenCV and PIL may link different libjpeg builds, which round the IDCT slightly differently
+    assert np.abs(array.astype(np.int16) - expected).max() <= 2
@@ -0,0 +1,83 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import coopscenes as cs
+from coopscenes.index import RecordIndex, INDEX_VERSION
+from conftest import frame_key, timestamp
+
+
+@pytest.fixture
+def dataset_copy(record_dir, tmp_path) -> str:
+    for path in cs.Dataloader(record_dir).record_map:
+        shutil.copy(path, tmp_path)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def read_only_index(monkeypatch):
+    def fail(*args, **kwargs):
+        raise PermissionError('Read-only file system')
+    monkeypatch.setattr(RecordIndex, '_write', fail)
+
+
+def test_index_round_trip(dataset_copy):
+    dataloader = cs.Dataloader(dataset_copy)
+    dataloader.build_indices()
+    record_path = dataloader.record_map[0]
+    with cs.DataRecord(record_path) as record:
+        built = RecordIndex.build(record)
+    loaded = RecordIndex.load(record_path)
+    assert INDEX_VERSION == 4
+    assert not loaded.is_stale()
+    for attr in ('frame_offsets', 'frame_ids', 'timestamps', 'sensor_spans', 'sensor_checksums'):
+        assert np.array_equal(getattr(loaded, attr), getattr(built, attr))
+    assert loaded.sensor_names == built.sensor_names
+    assert loaded.shared_objects == built.shared_objects
+    assert loaded.zstd_dictionaries == built.zstd_dictionaries
+
+
+def test_indexed_records_decode_like_unindexed_records(dataset_copy):
+    dataloader = cs.Dataloader(dataset_copy)
+    dataloader.build_indices()
+    for i, record_path in enumerate(dataloader.record_map):
+        indexed, plain = dataloader[i], cs.DataRecord(record_path)
+        assert indexed.index is not None
+        assert [frame_key(frame) for frame in indexed] == [frame_key(frame) for frame in plain]
+        sensors = ['vehicle.lidars.TOP']
+        assert [frame.vehicle.lidars.TOP._points_raw.points.tobytes() for frame in indexed.iter_frames(sensors)] \
+            == [frame.vehicle.lidars.TOP._points_raw.points.tobytes() for frame in plain]
+
+
+def test_stale_index_is_rebuilt(dataset_copy):
+    dataloader = cs.Dataloader(dataset_copy)
+    dataloader.build_indices()
+    record_path = dataloader.record_map[0]
+    os.utime(record_path, ns=(0, 0))
+    assert RecordIndex.load(record_path).is_stale()
+    assert dataloader[0].num_frames == 4
+    assert not RecordIndex.load(record_path).is_stale()
+
+
+def test_unwritable_stale_index_is_used_in_memory(dataset_copy, read_only_index):
+    dataloader = cs.Dataloader(dataset_copy)
+    record_path = dataloader.record_map[0]
+    os.mkdir(RecordIndex.get_path(record_path))
+    record = dataloader[0]
+    assert record.index is not None and not record.index.is_stale()
+    assert [frame.frame_id for frame in record] == [0, 1, 2, 3]
+    assert not any(name.endswith('.tmp') for name in os.listdir(dataset_copy))
+
+
+def test_time_queries_without_writable_indices(dataset_copy, read_only_index):
+    dataloader = cs.Dataloader(dataset_copy)
+    handles = dataloader.frames_between(timestamp(2), timestamp(6))
+    assert [handle.get_frame().frame_id for handle in handles] == [2, 3, 4, 5, 6]
+    assert dataloader.nearest_frame(timestamp(7) + 1).get_frame().frame_id == 8
+    assert not any(name.endswith('.idx') for name in os.listdir(dataset_copy))
+
+
+def test_time_queries_ignore_sidecars_without_use_index(dataset_copy):
+    dataloader = cs.Dataloader(dataset_copy, use_index=False)
+    assert dataloader.nearest_frame(timestamp(3)).get_frame().frame_id == 3
+    assert not any(name.endswith('.idx') for name in os.listdir(dataset_copy))
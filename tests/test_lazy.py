@@ -0,0 +1,49 @@
+import threading
+import numpy as np
+import coopscenes as cs
+from conftest import frame_key
+
+
+def test_lazy_frames_decode_like_eager_frames(record_path):
+    eager = cs.DataRecord(record_path)
+    lazy = cs.DataRecord(record_path, lazy=True)
+    for frame_index in range(eager.num_frames):
+        lazy_frame = lazy[frame_index]
+        assert not lazy_frame.vehicle.lidars.TOP.is_decoded
+        assert frame_key(lazy_frame) == frame_key(eager[frame_index])
+        assert lazy_frame.vehicle.lidars.TOP.is_decoded
+
+
+def test_lazy_sensors_decode_once_when_accessed_concurrently(record_path):
+    record = cs.DataRecord(record_path, lazy=True)
+    expected_points = cs.DataRecord(record_path)[0].vehicle.lidars.TOP._points_raw.points
+    for _ in range(50):
+        frame = record[0]
+        lidar, camera, imu = frame.vehicle.lidars.TOP, frame.vehicle.cameras.STEREO_LEFT, frame.vehicle.IMU
+        barrier = threading.Barrier(4)
+        errors, results = [], []
+
+        def access():
+            try:
+                barrier.wait()
+                results.append((lidar._points_raw.points, camera.size, len(imu.motion)))
+            except BaseException as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=access) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        for points, size, num_motions in results:
+            assert np.array_equal(points, expected_points)
+            assert size == (64, 48)
+            assert num_motions == 5
+        assert lidar.is_decoded and camera.is_decoded and imu.is_decoded
+
+
+def test_missing_attribute_of_lazy_sensor_raises_attribute_error(record_path):
+    lidar = cs.DataRecord(record_path, lazy=True)[0].vehicle.lidars.TOP
+    assert not hasattr(lidar, 'no_such_attribute')
+    assert lidar.is_decoded
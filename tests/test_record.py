@@ -0,0 +1,44 @@
+import pytest
+import coopscenes as cs
+from conftest import RECORD_FRAMES, frame_key
+
+
+def test_random_access_matches_iteration(record_path):
+    record = cs.DataRecord(record_path)
+    expected = [frame_key(frame) for frame in record]
+    assert len(record) == len(expected) == RECORD_FRAMES[0]
+    assert [frame_key(record[i]) for i in reversed(range(len(record)))] == expected[::-1]
+    assert [frame_key(frame) for frame in record[1:3]] == expected[1:3]
+    with pytest.raises(ValueError):
+        record[len(record)]
+
+
+def test_memory_mapped_records_decode_like_loaded_records(record_path):
+    expected = [frame_key(frame) for frame in cs.DataRecord(record_path)]
+    with cs.DataRecord(record_path, use_mmap=True) as record:
+        assert isinstance(record.frames_data, memoryview)
+        assert [frame_key(frame) for frame in record] == expected
+        assert frame_key(record[2]) == expected[2]
+
+
+def test_sensor_selection_decodes_only_selected_sensors(record_path):
+    record = cs.DataRecord(record_path)
+    expected = [frame.vehicle.lidars.TOP._points_raw.points.tobytes() for frame in record]
+    frames = list(record.iter_frames(['vehicle.lidars.TOP', 'tower.cameras']))
+    assert [frame.vehicle.lidars.TOP._points_raw.points.tobytes() for frame in frames] == expected
+    assert all(frame.vehicle.cameras.STEREO_LEFT is None and frame.vehicle.IMU is None for frame in frames)
+    assert all(frame.tower.cameras.VIEW_1 is not None and frame.tower.lidars.VIEW_1 is None for frame in frames)
+    assert [frame.frame_id for frame in record.iter_frames(['vehicle.IMU'], start=1, stop=3)] == [1, 2]
+    with pytest.raises(ValueError):
+        list(record.iter_frames(['vehicle.radars']))
+
+
+def test_parallel_decoding_yields_the_same_frames(record_path):
+    record = cs.DataRecord(record_path)
+    expected = [frame_key(frame) for frame in record]
+    assert [frame_key(frame) for frame in record.iter_parallel(workers=2)] == expected
+    assert sorted(frame_key(frame) for frame in record.iter_parallel(workers=2, ordered=False, max_in_flight=1)) \
+        == sorted(expected)
+    with cs.DataRecord(record_path, decode_threads=4) as threaded:
+        assert [frame_key(threaded[i]) for i in range(len(threaded))] == expected
+        assert [frame_key(frame) for frame in threaded] == expected
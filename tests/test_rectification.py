@@ -0,0 +1,88 @@
+import os
+import cv2
+import numpy as np
+import pytest
+import coopscenes as cs
+from coopscenes.miscellaneous import Config
+from coopscenes.utils import get_rect_img, get_rect_maps, clear_rect_map_cache, rectify_frame, rectify_record
+from conftest import camera_info
+
+
+@pytest.fixture
+def rect_map_cache_dir(tmp_path):
+    previous = Config.RECT_MAP_CACHE_DIR
+    Config.RECT_MAP_CACHE_DIR = str(tmp_path / 'maps')
+    clear_rect_map_cache()
+    yield Config.RECT_MAP_CACHE_DIR
+    Config.RECT_MAP_CACHE_DIR = previous
+    clear_rect_map_cache()
+
+
+def test_rect_maps_are_shared_and_persisted(rect_map_cache_dir):
+    info = camera_info('STEREO_LEFT')
+    maps = get_rect_maps(info)
+    assert get_rect_maps(camera_info('STEREO_LEFT')) is maps
+    assert not maps[0].flags.writeable
+    assert len(os.listdir(rect_map_cache_dir)) == 1
+
+    clear_rect_map_cache()
+    loaded = get_rect_maps(info)
+    assert loaded is not maps
+    assert all(np.array_equal(a, b) for a, b in zip(loaded, maps))
+    assert get_rect_maps(info, (32, 24))[0].shape[:2] == (24, 32)
+
+
+def test_unwritable_rect_map_cache_keeps_maps_in_memory(rect_map_cache_dir, monkeypatch):
+    info = camera_info('STEREO_LEFT')
+    expected = cv2.initUndistortRectifyMap(info.camera_mtx, info.distortion_mtx[:-1], info.rectification_mtx,
+                                           info.projection_mtx, (64, 48), cv2.CV_16SC2)
+
+    def fail(*args, **kwargs):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(np, 'savez', fail)
+    maps = get_rect_maps(info)
+    assert all(np.array_equal(a, b) for a, b in zip(maps, expected))
+    assert get_rect_maps(info) is maps
+    assert os.listdir(rect_map_cache_dir) == []
+
+    # A file in place of the cache directory
+    clear_rect_map_cache()
+    os.rmdir(rect_map_cache_dir)
+    open(rect_map_cache_dir, 'wb').close()
+    assert all(np.array_equal(a, b) for a, b in zip(get_rect_maps(info), expected))
+
+
+def test_rectified_image_is_memoized_until_invalidated(record_path):
+    camera = cs.DataRecord(record_path)[0].vehicle.cameras.STEREO_LEFT
+    image = camera.image
+    assert camera.image is image
+    camera.invalidate_image()
+    assert camera.image is not image
+    assert np.array_equal(np.asarray(camera.image.image), np.asarray(image.image))
+
+
+def test_batch_rectification_matches_single_images(record_path):
+    record = cs.DataRecord(record_path)
+    frame = record[0]
+    rectified = rectify_frame(frame)
+    assert len(rectified) == len([name for name in cs.Frame.get_sensor_names() if '.cameras.' in name])
+    for name, array in rectified.items():
+        agent, group, camera_name = name.split('.')
+        camera = getattr(getattr(getattr(frame, agent), group), camera_name)
+        assert np.array_equal(array, np.asarray(get_rect_img(camera).image))
+
+    # Buffers of a previous call are reused
+    assert rectify_frame(frame, ['vehicle.cameras.STEREO_LEFT'], out=rectified)['vehicle.cameras.STEREO_LEFT'] \
+        is rectified['vehicle.cameras.STEREO_LEFT']
+    linear = rectify_frame(frame, ['tower.cameras'], interpolation=cv2.INTER_LINEAR)
+    assert all(name.startswith('tower.cameras.') for name in linear)
+
+    frames = list(rectify_record(record, ['vehicle.cameras.STEREO_LEFT'], workers=2))
+    assert [frame.frame_id for frame, _ in frames] == list(range(record.num_frames))
+    assert np.array_equal(frames[0][1]['vehicle.cameras.STEREO_LEFT'], rectified['vehicle.cameras.STEREO_LEFT'])
+
+
+def test_unknown_camera_is_rejected(record_path):
+    with pytest.raises(ValueError):
+        rectify_frame(cs.DataRecord(record_path)[0], ['vehicle.cameras.UNKNOWN'])
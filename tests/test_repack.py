@@ -0,0 +1,65 @@
+import os
+import pytest
+import zstandard as zstd
+import coopscenes as cs
+from coopscenes.cli import main
+from coopscenes.repack import repack_record, repack_dataset
+from conftest import frame_key, write_record
+
+
+def _frame_keys(path, **kwargs):
+    return [frame_key(frame) for frame in cs.DataRecord(path, **kwargs)]
+
+
+@pytest.mark.parametrize('options', [{}, {'zstd_level': 3}, {'zstd_dictionary': True}, {'layout': 'inline'},
+                                     {'layout': 'dill'}, {'build_index': True}])
+def test_repack_preserves_frames(record_path, tmp_path, options):
+    output_path = str(tmp_path / os.path.basename(record_path))
+    result = repack_record(record_path, output_path, benchmark=False, **options)
+    assert result['frames'] == cs.DataRecord(record_path).num_frames
+    assert _frame_keys(output_path) == _frame_keys(record_path)
+
+
+def test_repack_with_dictionaries_stores_them_in_header_and_index(record_path, tmp_path):
+    output_path = str(tmp_path / os.path.basename(record_path))
+    repack_record(record_path, output_path, zstd_dictionary=True, build_index=True, benchmark=False)
+    record = cs.DataRecord(output_path)
+    assert len(record.zstd_dictionaries) == 2
+    index = cs.Dataloader(str(tmp_path)).get_index(0)
+    assert index.zstd_dictionaries == record.zstd_dictionaries
+    points = record[0].vehicle.lidars.TOP._points_raw.points
+    assert points.flags.writeable
+
+
+def test_repack_with_dictionaries_falls_back_on_short_records(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    record_path = write_record(str(source / 'short.4mse'), range(1))
+    output_path = str(tmp_path / 'short.4mse')
+    with pytest.warns(RuntimeWarning, match='No zstd dictionary'):
+        repack_record(record_path, output_path, zstd_dictionary=True, zstd_level=3, benchmark=False)
+    assert cs.DataRecord(output_path).zstd_dictionaries == []
+    assert _frame_keys(output_path) == _frame_keys(record_path)
+
+    # The warnings of the worker processes do not abort the repacking of a dataset
+    results = repack_dataset(str(source), str(tmp_path / 'output'), workers=1, zstd_dictionary=True,
+                             benchmark=False)
+    assert [result['frames'] for result in results] == [1]
+    assert _frame_keys(str(tmp_path / 'output' / 'short.4mse')) == _frame_keys(record_path)
+
+
+def test_train_dictionary_rejects_too_few_samples():
+    with pytest.raises(zstd.ZstdError):
+        cs.miscellaneous.train_zstd_dictionary([b'\x00' * 100])
+
+
+def test_repack_refuses_to_overwrite_its_input(record_path):
+    with pytest.raises(ValueError):
+        repack_record(record_path, record_path)
+
+
+def test_cli_repacks_directory(record_dir, tmp_path, capsys):
+    assert main(['repack', record_dir, str(tmp_path), '--zstd-level', '3', '--workers', '1', '--no-benchmark']) == 0
+    assert 'total' in capsys.readouterr().out
+    for path in cs.Dataloader(record_dir).record_map:
+        assert _frame_keys(str(tmp_path / os.path.basename(path))) == _frame_keys(path)
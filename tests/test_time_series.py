@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import coopscenes as cs
+from coopscenes.utils import export_time_series
+from conftest import RECORD_FRAMES, timestamp
+
+
+def test_time_series_hold_all_entries_in_record_order(record_path):
+    record = cs.DataRecord(record_path)
+    time_series = record.get_time_series()
+    motion = time_series['vehicle.IMU.motion']
+    assert len(motion) == RECORD_FRAMES[0] * 5
+    assert list(motion['frame_index']) == [i for i in range(RECORD_FRAMES[0]) for _ in range(5)]
+    expected = [frame.vehicle.IMU.motion for frame in record]
+    assert list(motion['timestamp_ns']) == [int(m.timestamp * 10 ** 9) for entries in expected for m in entries]
+    assert np.array_equal(motion['orientation'][3], expected[0][3].orientation)
+    assert motion['timestamp_ns'][0] == int(timestamp(0, 10) * 10 ** 9)
+
+    position = time_series['vehicle.GNSS.position']
+    assert len(position) == RECORD_FRAMES[0] * 2
+    assert set(position['services_GPS']) == {1}
+    assert set(time_series['tower.GNSS.position']['services_GPS']) == {-1}
+    assert position['latitude'][0] == pytest.approx(48.1234567891)
+    assert record.get_time_series() is time_series
+
+
+def test_npz_export_round_trips(record_path, tmp_path):
+    record = cs.DataRecord(record_path)
+    paths = export_time_series(record, str(tmp_path))
+    with np.load(paths[0]) as exported:
+        for stream, array in record.get_time_series().items():
+            assert np.array_equal(exported[stream], array)
+
+
+def test_parquet_export_round_trips(record_path, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    record = cs.DataRecord(record_path)
+    paths = export_time_series(record, str(tmp_path), file_format='parquet')
+    time_series = record.get_time_series()
+    assert len(paths) == len(time_series)
+    table = pq.read_table([path for path in paths if path.endswith('vehicle.IMU.motion.parquet')][0])
+    motion = time_series['vehicle.IMU.motion']
+    assert table.column('timestamp_ns').to_pylist() == motion['timestamp_ns'].tolist()
+    orientation = np.array(table.column('orientation').to_pylist())
+    assert np.array_equal(orientation, motion['orientation'].reshape(len(motion), -1))
+
+
+def test_unknown_export_format_is_rejected(record_path, tmp_path):
+    with pytest.raises(ValueError):
+        export_time_series(cs.DataRecord(record_path), str(tmp_path), file_format='csv')
@@ -0,0 +1,90 @@
+import os
+import shutil
+import pytest
+import coopscenes as cs
+from coopscenes import verification
+from coopscenes.miscellaneous import Config, ChecksumError
+from coopscenes.verification import VerificationLog, verify_dataset, STATUS_VALID, STATUS_CORRUPT, STATUS_UNKNOWN
+
+
+@pytest.fixture
+def record_copy(record_path, tmp_path) -> str:
+    path = str(tmp_path / os.path.basename(record_path))
+    shutil.copy(record_path, path)
+    return path
+
+
+@pytest.fixture
+def verification_dir():
+    previous = Config.VERIFICATION_DIR
+    yield
+    Config.VERIFICATION_DIR = previous
+
+
+def _corrupt_last_frame(path):
+    record = cs.DataRecord(path)
+    offset = record.data_offset + record.frame_offsets[-1] - 10
+    with open(path, 'r+b') as file:
+        file.seek(offset)
+        byte = file.read(1)
+        file.seek(offset)
+        file.write(bytes((byte[0] ^ 0xFF,)))
+
+
+def test_once_records_statuses_in_sidecar(record_copy):
+    with cs.DataRecord(record_copy, verify='once') as record:
+        for i in range(record.num_frames):
+            record[i]
+        # The statuses are written in batches and when the record is closed
+        assert set(VerificationLog(record_copy, record.num_frames).statuses) == {STATUS_UNKNOWN}
+    log = VerificationLog(record_copy, record.num_frames)
+    assert set(log.statuses) == {STATUS_VALID}
+    assert log.persistent
+
+
+def test_once_detects_corrupt_frames(record_copy):
+    _corrupt_last_frame(record_copy)
+    record = cs.DataRecord(record_copy, verify='once')
+    with pytest.raises(ChecksumError):
+        record[record.num_frames - 1]
+    with pytest.raises(ChecksumError):
+        record[record.num_frames - 1]
+    assert VerificationLog(record_copy, record.num_frames).get_corrupt_frames() == [record.num_frames - 1]
+
+
+def test_statuses_are_written_in_batches(record_copy, monkeypatch):
+    monkeypatch.setattr(verification, '_FLUSH_INTERVAL', 2)
+    record = cs.DataRecord(record_copy, verify='once')
+    record[0]
+    assert VerificationLog(record_copy, record.num_frames).get_status(0) == STATUS_UNKNOWN
+    record[1]
+    statuses = VerificationLog(record_copy, record.num_frames).statuses
+    assert list(statuses[:3]) == [STATUS_VALID, STATUS_VALID, STATUS_UNKNOWN]
+
+
+def test_unwritable_sidecar_keeps_statuses_in_memory(record_copy):
+    # A directory in place of the sidecar makes every write fail, like a read-only dataset directory
+    os.mkdir(VerificationLog.get_path(record_copy))
+    record = cs.DataRecord(record_copy, verify='once')
+    assert not record._verification_log.persistent
+    record[0]
+    assert record._verification_log.get_status(0) == STATUS_VALID
+    assert record._verification_log.get_status(1) == STATUS_UNKNOWN
+
+
+def test_sidecars_can_be_kept_in_separate_directory(record_copy, tmp_path, verification_dir):
+    Config.VERIFICATION_DIR = str(tmp_path / 'sidecars')
+    with cs.DataRecord(record_copy, verify='once') as record:
+        record[0]
+    sidecar = os.path.join(Config.VERIFICATION_DIR, os.path.basename(record_copy) + '.vrf')
+    assert os.path.exists(sidecar)
+    assert not os.path.exists(record_copy + '.vrf')
+    assert VerificationLog(record_copy, record.num_frames).get_status(0) == STATUS_VALID
+
+
+def test_verify_dataset_reports_corrupt_frames(record_copy, tmp_path):
+    _corrupt_last_frame(record_copy)
+    num_frames = cs.DataRecord(record_copy).num_frames
+    assert verify_dataset(str(tmp_path), workers=1) == {record_copy: [num_frames - 1]}
+    statuses = VerificationLog(record_copy, num_frames).statuses
+    assert list(statuses) == [STATUS_VALID] * (num_frames - 1) + [STATUS_CORRUPT]